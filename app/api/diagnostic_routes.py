@@ -24,6 +24,18 @@ async def diagnostic_system(current_user: dict = Depends(get_current_user)):
         "timestamp": datetime.now().isoformat()
     }
 
+@router.get("/diagnostic/analysis")
+async def diagnostic_analysis(current_user: dict = Depends(get_current_user)):
+    """Carga e tempos do executor de análise de sinais"""
+    from app.services.scanner.analysis_executor import get_analysis_executor
+    return get_analysis_executor().stats()
+
+@router.get("/diagnostic/scan-queue")
+async def diagnostic_scan_queue(current_user: dict = Depends(get_current_user)):
+    """Fila e workers de scan de pares"""
+    from app.services.scanner.scan_queue import get_scan_queue
+    return get_scan_queue().stats()
+
 @router.get("/diagnostic/network")
 async def diagnostic_network(current_user: dict = Depends(get_current_user)):
     """Diagnóstico de rede"""
@@ -364,7 +364,7 @@ async def start_scanner(config: ScanConfig, current_user: dict = Depends(get_cur
         importlib.reload(sys.modules['app.models.schemas'])
 
     print(f"[API] Iniciando scanner com config: {config.dict()}")
-    scanner = AutoScanner(client, config)
+    scanner = AutoScanner(client, config, owner=username)
     task = asyncio.create_task(scanner.start_scanning())
     _scanner_instances[username] = scanner
     _scanner_tasks[username] = task
@@ -646,12 +646,8 @@ async def get_statistics(current_user: dict = Depends(get_current_user)):
             average_response_time=0.0
         )
 
-    signals = list(scanner.signal_history)
-    total = len(signals)
-
-    symbol_counts = {}
-    for sig in signals:
-        symbol_counts[sig.symbol] = symbol_counts.get(sig.symbol, 0) + 1
+    total = len(scanner.signals)
+    symbol_counts = scanner.signals.symbol_counts()
 
     best_pairs = []
     for symbol, count in sorted(symbol_counts.items(), key=lambda x: x[1], reverse=True)[:3]:
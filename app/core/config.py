@@ -36,6 +36,39 @@ class Settings(BaseSettings):
     DEFAULT_SENSITIVITY: str = "moderate"
     MAX_CONCURRENT_PAIRS: int = 10
 
+    # Signal analysis executor: "thread", "process" or "inline" (event loop)
+    ANALYSIS_EXECUTOR: str = "thread"
+    ANALYSIS_WORKERS: int = 4
+    ANALYSIS_MAX_PENDING: int = 64
+
+    # Pair scan worker pool shared by every user's scanner
+    SCAN_WORKERS: int = 10
+    SCAN_QUEUE_SIZE: int = 1000
+    SCAN_USER_CONCURRENCY: int = 5  # Concurrent pair scans per IQ Option session
+    SCAN_JOB_TIMEOUT: float = 10.0
+
+    # AutoScanner signal history: max signals kept and max age (0 = no limit)
+    SIGNAL_HISTORY_SIZE: int = 5000
+    SIGNAL_HISTORY_TTL_MINUTES: int = 24 * 60
+
+    # WebSocket broadcast: frames queued per client, what to do with a client
+    # whose queue is full ("drop_oldest" or "disconnect") and max send time
+    WS_SEND_QUEUE: int = 100
+    WS_SLOW_CLIENT_POLICY: str = "drop_oldest"
+    WS_SEND_TIMEOUT: float = 5.0
+    # permessage-deflate on WebSocket frames (uvicorn); saves bandwidth on the
+    # json encoding at some CPU per frame, little gain on compact/msgpack
+    WS_PER_MESSAGE_DEFLATE: bool = True
+    # Signal events kept per user for clients resuming after a reconnect
+    WS_EVENT_LOG_SIZE: int = 500
+
+    # Logging: root level, per-module levels ("logger=LEVEL,...") and the
+    # max records per message template per interval (0 = no limit)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    LOG_RATE_LIMIT: int = 20
+    LOG_RATE_INTERVAL: float = 60.0
+
     # Access control
     ACCESS_TOKENS_FILE: str = "data/access_tokens.json"
 
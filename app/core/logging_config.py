@@ -0,0 +1,152 @@
+"""
+Logging configuration
+Non-blocking queue logging with per-module levels and rate limits
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most ``burst`` records of a message template through per
+    ``interval`` seconds
+
+    Records are keyed by logger and unformatted message, so the per-pair
+    messages of the scan loop (``"... %s", symbol``) share one budget.
+    Records above ``max_level`` (warnings and errors by default) always pass.
+    The first record of a new window reports how many were suppressed.
+    """
+
+    def __init__(
+        self,
+        burst: int = 20,
+        interval: float = 60.0,
+        max_level: int = logging.INFO,
+        max_keys: int = 5000
+    ):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_level = max_level
+        self.max_keys = max_keys
+        # (logger, template) -> [window start, records passed, records suppressed]
+        self._windows: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno > self.max_level:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._prune(now)
+                if window is not None and window[2]:
+                    record.msg = f"{record.msg} [+{window[2]} suppressed]"
+                self._windows[key] = [now, 1, 0]
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+    def _prune(self, now: float):
+        expired = [key for key, window in self._windows.items() if now - window[0] >= self.interval]
+        for key in expired:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """
+    Parse per-module levels
+
+    Args:
+        spec: "logger=LEVEL" pairs separated by commas, e.g.
+            "app.services.scanner=DEBUG,app.services.iqoptionapi=WARNING"
+
+    Returns:
+        Dict of logger name -> level name
+    """
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(
+    level: str = "INFO",
+    module_levels: Optional[Dict[str, str]] = None,
+    rate_limit: int = 20,
+    rate_interval: float = 60.0
+) -> logging.handlers.QueueListener:
+    """
+    Route every log record through a queue to a background writer
+
+    The calling thread only enqueues the record (QueueHandler); the
+    QueueListener thread does the stream writes, so the event loop never
+    blocks on stderr. Safe to call again: the previous listener is stopped
+    and the root handlers replaced.
+
+    Args:
+        level: Root level
+        module_levels: Dict of logger name -> level (see parse_levels)
+        rate_limit: Records per message template per interval (0 disables)
+        rate_interval: Rate limit window in seconds
+
+    Returns:
+        The running QueueListener
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(RateLimitFilter(burst=rate_limit, interval=rate_interval))
+
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush the queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,255 @@
+"""
+Metrics
+In-process counters, gauges and histograms with Prometheus text exposition
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: fetches and analysis (ms range) up to whole scan cycles
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{%s}" % ",".join(pairs) if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        REGISTRY.append(self)
+
+    def labels(self, *values, **kwargs):
+        """Child metric of one label combination (created on first use)"""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, key: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._samples(key, child))
+        return "\n".join(lines)
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonic count (e.g. timeouts); exposed as <name>_total"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    def _samples(self, key, child):
+        return [f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """Current value (e.g. jobs queued now)"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def _samples(self, key, child):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        """Observe the seconds spent in the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def time(self):
+        return self._children[()].time()
+
+    def _samples(self, key, child):
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = 'le="%s"' % _format_value(bound)
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def generate_latest() -> str:
+    """Every registered metric in the Prometheus text format"""
+    return "\n".join(metric.expose() for metric in REGISTRY) + "\n"
+
+
+# Scanner metrics
+CANDLE_FETCH_SECONDS = Histogram(
+    "gtsniper_candle_fetch_seconds",
+    "IQOptionClient.get_candles latency by request path",
+    ("path",)
+)
+CANDLE_FETCH_ERRORS = Counter(
+    "gtsniper_candle_fetch_errors",
+    "IQOptionClient.get_candles failures",
+    ("path",)
+)
+SCAN_FETCH_SECONDS = Histogram(
+    "gtsniper_scan_fetch_seconds",
+    "Candle fetch latency of one pair as seen by a scanner (cache hits included)",
+    ("scanner",)
+)
+ANALYSIS_SECONDS = Histogram(
+    "gtsniper_analysis_seconds",
+    "SignalGenerator latency: one pair (single) or a stacked batch of pairs (batch)",
+    ("kind",)
+)
+SCAN_CYCLE_SECONDS = Histogram(
+    "gtsniper_scan_cycle_seconds",
+    "Duration of a scan cycle, from the release of a batch of pairs to its last result",
+    ("scanner",)
+)
+SCAN_PAIRS = Counter(
+    "gtsniper_scan_pairs",
+    "Pairs scanned",
+    ("scanner",)
+)
+SIGNALS_PER_CYCLE = Histogram(
+    "gtsniper_signals_per_cycle",
+    "Signals generated per scan cycle",
+    ("scanner",),
+    buckets=COUNT_BUCKETS
+)
+SCAN_QUEUE_DEPTH = Histogram(
+    "gtsniper_scan_queue_depth",
+    "Jobs already queued when a pair scan is submitted",
+    buckets=COUNT_BUCKETS
+)
+SCAN_QUEUE_JOBS = Gauge(
+    "gtsniper_scan_queue_jobs",
+    "Pair scan jobs queued now"
+)
+SCAN_JOBS = Counter(
+    "gtsniper_scan_jobs",
+    "Pair scan jobs by outcome (completed, timeout, failed, expired, cancelled)",
+    ("status",)
+)
+
+# WebSocket metrics
+WS_CLIENTS = Gauge(
+    "gtsniper_ws_clients",
+    "Signal WebSocket clients connected"
+)
+WS_FRAMES_DROPPED = Counter(
+    "gtsniper_ws_frames_dropped",
+    "Frames not delivered to a slow client (queue_full, coalesced, disconnected)",
+    ("reason",)
+)
@@ -2,21 +2,27 @@
 GT4 Binary Options Trading System - Main Application
 FastAPI backend com IQ Option Real API Integration
 """
-from fastapi import FastAPI, WebSocket, Request
+from typing import Optional
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import HTTPException
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from app.api.routes import router
-from app.websocket.manager import manager
+from app.websocket.signal_websocket import ws_manager
+from app.core.security import decode_access_token
 from app.core.config import settings
+from app.core.logging_config import parse_levels, setup_logging
+from app.core import metrics
 import logging
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Configurar logging (fila nao bloqueante, niveis por modulo, rate limit)
+setup_logging(
+    level=settings.LOG_LEVEL,
+    module_levels=parse_levels(settings.LOG_LEVELS),
+    rate_limit=settings.LOG_RATE_LIMIT,
+    rate_interval=settings.LOG_RATE_INTERVAL
 )
 logger = logging.getLogger(__name__)
 
@@ -96,6 +102,12 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "port": 8000}
 
+# Metricas do scanner (formato de exposicao do Prometheus)
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Scanner throughput and latency metrics"""
+    return Response(content=metrics.generate_latest(), media_type=metrics.CONTENT_TYPE)
+
 # Detectar se está rodando como executável PyInstaller
 if getattr(sys, 'frozen', False):
     # PyInstaller cria uma pasta temporária e armazena o caminho em _MEIPASS
@@ -111,18 +123,65 @@ frontend_path = os.path.join(base_path, "frontend_dist")
 logger.info(f"Static path: {static_path} (existe: {os.path.exists(static_path)})")
 logger.info(f"Frontend path: {frontend_path} (existe: {os.path.exists(frontend_path)})")
 
-# WebSocket endpoint - DEVE SER REGISTRADO ANTES DO STATICFILES!
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    """WebSocket para sinais em tempo real"""
-    await manager.connect(websocket)
+async def _serve_signals(
+    websocket: WebSocket,
+    username: Optional[str],
+    encoding: Optional[str],
+    since: Optional[int],
+    epoch: Optional[str]
+):
+    """Registra o cliente no hub e aplica as mensagens de assinatura (texto ou binario)"""
+    await ws_manager.connect(websocket, user=username, encoding=encoding, since=since, epoch=epoch)
     try:
         while True:
-            await websocket.receive_text()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            frame = message.get("text")
+            if frame is None:
+                frame = message.get("bytes")
+            if frame is not None:
+                ws_manager.handle_message(websocket, frame)
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        manager.disconnect(websocket)
+        ws_manager.disconnect(websocket)
+
+# WebSocket endpoints - DEVEM SER REGISTRADOS ANTES DO STATICFILES!
+# Um unico hub: ?encoding=json|compact|msgpack (ou subprotocolo gtsniper.<encoding>)
+# Snapshot ao conectar; reconexao com ?epoch=<epoch>&since=<ultimo seq> recebe so o que perdeu
+@app.websocket("/ws")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    encoding: Optional[str] = None,
+    since: Optional[int] = None,
+    epoch: Optional[str] = None
+):
+    """WebSocket para sinais em tempo real (sem token: apenas sinais publicos)"""
+    payload = decode_access_token(token) if token else None
+    username = payload.get("username") if payload else None
+    await _serve_signals(websocket, username, encoding, since, epoch)
+
+# WebSocket de sinais por usuario: ?token=<JWT>, assinaturas por par/timeframe/confianca
+@app.websocket("/ws/signals")
+async def signals_websocket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    encoding: Optional[str] = None,
+    since: Optional[int] = None,
+    epoch: Optional[str] = None
+):
+    """WebSocket com os sinais dos scanners do usuario autenticado"""
+    payload = decode_access_token(token) if token else None
+    username = payload.get("username") if payload else None
+    if not username:
+        await websocket.close(code=1008)
+        return
+
+    await _serve_signals(websocket, username, encoding, since, epoch)
 
 # Montar arquivos estáticos do admin
 if os.path.exists(static_path):
@@ -179,5 +238,6 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=True,
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
     )
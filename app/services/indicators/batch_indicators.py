@@ -0,0 +1,200 @@
+"""
+Batch Technical Indicators
+TechnicalIndicators over many symbols at once: every function takes a
+(symbols, candles) array and returns the indicator of every row. The
+candles are viewed as a DataFrame with one column per symbol and run
+through the indicator definitions of technical_indicators, so pandas
+computes each recurrence in compiled code along the time axis and the
+results are bit-identical to TechnicalIndicators on each row.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from . import technical_indicators as ti
+
+# Candles per block of signal_features: bounds the intermediate arrays
+BLOCK_CELLS = 250_000
+
+
+def _frame(values: np.ndarray) -> pd.DataFrame:
+    """(..., candles) array as a (candles, rows) DataFrame, time-major in memory"""
+    values = np.asarray(values, dtype=float)
+    return pd.DataFrame(np.ascontiguousarray(values.reshape(-1, values.shape[-1]).T))
+
+
+def _array(frame: pd.DataFrame, shape: tuple) -> np.ndarray:
+    """Back to the (..., candles) shape of the input"""
+    return np.ascontiguousarray(frame.to_numpy().T).reshape(shape)
+
+
+def ewm_mean(values: np.ndarray, span: int) -> np.ndarray:
+    """ewm(span, adjust=False).mean() of every row"""
+    return _array(ti.ema(_frame(values), span), np.shape(values))
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """rolling(window).mean() of every row"""
+    return _array(ti.sma(_frame(values), window), np.shape(values))
+
+
+def tail_mean(values: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Series.iloc[start:stop].mean() of every row: NaN skipped, NaN if empty"""
+    window = np.asarray(values, dtype=float)[..., start:stop]
+    missing = window != window
+    count = window.shape[-1] - missing.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(missing, 0.0, window).sum(axis=-1) / count
+
+
+def calculate_ema(close: np.ndarray, period: int) -> np.ndarray:
+    return ewm_mean(close, period)
+
+
+def calculate_sma(close: np.ndarray, period: int) -> np.ndarray:
+    return rolling_mean(close, period)
+
+
+def calculate_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    return _array(ti.atr(_frame(high), _frame(low), _frame(close), period), np.shape(close))
+
+
+def calculate_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    return _array(ti.rsi(_frame(close), period), np.shape(close))
+
+
+def calculate_macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    shape = np.shape(close)
+    return tuple(_array(line, shape) for line in ti.macd(_frame(close), fast, slow, signal))
+
+
+def calculate_stochastic(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    k_period: int = 14,
+    d_period: int = 3
+):
+    shape = np.shape(close)
+    lines = ti.stochastic(_frame(high), _frame(low), _frame(close), k_period, d_period)
+    return tuple(_array(line, shape) for line in lines)
+
+
+def _trend(ema_s: np.ndarray, ema_l: np.ndarray) -> np.ndarray:
+    """detect_trend decision on (candles, rows) EMAs"""
+    trend = np.full(ema_s.shape[1:], "neutral", dtype=object)
+    if ema_s.shape[0] < 3:
+        return trend
+
+    s_last, l_last = ema_s[-1], ema_l[-1]
+    rising = (s_last > ema_s[-3]) & (l_last > ema_l[-3])
+    falling = (s_last < ema_s[-3]) & (l_last < ema_l[-3])
+    trend[(s_last > l_last) & rising] = "bullish"
+    trend[(s_last < l_last) & falling] = "bearish"
+    return trend
+
+
+def _crossover(ma_fast: np.ndarray, ma_slow: np.ndarray) -> np.ndarray:
+    """check_ma_crossover decision on (candles, rows) moving averages"""
+    cross = np.full(ma_fast.shape[1:], "none", dtype=object)
+    if ma_fast.shape[0] < 2:
+        return cross
+
+    fast_current, slow_current = ma_fast[-1], ma_slow[-1]
+    fast_prev, slow_prev = ma_fast[-2], ma_slow[-2]
+    bullish_cross = (fast_prev <= slow_prev) & (fast_current > slow_current)
+    bearish_cross = ~bullish_cross & (fast_prev >= slow_prev) & (fast_current < slow_current)
+    crossed = bullish_cross | bearish_cross
+    # assigned weakest first, so the checks run first in the original win
+    cross[~crossed & (fast_current < slow_current)] = "bearish_aligned"
+    cross[~crossed & (fast_current > slow_current)] = "bullish_aligned"
+    cross[bearish_cross] = "bearish_cross"
+    cross[bullish_cross] = "bullish_cross"
+    return cross
+
+
+def detect_trend(close: np.ndarray, ema_short: int = 20, ema_long: int = 50) -> np.ndarray:
+    """TechnicalIndicators.detect_trend of every row"""
+    frame = _frame(close)
+    trend = _trend(ti.ema(frame, ema_short).to_numpy(), ti.ema(frame, ema_long).to_numpy())
+    return trend.reshape(np.shape(close)[:-1])
+
+
+def check_ma_crossover(close: np.ndarray, fast_period: int = 9, slow_period: int = 21) -> np.ndarray:
+    """TechnicalIndicators.check_ma_crossover of every row"""
+    frame = _frame(close)
+    cross = _crossover(ti.sma(frame, fast_period).to_numpy(), ti.sma(frame, slow_period).to_numpy())
+    return cross.reshape(np.shape(close)[:-1])
+
+
+def signal_features(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    volatility_thresholds=(2.0, 2.5, 4.0),
+    period: int = 5,
+    atr_period: int = 14
+) -> Dict[str, np.ndarray]:
+    """
+    Every indicator value SignalGenerator reads, for every row at once
+
+    Rows are evaluated in blocks of about BLOCK_CELLS candles, so the
+    memory of the full-length intermediate series stays bounded.
+
+    Args:
+        high, low, close, volume: (symbols, candles) arrays
+        volatility_thresholds: is_high_volatility thresholds to evaluate
+        period: Volume comparison period
+        atr_period: ATR period of the volatility check
+
+    Returns:
+        Arrays of one value per symbol: "trend", "rsi", "macd",
+        "macd_signal", "ma_crossover", "stoch_k", "stoch_d",
+        "volume_increasing", "volume_decreasing" and
+        "high_volatility_<threshold>"
+    """
+    rows, n = np.shape(close)
+    step = max(1, BLOCK_CELLS // max(n, 1))
+    if rows <= step:
+        return _block_features(high, low, close, volume, volatility_thresholds, period, atr_period)
+
+    blocks = [
+        _block_features(high[i:i + step], low[i:i + step], close[i:i + step], volume[i:i + step],
+                        volatility_thresholds, period, atr_period)
+        for i in range(0, rows, step)
+    ]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def _block_features(high, low, close, volume, volatility_thresholds, period, atr_period) -> Dict[str, np.ndarray]:
+    n = np.shape(close)[-1]
+    h, l, c = _frame(high), _frame(low), _frame(close)
+    features = {
+        "trend": _trend(ti.ema(c, 20).to_numpy(), ti.ema(c, 50).to_numpy()),
+        "ma_crossover": _crossover(ti.sma(c, 9).to_numpy(), ti.sma(c, 21).to_numpy()),
+        "rsi": ti.rsi(c).to_numpy()[-1],
+    }
+
+    macd_line, signal_line, _ = ti.macd(c)
+    features["macd"] = macd_line.to_numpy()[-1]
+    features["macd_signal"] = signal_line.to_numpy()[-1]
+
+    k_line, d_line = ti.stochastic(h, l, c, k_period=14, d_period=3)
+    features["stoch_k"] = k_line.to_numpy()[-1]
+    features["stoch_d"] = d_line.to_numpy()[-1]
+
+    has_volume = n >= period + 1
+    recent_volume = tail_mean(volume, max(n - period, 0), n)
+    previous_volume = tail_mean(volume, max(n - period * 2, 0), n - period)
+    features["volume_increasing"] = has_volume & (recent_volume > previous_volume * 1.2)
+    features["volume_decreasing"] = has_volume & (recent_volume < previous_volume * 0.8)
+
+    atr = ti.atr(h, l, c, atr_period).to_numpy()[-atr_period:].T
+    current_atr = atr[..., -1]
+    avg_atr = tail_mean(atr, 0, atr.shape[-1])
+    for threshold in volatility_thresholds:
+        features[f"high_volatility_{threshold}"] = (n >= atr_period * 2) & (current_atr > avg_atr * threshold)
+
+    return features
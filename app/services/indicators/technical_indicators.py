@@ -1,9 +1,93 @@
 """
 Technical Indicators Calculator
+
+The module functions define every indicator once, on a Series or on a
+DataFrame with one column per symbol (time along the index): pandas runs
+the same kernel on each column, so TechnicalIndicators (one symbol) and
+batch_indicators (many symbols) give bit-identical values.
 """
 import pandas as pd
 import numpy as np
-from typing import Tuple
+from typing import Tuple, TypeVar
+
+Values = TypeVar("Values", pd.Series, pd.DataFrame)
+
+
+def ema(values: Values, period: int) -> Values:
+    """Exponential Moving Average"""
+    return values.ewm(span=period, adjust=False).mean()
+
+
+def sma(values: Values, period: int) -> Values:
+    """Simple Moving Average"""
+    return values.rolling(window=period).mean()
+
+
+def atr(high: Values, low: Values, close: Values, period: int = 14) -> Values:
+    """Average True Range: rolling mean of the largest of the three ranges"""
+    prev_close = close.shift()
+    high_low = high - low
+    high_close = (high - prev_close).abs()
+    low_close = (low - prev_close).abs()
+
+    # largest range, NaN skipped (high - low on the first candle)
+    true_range = np.fmax(np.fmax(high_low, high_close), low_close)
+    return true_range.rolling(period).mean()
+
+
+def rsi(values: Values, period: int = 14) -> Values:
+    """Relative Strength Index"""
+    delta = values.diff()
+
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def bollinger_bands(values: Values, period: int = 20, std_dev: float = 2.0) -> Tuple[Values, Values, Values]:
+    """Bollinger Bands (upper, middle, lower)"""
+    middle_band = values.rolling(window=period).mean()
+    std = values.rolling(window=period).std()
+
+    upper_band = middle_band + (std * std_dev)
+    lower_band = middle_band - (std * std_dev)
+
+    return upper_band, middle_band, lower_band
+
+
+def macd(values: Values, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[Values, Values, Values]:
+    """MACD (line, signal line, histogram)"""
+    ema_fast = values.ewm(span=fast, adjust=False).mean()
+    ema_slow = values.ewm(span=slow, adjust=False).mean()
+
+    macd_line = ema_fast - ema_slow
+    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    histogram = macd_line - signal_line
+
+    return macd_line, signal_line, histogram
+
+
+def stochastic(
+    high: Values,
+    low: Values,
+    close: Values,
+    k_period: int = 14,
+    d_period: int = 3
+) -> Tuple[Values, Values]:
+    """Stochastic Oscillator (%K, %D)"""
+    # Lowest low and highest high over k_period
+    low_min = low.rolling(window=k_period).min()
+    high_max = high.rolling(window=k_period).max()
+
+    # %K = 100 * (Close - Lowest Low) / (Highest High - Lowest Low)
+    k_percent = 100 * ((close - low_min) / (high_max - low_min))
+
+    # %D = SMA of %K over d_period
+    d_percent = k_percent.rolling(window=d_period).mean()
+
+    return k_percent, d_percent
 
 
 class TechnicalIndicators:
@@ -12,38 +96,22 @@ class TechnicalIndicators:
     @staticmethod
     def calculate_ema(df: pd.DataFrame, period: int, column: str = 'close') -> pd.Series:
         """Calculate Exponential Moving Average"""
-        return df[column].ewm(span=period, adjust=False).mean()
+        return ema(df[column], period)
 
     @staticmethod
     def calculate_sma(df: pd.DataFrame, period: int, column: str = 'close') -> pd.Series:
         """Calculate Simple Moving Average"""
-        return df[column].rolling(window=period).mean()
+        return sma(df[column], period)
 
     @staticmethod
     def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
         """Calculate Average True Range (Volatility)"""
-        high_low = df['high'] - df['low']
-        high_close = np.abs(df['high'] - df['close'].shift())
-        low_close = np.abs(df['low'] - df['close'].shift())
-
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(period).mean()
-
-        return atr
+        return atr(df['high'], df['low'], df['close'], period)
 
     @staticmethod
     def calculate_rsi(df: pd.DataFrame, period: int = 14, column: str = 'close') -> pd.Series:
         """Calculate Relative Strength Index"""
-        delta = df[column].diff()
-
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi
+        return rsi(df[column], period)
 
     @staticmethod
     def calculate_bollinger_bands(
@@ -53,13 +121,7 @@ class TechnicalIndicators:
         column: str = 'close'
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calculate Bollinger Bands"""
-        middle_band = df[column].rolling(window=period).mean()
-        std = df[column].rolling(window=period).std()
-
-        upper_band = middle_band + (std * std_dev)
-        lower_band = middle_band - (std * std_dev)
-
-        return upper_band, middle_band, lower_band
+        return bollinger_bands(df[column], period, std_dev)
 
     @staticmethod
     def calculate_macd(
@@ -70,14 +132,7 @@ class TechnicalIndicators:
         column: str = 'close'
     ) -> Tuple[pd.Series, pd.Series, pd.Series]:
         """Calculate MACD"""
-        ema_fast = df[column].ewm(span=fast, adjust=False).mean()
-        ema_slow = df[column].ewm(span=slow, adjust=False).mean()
-
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-        histogram = macd_line - signal_line
-
-        return macd_line, signal_line, histogram
+        return macd(df[column], fast, slow, signal)
 
     @staticmethod
     def detect_trend(df: pd.DataFrame, ema_short: int = 20, ema_long: int = 50) -> str:
@@ -154,17 +209,7 @@ class TechnicalIndicators:
         Returns:
             Tuple[pd.Series, pd.Series]: (%K line, %D line)
         """
-        # Lowest low and highest high over k_period
-        low_min = df['low'].rolling(window=k_period).min()
-        high_max = df['high'].rolling(window=k_period).max()
-
-        # %K = 100 * (Close - Lowest Low) / (Highest High - Lowest Low)
-        k_percent = 100 * ((df[column] - low_min) / (high_max - low_min))
-
-        # %D = SMA of %K over d_period
-        d_percent = k_percent.rolling(window=d_period).mean()
-
-        return k_percent, d_percent
+        return stochastic(df['high'], df['low'], df[column], k_period, d_period)
 
     @staticmethod
     def check_ma_crossover(
@@ -1,11 +1,13 @@
 """IQ Option Integration Package"""
 from .iqoption_client import IQOptionClient
+from .candle_hub import CandleHub
 from .session_manager import IQOptionSessionManager, get_session_manager
 from .encryption import CredentialEncryption, get_encryption
 
 __all__ = [
     'IQOptionClient',
     'IQOptionSessionManager',
+    'CandleHub',
     'get_session_manager',
     'CredentialEncryption',
     'get_encryption'
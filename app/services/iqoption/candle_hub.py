@@ -0,0 +1,162 @@
+"""IQ Option Candle Hub - Shared market data for every scanning user"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+import logging
+import pandas as pd
+
+if TYPE_CHECKING:
+    from .session_manager import IQOptionSessionManager
+
+logger = logging.getLogger(__name__)
+
+CandleKey = Tuple[str, int]
+
+
+class CandleHub:
+    """
+    Process-wide candle multiplexer keyed by (symbol, timeframe)
+
+    Candles are public market data, so every user scanning the same pair can
+    share one fetch:
+    - concurrent requests for a key join the fetch already in flight
+      (single-flight) instead of sending their own;
+    - a fetched frame is reused for ``max_age`` seconds;
+    - the fetch runs on the requester's session when it is healthy, falling
+      back to any other healthy session;
+    - pairs asked for are streamed into the session's candle ring buffer, so
+      later fetches read it instead of sending get-candles;
+    - every fresh frame is fanned out to the callbacks subscribed to the key.
+    """
+
+    def __init__(
+        self,
+        session_manager: "IQOptionSessionManager",
+        max_age: float = 5.0,
+        max_attempts: int = 3
+    ):
+        self.session_manager = session_manager
+        self.max_age = max_age
+        self.max_attempts = max_attempts
+        self._cache: Dict[CandleKey, Tuple[float, pd.DataFrame]] = {}
+        self._inflight: Dict[CandleKey, Tuple[int, asyncio.Future]] = {}
+        self._subscribers: Dict[CandleKey, List[Callable[[str, int, pd.DataFrame], None]]] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "buffer_reads": 0, "fetches": 0}
+
+    async def get_candles(
+        self,
+        symbol: str,
+        timeframe: int = 60,
+        count: int = 100,
+        preferred: Optional[str] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get the last ``count`` candles of a pair. Timeframe expected in seconds.
+
+        Args:
+            symbol: Trading pair (e.g., 'EURUSD-OTC')
+            timeframe: Candle size in seconds
+            count: Number of candles wanted
+            preferred: Username whose session should serve the fetch
+
+        Returns:
+            DataFrame with OHLCV data, None if no session could fetch it
+        """
+        key = (symbol, max(timeframe, 60))
+        self.stats["requests"] += 1
+
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.max_age and len(cached[1]) >= count:
+            self.stats["cache_hits"] += 1
+            return cached[1].tail(count)
+
+        inflight = self._inflight.get(key)
+        if inflight and inflight[0] >= count:
+            self.stats["coalesced"] += 1
+            candles = await asyncio.shield(inflight[1])
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = (count, future)
+            candles = None
+            try:
+                candles = await self._fetch(key, count, preferred)
+            except Exception as exc:
+                logger.error("Candle fetch failed for %s %ss: %s", key[0], key[1], exc)
+            finally:
+                if self._inflight.get(key, (None, None))[1] is future:
+                    del self._inflight[key]
+                future.set_result(candles)
+
+            if candles is not None:
+                self._cache[key] = (time.monotonic(), candles)
+                self._publish(key, candles)
+
+        if candles is None:
+            return None
+        return candles.tail(count)
+
+    def subscribe(self, symbol: str, timeframe: int, callback: Callable[[str, int, pd.DataFrame], None]):
+        """Call callback(symbol, timeframe, candles) on every fresh fetch of a pair"""
+        self._subscribers.setdefault((symbol, max(timeframe, 60)), []).append(callback)
+
+    def unsubscribe(self, symbol: str, timeframe: int, callback: Callable[[str, int, pd.DataFrame], None]):
+        """Stop calling callback for a pair"""
+        key = (symbol, max(timeframe, 60))
+        callbacks = self._subscribers.get(key, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscribers.pop(key, None)
+
+    def clear(self):
+        """Drop every cached frame"""
+        self._cache.clear()
+
+    def _healthy_sessions(self, preferred: Optional[str]) -> List[str]:
+        """Usernames of connected sessions, the preferred one first"""
+        sessions = self.session_manager.sessions
+        usernames = [
+            username for username, client in list(sessions.items())
+            if client.is_connected and not client.awaiting_two_factor
+        ]
+        if preferred in usernames:
+            usernames.remove(preferred)
+            usernames.insert(0, preferred)
+        return usernames
+
+    async def _fetch(self, key: CandleKey, count: int, preferred: Optional[str]) -> Optional[pd.DataFrame]:
+        symbol, timeframe = key
+        timeframe_minutes = max(1, timeframe // 60)
+
+        for username in self._healthy_sessions(preferred)[:self.max_attempts]:
+            client = self.session_manager.sessions.get(username)
+            if client is None:
+                continue
+
+            # streamed pairs are read from the session's ring buffer
+            candles = client.read_candle_buffer(symbol, timeframe_minutes, count)
+            if candles is not None:
+                self.stats["buffer_reads"] += 1
+                return candles
+            client.watch_candles(symbol, timeframe_minutes, capacity=count)
+
+            self.stats["fetches"] += 1
+            try:
+                candles = await client.get_candles(symbol, timeframe_minutes, count)
+            except Exception as exc:
+                logger.warning("Session %s failed to fetch %s %ss: %s", username, symbol, timeframe, exc)
+                continue
+            if candles is None or len(candles) == 0:
+                continue
+            if not isinstance(candles, pd.DataFrame):
+                candles = pd.DataFrame(candles)
+            return candles
+
+        return None
+
+    def _publish(self, key: CandleKey, candles: pd.DataFrame):
+        for callback in list(self._subscribers.get(key, ())):
+            try:
+                callback(key[0], key[1], candles)
+            except Exception as exc:
+                logger.error("Candle subscriber failed for %s %ss: %s", key[0], key[1], exc)
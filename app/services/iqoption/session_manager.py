@@ -1,11 +1,12 @@
 """IQ Option Session Manager - Multi-user support"""
 import asyncio
+import time
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 import logging
-import pandas as pd
 
 from ..scanner.iqoption_client import IQOptionClient
+from .candle_hub import CandleHub
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,7 @@ class IQOptionSessionManager:
         self.account_types: Dict[str, str] = {}
         self.cleanup_task: Optional[asyncio.Task] = None
         self.timeout_minutes = 30  # Session timeout
+        self.candle_hub = CandleHub(self)
 
     async def start(self):
         """Start the session manager"""
@@ -36,6 +38,8 @@ class IQOptionSessionManager:
         for username in list(self.sessions.keys()):
             await self.disconnect_user(username)
 
+        self.candle_hub.clear()
+
     async def connect_user(
         self,
         username: str,
@@ -151,6 +155,13 @@ class IQOptionSessionManager:
             self.session_timeouts[username] = datetime.now()
         return client
 
+    def get_server_time(self, username: str) -> float:
+        """IQ Option server time (epoch seconds) seen by a user's session"""
+        client = self.sessions.get(username)
+        if client is None:
+            return time.time()
+        return client.server_time()
+
     def is_connected(self, username: str) -> bool:
         """Check if user is connected"""
         client = self.sessions.get(username)
@@ -196,22 +207,22 @@ class IQOptionSessionManager:
         timeframe: int = 60,
         count: int = 100
     ):
-        """Get candles for a user. Timeframe expected in seconds."""
+        """
+        Get candles for a user. Timeframe expected in seconds.
+
+        Served by the shared candle hub: users scanning the same pair share
+        one fetch, made on this user's session when it is healthy.
+        """
         client = self.get_client(username)
         if not client:
             return None
 
-        timeframe_seconds = max(timeframe, 60)
-        timeframe_minutes = max(1, timeframe_seconds // 60)
-
-        candles = await client.get_candles(symbol, timeframe_minutes, count)
-        if not candles:
-            return None
-
-        if isinstance(candles, pd.DataFrame):
-            return candles
-
-        return pd.DataFrame(candles)
+        return await self.candle_hub.get_candles(
+            symbol,
+            timeframe=timeframe,
+            count=count,
+            preferred=username
+        )
 
     def get_active_sessions(self) -> list:
         """Get list of active sessions"""
@@ -23,6 +23,8 @@ from .http.buyback import Buyback
 from .http.changebalance import Changebalance
 from .http.events import Events
 from .ws.client import WebsocketClient
+from .waiter import ResponseWaiter
+from .candle_buffer import CandleBuffers
 from .ws.chanels.get_balances import *
 
 from .ws.chanels.ssid import Ssid
@@ -66,7 +68,7 @@ from .ws.objects.profile import Profile
 from .ws.objects.candles import Candles
 from .ws.objects.listinfodata import ListInfoData
 from .ws.objects.betinfo import Game_betinfo_data
-from . import global_value
+from .global_value import GlobalValue
 from collections import defaultdict
 
 
@@ -87,80 +89,87 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
     """Class for communication with IQ Option API."""
 
     # pylint: disable=too-many-public-methods
-    socket_option_opened = {}
-    socket_option_closed = {}
-    timesync = TimeSync()
-    profile = Profile()
-    candles = Candles()
-    listinfodata = ListInfoData()
-    api_option_init_all_result = []
-    api_option_init_all_result_v2 = []
-    # for digital
-    underlying_list_data = None
-    position_changed = None
-    instrument_quites_generated_data = nested_dict(2, dict)
-    instrument_quotes_generated_raw_data = nested_dict(2, dict)
-    instrument_quites_generated_timestamp = nested_dict(2, dict)
-    strike_list = None
-    leaderboard_deals_client = None
-    #position_changed_data = nested_dict(2, dict)
-    # microserviceName_binary_options_name_option=nested_dict(2,dict)
-    order_async = nested_dict(2, dict)
-    order_binary = {}
-    game_betinfo = Game_betinfo_data()
-    instruments = None
-    financial_information = None
-    buy_id = None
-    buy_order_id = None
-    traders_mood = {}  # get hight(put) %
-    technical_indicators = {}
-    order_data = None
-    positions = None
-    position = None
-    deferred_orders = None
-    position_history = None
-    position_history_v2 = None
-    available_leverages = None
-    order_canceled = None
-    close_position_data = None
-    overnight_fee = None
-    # ---for real time
-    digital_option_placed_id = {}
-    live_deal_data = nested_dict(3, deque)
-
-    subscribe_commission_changed_data = nested_dict(2, dict)
-    real_time_candles = nested_dict(3, dict)
-    real_time_candles_maxdict_table = nested_dict(2, dict)
-    candle_generated_check = nested_dict(2, dict)
-    candle_generated_all_size_check = nested_dict(1, dict)
-    # ---for api_game_getoptions_result
-    api_game_getoptions_result = None
-    sold_options_respond = None
-    sold_digital_options_respond = None
-    tpsl_changed_respond = None
-    auto_margin_call_changed_respond = None
-    top_assets_updated_data = {}
-    get_options_v2_data = None
-    # --for binary option multi buy
-    buy_multi_result = None
-    buy_multi_option = {}
-    #
-    result = None
-    training_balance_reset_request = None
-    balances_raw = None
-    user_profile_client = None
-    leaderboard_userinfo_deals_client = None
-    users_availability = None
-    # ------------------
-    digital_payout = None
-
-    def __init__(self, host, username, password, proxies=None):
+
+    def __init__(self, host, username, password, proxies=None, global_value=None):
         """
         :param str host: The hostname or ip address of a IQ Option server.
         :param str username: The username of a IQ Option server.
         :param str password: The password of a IQ Option server.
         :param dict proxies: (optional) The http request proxies.
+        :param global_value: (optional) The :class:`GlobalValue
+            <iqoptionapi.global_value.GlobalValue>` of the session, kept
+            across reconnects by :class:`IQ_Option`.
         """
+        # every response slot belongs to this connection, so several
+        # sessions in one process do not overwrite each other
+        self.socket_option_opened = {}
+        self.socket_option_closed = {}
+        self.timesync = TimeSync()
+        self.profile = Profile()
+        self.candles = Candles()
+        self.listinfodata = ListInfoData()
+        self.api_option_init_all_result = []
+        self.api_option_init_all_result_v2 = []
+        # for digital
+        self.underlying_list_data = None
+        self.position_changed = None
+        self.instrument_quites_generated_data = nested_dict(2, dict)
+        self.instrument_quotes_generated_raw_data = nested_dict(2, dict)
+        self.instrument_quites_generated_timestamp = nested_dict(2, dict)
+        self.strike_list = None
+        self.leaderboard_deals_client = None
+        #position_changed_data = nested_dict(2, dict)
+        # microserviceName_binary_options_name_option=nested_dict(2,dict)
+        self.order_async = nested_dict(2, dict)
+        self.order_binary = {}
+        self.game_betinfo = Game_betinfo_data()
+        self.instruments = None
+        self.financial_information = None
+        self.buy_id = None
+        self.buy_order_id = None
+        self.traders_mood = {}  # get hight(put) %
+        self.technical_indicators = {}
+        self.order_data = None
+        self.positions = None
+        self.position = None
+        self.deferred_orders = None
+        self.position_history = None
+        self.position_history_v2 = None
+        self.available_leverages = None
+        self.order_canceled = None
+        self.close_position_data = None
+        self.overnight_fee = None
+        # ---for real time
+        self.digital_option_placed_id = {}
+        self.live_deal_data = nested_dict(3, deque)
+        self.subscribe_commission_changed_data = nested_dict(2, dict)
+        self.real_time_candles = nested_dict(3, dict)
+        self.real_time_candles_maxdict_table = nested_dict(2, dict)
+        self.candle_generated_check = nested_dict(2, dict)
+        self.candle_generated_all_size_check = nested_dict(1, dict)
+        self.candle_buffers = CandleBuffers()
+        # ---for api_game_getoptions_result
+        self.api_game_getoptions_result = None
+        self.sold_options_respond = None
+        self.sold_digital_options_respond = None
+        self.tpsl_changed_respond = None
+        self.auto_margin_call_changed_respond = None
+        self.top_assets_updated_data = {}
+        self.get_options_v2_data = None
+        # --for binary option multi buy
+        self.buy_multi_result = None
+        self.buy_multi_option = {}
+        #
+        self.result = None
+        self.training_balance_reset_request = None
+        self.balances_raw = None
+        self.user_profile_client = None
+        self.leaderboard_userinfo_deals_client = None
+        self.users_availability = None
+        # ------------------
+        self.digital_payout = None
+        self.global_value = global_value if global_value is not None else GlobalValue()
+
         self.https_url = "https://{host}/api".format(host=host)
         self.wss_url = "wss://{host}/echo/websocket".format(host=host)
         self.websocket_client = None
@@ -178,6 +187,17 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         # If it is true, the last buy order was successful
         self.buy_successful = None
         self.__active_account_type = None
+        self.response_waiter = ResponseWaiter()
+
+    def wait_for(self, predicate, timeout=None):
+        """Block until predicate() is true or the timeout expires.
+
+        :param predicate: The callable checked after every websocket frame.
+        :param timeout: (optional) The max seconds to wait, None for ever.
+
+        :returns: True if the predicate became true, False on timeout.
+        """
+        return self.response_waiter.wait_for(predicate, timeout)
 
     def prepare_http_url(self, resource):
         """Construct http url from resource url.
@@ -271,12 +291,19 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         data = json.dumps(dict(name=name,
                                msg=msg, request_id=request_id))
 
-        while (global_value.ssl_Mutual_exclusion or global_value.ssl_Mutual_exclusion_write) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
-        logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+        condition = self.response_waiter.condition
+        with condition:
+            if no_force_send:
+                condition.wait_for(lambda: not (
+                    self.global_value.ssl_Mutual_exclusion or self.global_value.ssl_Mutual_exclusion_write))
+            self.global_value.ssl_Mutual_exclusion_write = True
+        try:
+            self.websocket.send(data)
+            logger.debug(data)
+        finally:
+            with condition:
+                self.global_value.ssl_Mutual_exclusion_write = False
+                condition.notify_all()
 
     @property
     def logout(self):
@@ -772,9 +799,9 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         requests.utils.add_dict_to_cookiejar(self.session.cookies, cookies)
 
     def start_websocket(self):
-        global_value.check_websocket_if_connect = None
-        global_value.check_websocket_if_error = False
-        global_value.websocket_error_reason = None
+        self.global_value.check_websocket_if_connect = None
+        self.global_value.check_websocket_if_error = False
+        self.global_value.websocket_error_reason = None
 
         self.websocket_client = WebsocketClient(self)
 
@@ -782,18 +809,13 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
                                                  "check_hostname": False, "cert_reqs": ssl.CERT_NONE, "ca_certs": "cacert.pem"}})  # for fix pyinstall error: cafile, capath and cadata cannot be all omitted
         self.websocket_thread.daemon = True
         self.websocket_thread.start()
-        while True:
-            try:
-                if global_value.check_websocket_if_error:
-                    return False, global_value.websocket_error_reason
-                if global_value.check_websocket_if_connect == 0:
-                    return False, "Websocket connection closed."
-                elif global_value.check_websocket_if_connect == 1:
-                    return True, None
-            except:
-                pass
-
-            pass
+        self.wait_for(lambda: self.global_value.check_websocket_if_error or
+                      self.global_value.check_websocket_if_connect in (0, 1))
+        if self.global_value.check_websocket_if_error:
+            return False, self.global_value.websocket_error_reason
+        if self.global_value.check_websocket_if_connect == 0:
+            return False, "Websocket connection closed."
+        return True, None
 
     # @tokensms.setter
     def setTokenSMS(self, response):
@@ -822,9 +844,8 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def send_ssid(self):
         self.profile.msg = None
-        self.ssid(global_value.SSID)  # pylint: disable=not-callable
-        while self.profile.msg == None:
-            pass
+        self.ssid(self.global_value.SSID)  # pylint: disable=not-callable
+        self.wait_for(lambda: self.profile.msg != None)
         if self.profile.msg == False:
             return False
         else:
@@ -832,8 +853,8 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def connect(self):
 
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
+        self.global_value.ssl_Mutual_exclusion = False
+        self.global_value.ssl_Mutual_exclusion_write = False
         """Method for connection to IQ Option API."""
         try:
             self.close()
@@ -845,7 +866,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
             return check_websocket, websocket_reason
 
         # doing temp ssid reconnect for speed up
-        if global_value.SSID != None:
+        if self.global_value.SSID != None:
 
             check_ssid = self.send_ssid()
 
@@ -853,7 +874,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
                 # ssdi time out need reget,if sent error ssid,the weksocket will close by iqoption server
                 response = self.get_ssid()
                 try:
-                    global_value.SSID = response.cookies["ssid"]
+                    self.global_value.SSID = response.cookies["ssid"]
                 except:
                     return False, response.text
                 atexit.register(self.logout)
@@ -864,7 +885,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         else:
             response = self.get_ssid()
             try:
-                global_value.SSID = response.cookies["ssid"]
+                self.global_value.SSID = response.cookies["ssid"]
             except:
                 self.close()
                 return False, response.text
@@ -873,7 +894,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
         # set ssis cookie
         requests.utils.add_dict_to_cookiejar(
-            self.session.cookies, {"ssid": global_value.SSID})
+            self.session.cookies, {"ssid": self.global_value.SSID})
 
         self.timesync.server_timestamp = None
         while True:
@@ -0,0 +1,194 @@
+"""Module for IQ Option real time candle ring buffers."""
+import threading
+import time
+
+import numpy as np
+
+# row order of the buffer arrays
+FIELDS = ("from", "open", "high", "low", "close", "volume")
+
+
+def candle_row(candle):
+    """Function to convert an IQ Option candle dict to a buffer row.
+
+    :param dict candle: The candle as sent by "candles", "candle-generated"
+        or "candles-generated" (prices in open/close/min/max).
+    """
+    return (
+        float(candle["from"]),
+        float(candle["open"]),
+        float(candle["max"]),
+        float(candle["min"]),
+        float(candle["close"]),
+        float(candle.get("volume", 0)),
+    )
+
+
+class CandleBuffer(object):
+    """Class for a fixed capacity OHLCV ring buffer of one (active, size).
+
+    Every value is written twice, at ``i`` and ``i + capacity``, so the
+    buffered candles are always the contiguous slice
+    ``data[:, start:start + size]``: :meth:`view` never copies and updates
+    are O(1) in place.
+
+    A streamed candle more than one candle after the last one (frames lost)
+    restarts the buffer from that candle and sets :attr:`gap` until the
+    next :meth:`seed`, so readers never get candles with holes.
+    """
+
+    def __init__(self, capacity, size=None):
+        """
+        :param int capacity: The max number of candles kept.
+        :param size: (optional) The candle size in seconds, for gap checks.
+        """
+        self.capacity = int(capacity)
+        self.size = size
+        self.updated_at = None
+        self.gap = False
+        self.__data = np.zeros((len(FIELDS), 2 * self.capacity), dtype=np.float64)
+        self.__start = 0
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return self.__size
+
+    @property
+    def lock(self):
+        """Property to get the lock held while the buffer is written."""
+        return self.__lock
+
+    def seed(self, candles):
+        """Method to fill the buffer with history candles.
+
+        Candles streamed since the subscription (already in the buffer)
+        are kept over the history ones of the same time, so the stream can
+        be subscribed before the history is requested without losing the
+        candles that closed in between.
+
+        :param candles: The list of candles returned by get_candles.
+        """
+        history = [candle_row(candle) for candle in candles or ()]
+        with self.__lock:
+            rows = {row[0]: row for row in history}
+            rows.update((row[0], tuple(row)) for row in self.view().T.tolist())
+            rows = [rows[key] for key in sorted(rows)][-self.capacity:]
+            self.__start = 0
+            self.__size = 0
+            for row in rows:
+                self.__write(self.__size, row)
+                self.__size += 1
+            self.gap = False
+            self.updated_at = time.monotonic()
+
+    def update(self, candle):
+        """Method to apply one streamed candle.
+
+        The candle in progress is overwritten in place, a newer one is
+        appended (dropping the oldest when full) and a late update of an
+        older candle still in the window is written at its slot.
+
+        :param dict candle: The streamed candle.
+        """
+        row = candle_row(candle)
+        with self.__lock:
+            last = self.__size - 1
+            if self.__size and self.size and row[0] - self.__data[0, self.__start + last] > self.size:
+                # missed candles: restart from this one until seeded again
+                self.__start = 0
+                self.__size = 0
+                self.gap = True
+                self.__append(row)
+            elif self.__size == 0 or row[0] > self.__data[0, self.__start + last]:
+                self.__append(row)
+            elif row[0] == self.__data[0, self.__start + last]:
+                self.__write(last, row)
+            else:
+                times = self.__data[0, self.__start:self.__start + self.__size]
+                index = int(np.searchsorted(times, row[0]))
+                if index < self.__size and times[index] == row[0]:
+                    self.__write(index, row)
+            self.updated_at = time.monotonic()
+
+    def view(self, count=None):
+        """Method to get the last candles without copying.
+
+        The view follows the buffer, read it under :attr:`lock` (or use
+        :meth:`snapshot`) when the websocket thread may be writing.
+
+        :param count: (optional) The number of last candles, all if None.
+
+        :returns: The (len(FIELDS), n) array of rows in FIELDS order.
+        """
+        count = self.__size if count is None else min(int(count), self.__size)
+        end = self.__start + self.__size
+        return self.__data[:, end - count:end]
+
+    def snapshot(self, count=None):
+        """Method to get a consistent copy of the last candles.
+
+        :returns: The (len(FIELDS), n) array of rows in FIELDS order.
+        """
+        with self.__lock:
+            return self.view(count).copy()
+
+    def age(self):
+        """Method to get the seconds since the last write, None if never."""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def __write(self, index, row):
+        position = (self.__start + index) % self.capacity
+        self.__data[:, position] = row
+        self.__data[:, position + self.capacity] = row
+
+    def __append(self, row):
+        if self.__size < self.capacity:
+            self.__write(self.__size, row)
+            self.__size += 1
+        else:
+            self.__write(self.__size, row)
+            self.__start = (self.__start + 1) % self.capacity
+
+
+class CandleBuffers(object):
+    """Class for the ring buffers of every streamed (active, size)."""
+
+    def __init__(self):
+        self.__buffers = {}
+        self.__lock = threading.Lock()
+
+    def create(self, active, size, capacity):
+        """Method to get the buffer of (active, size), creating it if missing.
+
+        :returns: The instance of :class:`CandleBuffer`.
+        """
+        key = (str(active), int(size))
+        with self.__lock:
+            buffer = self.__buffers.get(key)
+            if buffer is None or buffer.capacity < capacity:
+                buffer = CandleBuffer(capacity, int(size))
+                self.__buffers[key] = buffer
+            return buffer
+
+    def get(self, active, size):
+        """Method to get the buffer of (active, size), None if not streamed."""
+        return self.__buffers.get((str(active), int(size)))
+
+    def remove(self, active, size):
+        """Method to drop the buffer of (active, size)."""
+        with self.__lock:
+            self.__buffers.pop((str(active), int(size)), None)
+
+    def update(self, active, size, candle):
+        """Method to feed a streamed candle to its buffer, if any.
+
+        :returns: True if a buffer was updated.
+        """
+        buffer = self.__buffers.get((str(active), int(size)))
+        if buffer is None:
+            return False
+        buffer.update(candle)
+        return True
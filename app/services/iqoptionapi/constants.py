@@ -1,7 +1,69 @@
 ""
 "Module for IQ Option API constants."
-""#~~~need to update~~~
-ACTIVES = {
+""
+
+
+class ActivesRegistry(dict):
+    """ACTIVES dict (name -> active_id) that also indexes active_id -> name.
+
+    Stream handlers resolve names of streamed active ids with
+    :meth:`get_name` in O(1). The reverse index is rebuilt lazily after any
+    change other than adding a new name, so refreshes through
+    ``update_ACTIVES_OPCODE`` keep it in sync.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(ActivesRegistry, self).__init__(*args, **kwargs)
+        self.__names = None
+
+    def get_name(self, active_id):
+        """Return the first name mapped to active_id (KeyError if none)."""
+        names = self.__names
+        if names is None:
+            names = {}
+            for name, value in self.items():
+                names.setdefault(value, name)
+            self.__names = names
+        return names[active_id]
+
+    def __setitem__(self, name, active_id):
+        is_new = name not in self
+        if not is_new and self[name] == active_id:
+            return
+        super(ActivesRegistry, self).__setitem__(name, active_id)
+        if is_new and self.__names is not None:
+            self.__names.setdefault(active_id, name)
+        else:
+            self.__names = None
+
+    def __delitem__(self, name):
+        super(ActivesRegistry, self).__delitem__(name)
+        self.__names = None
+
+    def update(self, *args, **kwargs):
+        super(ActivesRegistry, self).update(*args, **kwargs)
+        self.__names = None
+
+    def setdefault(self, name, active_id=None):
+        if name not in self:
+            self[name] = active_id
+        return self[name]
+
+    def pop(self, *args):
+        self.__names = None
+        return super(ActivesRegistry, self).pop(*args)
+
+    def popitem(self):
+        self.__names = None
+        return super(ActivesRegistry, self).popitem()
+
+    def clear(self):
+        super(ActivesRegistry, self).clear()
+        self.__names = None
+
+
+#~~~need to update~~~
+ACTIVES = ActivesRegistry({
 	"EURUSD": 1,
 	"EURGBP": 2,
 	"GBPJPY": 3,
@@ -384,4 +446,4 @@ ACTIVES = {
 	"USDHKD-OTC": 1382,
 	"USDINR-OTC": 1383,
 	"DOGEUSD-L": 1406,
-}
+})
@@ -1,14 +1,26 @@
 #python
-check_websocket_if_connect=None
-# try fix ssl.SSLEOFError: EOF occurred in violation of protocol (_ssl.c:2361)
-ssl_Mutual_exclusion=False#mutex read write
-#if false websocket can sent self.websocket.send(data)
-#else can not sent self.websocket.send(data)
-ssl_Mutual_exclusion_write=False#if thread wirite 
 
-SSID=None
 
-check_websocket_if_error=False
-websocket_error_reason=None
+class GlobalValue(object):
+    """Connection state of one IQ Option session.
 
-balance_id=None
\ No newline at end of file
+    These used to be module level variables, so every IQ_Option of the
+    process shared them. Each IQ_Option now owns one instance and hands it
+    to every IQOptionAPI it creates, so the ssid and the selected balance
+    survive reconnects without leaking to other sessions.
+    """
+
+    def __init__(self):
+        self.check_websocket_if_connect = None
+        # try fix ssl.SSLEOFError: EOF occurred in violation of protocol (_ssl.c:2361)
+        self.ssl_Mutual_exclusion = False  # mutex read write
+        # if false websocket can sent self.websocket.send(data)
+        # else can not sent self.websocket.send(data)
+        self.ssl_Mutual_exclusion_write = False  # if thread wirite
+
+        self.SSID = None
+
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
+
+        self.balance_id = None
@@ -7,9 +7,10 @@ import time
 import json
 import logging
 import operator
-from . import global_value as global_value
+from .global_value import GlobalValue
 from collections import defaultdict
 from collections import deque
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from .expiration import get_expiration_time, get_remaning_time
 from .version_control import api_version
 from datetime import datetime, timedelta
@@ -32,6 +33,9 @@ class IQ_Option:
         self.email = email
         self.password = password
         self.suspend = 0.5
+        # ssid, balance and websocket state of this session only
+        self.global_value = GlobalValue()
+        self.candles_timeout = 10
         self.thread = None
         self.subscribe_candle = []
         self.subscribe_candle_all_size = []
@@ -79,6 +83,7 @@ class IQ_Option:
         self.SESSION_COOKIE = cookie
 
     def connect(self, sms_code=None):
+        previous = getattr(self, "api", None)
         try:
             self.api.close()
         except:
@@ -86,7 +91,11 @@ class IQ_Option:
             # logging.error('**warning** self.api.close() fail')
 
         self.api = IQOptionAPI(
-            "iqoption.com", self.email, self.password)
+            "iqoption.com", self.email, self.password,
+            global_value=self.global_value)
+        # waiters of the old api re-check their predicate against the new one
+        if previous is not None:
+            previous.response_waiter.notify()
         check = None
 
         # 2FA--
@@ -107,11 +116,10 @@ class IQ_Option:
             self.re_subscribe_stream()
 
             # ---------for async get name: "position-changed", microserviceName
-            while global_value.balance_id == None:
-                pass
+            self.api.wait_for(lambda: self.global_value.balance_id != None)
 
             self.position_change_all(
-                "subscribeMessage", global_value.balance_id)
+                "subscribeMessage", self.global_value.balance_id)
 
             self.order_changed_all("subscribeMessage")
             self.api.setOptions(1, True)
@@ -159,7 +167,7 @@ class IQ_Option:
         # True/False
         # if not connected, sometimes it's None, sometimes its '0', so
         # both will fall on this first case
-        if not global_value.check_websocket_if_connect:
+        if not self.global_value.check_websocket_if_connect:
             return False
         else:
             return True
@@ -177,7 +185,7 @@ class IQ_Option:
         dicc = {}
         for lis in sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1)):
             dicc[lis[0]] = lis[1]
-        OP_code.ACTIVES = dicc
+        OP_code.ACTIVES = OP_code.ActivesRegistry(dicc)
 
     def get_name_by_activeId(self, activeId):
         info = self.get_financial_information(activeId)
@@ -189,8 +197,7 @@ class IQ_Option:
     def get_financial_information(self, activeId):
         self.api.financial_information = None
         self.api.get_financial_information(activeId)
-        while self.api.financial_information == None:
-            pass
+        self.api.wait_for(lambda: self.api.financial_information != None)
         return self.api.financial_information
 
     def get_leader_board(self, country, from_position, to_position, near_traders_count, user_country_id=0, near_traders_country_count=0, top_country_count=0, top_count=0, top_type=2):
@@ -200,8 +207,7 @@ class IQ_Option:
         self.api.Get_Leader_Board(country_id, user_country_id, from_position, to_position,
                                   near_traders_country_count, near_traders_count, top_country_count, top_count, top_type)
 
-        while self.api.leaderboard_deals_client == None:
-            pass
+        self.api.wait_for(lambda: self.api.leaderboard_deals_client != None)
         return self.api.leaderboard_deals_client
 
     def get_instruments(self, type):
@@ -211,9 +217,7 @@ class IQ_Option:
         while self.api.instruments == None:
             try:
                 self.api.get_instruments(type)
-                start = time.time()
-                while self.api.instruments == None and time.time() - start < 10:
-                    pass
+                self.api.wait_for(lambda: self.api.instruments != None, 10)
             except:
                 logging.error('**error** api.get_instruments need reconnect')
                 self.connect()
@@ -249,16 +253,8 @@ class IQ_Option:
                     logging.error('**error** get_all_init need reconnect')
                     self.connect()
                     time.sleep(5)
-            start = time.time()
-            while True:
-                if time.time() - start > 30:
-                    logging.error('**warning** get_all_init late 30 sec')
-                    break
-                try:
-                    if self.api.api_option_init_all_result != None:
-                        break
-                except:
-                    pass
+            if not self.api.wait_for(lambda: self.api.api_option_init_all_result != None, 30):
+                logging.error('**warning** get_all_init late 30 sec')
             try:
                 if self.api.api_option_init_all_result["isSuccessful"] == True:
                     return self.api.api_option_init_all_result
@@ -272,11 +268,9 @@ class IQ_Option:
             self.connect()
 
         self.api.get_api_option_init_all_v2()
-        start_t = time.time()
-        while self.api.api_option_init_all_result_v2 == None:
-            if time.time() - start_t >= 30:
-                logging.error('**warning** get_all_init_v2 late 30 sec')
-                return None
+        if not self.api.wait_for(lambda: self.api.api_option_init_all_result_v2 != None, 30):
+            logging.error('**warning** get_all_init_v2 late 30 sec')
+            return None
         return self.api.api_option_init_all_result_v2
 
         # return OP_code.ACTIVES
@@ -391,8 +385,7 @@ class IQ_Option:
     # ______________________________________self.api.getprofile() https________________________________
 
     def get_profile_ansyc(self):
-        while self.api.profile.msg == None:
-            pass
+        self.api.wait_for(lambda: self.api.profile.msg != None)
         return self.api.profile.msg
 
     """def get_profile(self):
@@ -411,11 +404,11 @@ class IQ_Option:
     def get_currency(self):
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.global_value.balance_id:
                 return balance["currency"]
 
     def get_balance_id(self):
-        return global_value.balance_id
+        return self.global_value.balance_id
 
     """ def get_balance(self):
         self.api.profile.balance = None
@@ -434,21 +427,20 @@ class IQ_Option:
 
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.global_value.balance_id:
                 return balance["amount"]
 
     def get_balances(self):
         self.api.balances_raw = None
         self.api.get_balances()
-        while self.api.balances_raw == None:
-            pass
+        self.api.wait_for(lambda: self.api.balances_raw != None)
         return self.api.balances_raw
 
     def get_balance_mode(self):
         # self.api.profile.balance_type=None
         profile = self.get_profile_ansyc()
         for balance in profile.get("balances"):
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.global_value.balance_id:
                 if balance["type"] == 1:
                     return "REAL"
                 elif balance["type"] == 4:
@@ -460,8 +452,7 @@ class IQ_Option:
     def reset_practice_balance(self):
         self.api.training_balance_reset_request = None
         self.api.reset_training_balance()
-        while self.api.training_balance_reset_request == None:
-            pass
+        self.api.wait_for(lambda: self.api.training_balance_reset_request != None)
         return self.api.training_balance_reset_request
 
     def position_change_all(self, Main_Name, user_balance_id):
@@ -480,11 +471,11 @@ class IQ_Option:
 
     def change_balance(self, Balance_MODE):
         def set_id(b_id):
-            if global_value.balance_id != None:
+            if self.global_value.balance_id != None:
                 self.position_change_all(
-                    "unsubscribeMessage", global_value.balance_id)
+                    "unsubscribeMessage", self.global_value.balance_id)
 
-            global_value.balance_id = b_id
+            self.global_value.balance_id = b_id
 
             self.position_change_all("subscribeMessage", b_id)
 
@@ -519,23 +510,28 @@ class IQ_Option:
     # ________________________self.api.getcandles() wss________________________
 
     def get_candles(self, ACTIVES, interval, count, endtime):
-        self.api.candles.candles_data = None
+        # each request carries its own request_id, so several callers can
+        # wait on the same websocket without overwriting each other's data
+        if ACTIVES not in OP_code.ACTIVES:
+            print('Asset {} not found on consts'.format(ACTIVES))
+            return None
         while True:
+            request_id, future = self.api.candles.add_request()
             try:
-                if ACTIVES not in OP_code.ACTIVES:
-                    print('Asset {} not found on consts'.format(ACTIVES))
-                    break
                 self.api.getcandles(
-                    OP_code.ACTIVES[ACTIVES], interval, count, endtime)
-                while self.check_connect and self.api.candles.candles_data == None:
-                    pass
-                if self.api.candles.candles_data != None:
-                    break
+                    OP_code.ACTIVES[ACTIVES], interval, count, endtime, request_id)
             except:
+                self.api.candles.discard_request(request_id)
                 logging.error('**error** get_candles need reconnect')
                 self.connect()
-
-        return self.api.candles.candles_data
+                continue
+            try:
+                return future.result(timeout=self.candles_timeout)
+            except FutureTimeoutError:
+                self.api.candles.discard_request(request_id)
+                logging.error('**warning** get_candles late {} sec'.format(
+                    self.candles_timeout))
+                return None
 
     #######################################################
     # ______________________________________________________
@@ -590,6 +586,40 @@ class IQ_Option:
     def get_all_realtime_candles(self):
         return self.api.real_time_candles
 
+    # ---------------------ring buffer of one size-----------------------
+
+    def start_candles_buffer(self, ACTIVE, size, capacity=100):
+        # seeded once from history, then updated in place by the
+        # candle-generated stream instead of a get_candles per read;
+        # subscribed first so no candle closes between history and stream
+        if size not in self.size:
+            logging.error(
+                '**error** start_candles_buffer please input right size')
+            return None
+        buffers = self.api.candle_buffers
+        buffer = buffers.create(ACTIVE, size, capacity)
+        if self.start_candles_one_stream(ACTIVE, size) == False:
+            buffers.remove(ACTIVE, size)
+            return None
+        self.seed_candles_buffer(ACTIVE, size, buffer)
+        return buffer
+
+    def seed_candles_buffer(self, ACTIVE, size, buffer=None):
+        # (re)fill a buffer from history, e.g. after it reported a gap
+        buffer = buffer or self.api.candle_buffers.get(ACTIVE, size)
+        if buffer is None:
+            return None
+        buffer.seed(self.get_candles(
+            ACTIVE, size, buffer.capacity, self.api.timesync.server_timestamp))
+        return buffer
+
+    def stop_candles_buffer(self, ACTIVE, size):
+        self.api.candle_buffers.remove(ACTIVE, size)
+        self.stop_candles_one_stream(ACTIVE, size)
+
+    def get_candles_buffer(self, ACTIVE, size):
+        return self.api.candle_buffers.get(ACTIVE, size)
+
     ################################################
     # ---------REAL TIME CANDLE Subset Function---------
     ################################################
@@ -624,7 +654,8 @@ class IQ_Option:
             except:
                 logging.error('**error** start_candles_stream reconnect')
                 self.connect()
-            time.sleep(1)
+            self.api.wait_for(
+                lambda: self.api.candle_generated_check[str(ACTIVE)][int(size)] == True, 1)
 
     def stop_candles_one_stream(self, ACTIVE, size):
         if ((ACTIVE + "," + str(size)) in self.subscribe_candle) == True:
@@ -662,7 +693,8 @@ class IQ_Option:
                 logging.error(
                     '**error** start_candles_all_size_stream reconnect')
                 self.connect()
-            time.sleep(1)
+            self.api.wait_for(
+                lambda: self.api.candle_generated_all_size_check[str(ACTIVE)] == True, 1)
 
     def stop_candles_all_size_stream(self, ACTIVE):
         if (str(ACTIVE) in self.subscribe_candle_all_size) == True:
@@ -740,8 +772,7 @@ class IQ_Option:
     def get_technical_indicators(self, ACTIVES):
         request_id = self.api.get_Technical_indicators(
             OP_code.ACTIVES[ACTIVES])
-        while self.api.technical_indicators.get(request_id) == None:
-            pass
+        self.api.wait_for(lambda: self.api.technical_indicators.get(request_id) != None)
         return self.api.technical_indicators[request_id]
 
 ##############################################################################################
@@ -750,21 +781,16 @@ class IQ_Option:
 ##############################################################################################
 
     def check_binary_order(self, order_id):
-        while order_id not in self.api.order_binary:
-            pass
+        self.api.wait_for(lambda: order_id in self.api.order_binary)
         your_order = self.api.order_binary[order_id]
         del self.api.order_binary[order_id]
         return your_order
 
     def check_win(self, id_number):
         # 'win':win money 'equal':no win no loose   'loose':loose money
-        while True:
-            try:
-                listinfodata_dict = self.api.listinfodata.get(id_number)
-                if listinfodata_dict["game_state"] == 1:
-                    break
-            except:
-                pass
+        self.api.wait_for(
+            lambda: self.api.listinfodata.get(id_number)["game_state"] == 1)
+        listinfodata_dict = self.api.listinfodata.get(id_number)
         self.api.listinfodata.delete(id_number)
         return listinfodata_dict["win"]
 
@@ -785,12 +811,8 @@ class IQ_Option:
         # Function only work with Options!
 
     def check_win_v4(self, id_number):
-        while True:
-            try:
-                if self.api.socket_option_closed[id_number] != None:
-                    break
-            except:
-                pass
+        self.api.wait_for(
+            lambda: self.api.socket_option_closed[id_number] != None)
         x = self.api.socket_option_closed[id_number]
         return x['msg']['win'], (0 if x['msg']['win'] == 'equal' else float(x['msg']['sum']) * -1 if x['msg']['win'] == 'loose' else float(x['msg']['win_amount']) - float(x['msg']['sum']))
 
@@ -808,20 +830,17 @@ class IQ_Option:
         # INPUT:int
         while True:
             self.api.game_betinfo.isSuccessful = None
-            start = time.time()
             try:
                 self.api.get_betinfo(id_number)
             except:
                 logging.error(
                     '**error** def get_betinfo  self.api.get_betinfo reconnect')
                 self.connect()
-            while self.api.game_betinfo.isSuccessful == None:
-                if time.time() - start > 10:
-                    logging.error(
-                        '**error** get_betinfo time out need reconnect')
-                    self.connect()
-                    self.api.get_betinfo(id_number)
-                    time.sleep(self.suspend * 10)
+            while not self.api.wait_for(lambda: self.api.game_betinfo.isSuccessful != None, 10):
+                logging.error(
+                    '**error** get_betinfo time out need reconnect')
+                self.connect()
+                self.api.get_betinfo(id_number)
             if self.api.game_betinfo.isSuccessful == True:
                 return self.api.game_betinfo.isSuccessful, self.api.game_betinfo.dict
             else:
@@ -831,16 +850,14 @@ class IQ_Option:
     def get_optioninfo(self, limit):
         self.api.api_game_getoptions_result = None
         self.api.get_options(limit)
-        while self.api.api_game_getoptions_result == None:
-            pass
+        self.api.wait_for(lambda: self.api.api_game_getoptions_result != None)
 
         return self.api.api_game_getoptions_result
 
     def get_optioninfo_v2(self, limit):
         self.api.get_options_v2_data = None
         self.api.get_options_v2(limit, "binary,turbo")
-        while self.api.get_options_v2_data == None:
-            pass
+        self.api.wait_for(lambda: self.api.get_options_v2_data != None)
 
         return self.api.get_options_v2_data
 
@@ -855,8 +872,7 @@ class IQ_Option:
             for idx in range(buy_len):
                 self.api.buyv3(
                     price[idx], OP_code.ACTIVES[ACTIVES[idx]], ACTION[idx], expirations[idx], idx)
-            while len(self.api.buy_multi_option) < buy_len:
-                pass
+            self.api.wait_for(lambda: len(self.api.buy_multi_option) >= buy_len)
             buy_id = []
             for key in sorted(self.api.buy_multi_option.keys()):
                 try:
@@ -887,27 +903,25 @@ class IQ_Option:
             pass
         self.api.buyv3_by_raw_expired(
             price, OP_code.ACTIVES[active], direction, option, expired, request_id=req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    logging.error(
-                        '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        if not self.__wait_buy_result(req_id, 5):
+            logging.error('**warning** buy late 5 sec')
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id]:
+            logging.error(
+                '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
+            return False, self.api.buy_multi_option[req_id]["message"]
 
         return self.api.result, self.api.buy_multi_option[req_id]["id"]
 
+    def __wait_buy_result(self, req_id, timeout):
+        # the order is answered either by an error "message" or by its "id"
+        # together with the "result" frame
+        return self.api.wait_for(
+            lambda: "message" in self.api.buy_multi_option[req_id] or (
+                self.api.result != None and self.api.buy_multi_option[req_id]["id"] != None),
+            timeout)
+
     def buy(self, price, ACTIVES, ACTION, expirations):
         self.api.buy_multi_option = {}
         self.api.buy_successful = None
@@ -919,49 +933,35 @@ class IQ_Option:
             pass
         self.api.buyv3(
             float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        if not self.__wait_buy_result(req_id, 5):
+            logging.error('**warning** buy late 5 sec')
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id]:
+            return False, self.api.buy_multi_option[req_id]["message"]
 
         return self.api.result, self.api.buy_multi_option[req_id]["id"]
 
     def sell_option(self, options_ids):
         self.api.sell_option(options_ids)
         self.api.sold_options_respond = None
-        while self.api.sold_options_respond == None:
-            pass
+        self.api.wait_for(lambda: self.api.sold_options_respond != None)
         return self.api.sold_options_respond
 
     def sell_digital_option(self, options_ids):
         self.api.sell_digital_option(options_ids)
         self.api.sold_digital_options_respond = None
-        while self.api.sold_digital_options_respond == None:
-            pass
+        self.api.wait_for(lambda: self.api.sold_digital_options_respond != None)
         return self.api.sold_digital_options_respond
 # __________________for Digital___________________
 
     def get_digital_underlying_list_data(self):
         self.api.underlying_list_data = None
         self.api.get_digital_underlying()
-        start_t = time.time()
-        while self.api.underlying_list_data == None:
-            if time.time() - start_t >= 30:
-                logging.error(
-                    '**warning** get_digital_underlying_list_data late 30 sec')
-                return None
+        if not self.api.wait_for(lambda: self.api.underlying_list_data != None, 30):
+            logging.error(
+                '**warning** get_digital_underlying_list_data late 30 sec')
+            return None
 
         return self.api.underlying_list_data
 
@@ -969,8 +969,7 @@ class IQ_Option:
         self.api.strike_list = None
         self.api.get_strike_list(ACTIVES, duration)
         ans = {}
-        while self.api.strike_list == None:
-            pass
+        self.api.wait_for(lambda: self.api.strike_list != None)
         try:
             for data in self.api.strike_list["msg"]["strike"]:
                 temp = {}
@@ -992,16 +991,12 @@ class IQ_Option:
             ACTIVE, expiration_period)
 
     def get_instrument_quites_generated_data(self, ACTIVE, duration):
-        while self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] == {}:
-            pass
+        self.api.wait_for(lambda: self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] != {})
         return self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60]
 
     def get_realtime_strike_list(self, ACTIVE, duration):
-        while True:
-            if not self.api.instrument_quites_generated_data[ACTIVE][duration * 60]:
-                pass
-            else:
-                break
+        self.api.wait_for(
+            lambda: self.api.instrument_quites_generated_data[ACTIVE][duration * 60])
         """
         strike_list dict: price:{call:id,put:id}
         """
@@ -1076,8 +1071,7 @@ class IQ_Option:
 
         request_id = self.api.place_digital_option(instrument_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) == None:
-            pass
+        self.api.wait_for(lambda: self.api.digital_option_placed_id.get(request_id) != None)
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
             return True, digital_order_id
@@ -1098,8 +1092,7 @@ class IQ_Option:
                     return row["price"]["bid"]
             return None
 
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self.api.wait_for(lambda: self.get_async_order(position_id)["position-changed"] != {})
         # ___________________/*position*/_________________
         position = self.get_async_order(position_id)["position-changed"]["msg"]
         # doEURUSD201911040628PT1MPSPT
@@ -1187,22 +1180,18 @@ class IQ_Option:
     def buy_digital(self, amount, instrument_id):
         self.api.digital_option_placed_id = None
         self.api.place_digital_option(instrument_id, amount)
-        start_t = time.time()
-        while self.api.digital_option_placed_id == None:
-            if time.time() - start_t > 30:
-                logging.error('buy_digital loss digital_option_placed_id')
-                return False, None
+        if not self.api.wait_for(lambda: self.api.digital_option_placed_id != None, 30):
+            logging.error('buy_digital loss digital_option_placed_id')
+            return False, None
         return True, self.api.digital_option_placed_id
 
     def close_digital_option(self, position_id):
         self.api.result = None
-        while self.get_async_order(position_id)["position-changed"] == {}:
-            pass
+        self.api.wait_for(lambda: self.get_async_order(position_id)["position-changed"] != {})
         position_changed = self.get_async_order(
             position_id)["position-changed"]["msg"]
         self.api.close_digital_option(position_changed["external_id"])
-        while self.api.result == None:
-            pass
+        self.api.wait_for(lambda: self.api.result != None)
         return self.api.result
 
     def check_win_digital(self, buy_order_id, polling_time):
@@ -1218,8 +1207,7 @@ class IQ_Option:
 
     def check_win_digital_v2(self, buy_order_id):
 
-        while self.get_async_order(buy_order_id)["position-changed"] == {}:
-            pass
+        self.api.wait_for(lambda: self.get_async_order(buy_order_id)["position-changed"] != {})
         order_data = self.get_async_order(
             buy_order_id)["position-changed"]["msg"]
         if order_data != None:
@@ -1257,8 +1245,7 @@ class IQ_Option:
             use_token_for_commission=use_token_for_commission
         )
 
-        while self.api.buy_order_id == None:
-            pass
+        self.api.wait_for(lambda: self.api.buy_order_id != None)
         check, data = self.get_order(self.api.buy_order_id)
         while data["status"] == "pending_new":
             check, data = self.get_order(self.api.buy_order_id)
@@ -1276,8 +1263,7 @@ class IQ_Option:
     def change_auto_margin_call(self, ID_Name, ID, auto_margin_call):
         self.api.auto_margin_call_changed_respond = None
         self.api.change_auto_margin_call(ID_Name, ID, auto_margin_call)
-        while self.api.auto_margin_call_changed_respond == None:
-            pass
+        self.api.wait_for(lambda: self.api.auto_margin_call_changed_respond != None)
         if self.api.auto_margin_call_changed_respond["status"] == 2000:
             return True, self.api.auto_margin_call_changed_respond
         else:
@@ -1306,8 +1292,7 @@ class IQ_Option:
                 use_trail_stop=use_trail_stop)
             self.change_auto_margin_call(
                 ID_Name=ID_Name, ID=ID, auto_margin_call=auto_margin_call)
-            while self.api.tpsl_changed_respond == None:
-                pass
+            self.api.wait_for(lambda: self.api.tpsl_changed_respond != None)
             if self.api.tpsl_changed_respond["status"] == 2000:
                 return True, self.api.tpsl_changed_respond["msg"]
             else:
@@ -1328,8 +1313,7 @@ class IQ_Option:
         # new
         self.api.order_data = None
         self.api.get_order(buy_order_id)
-        while self.api.order_data == None:
-            pass
+        self.api.wait_for(lambda: self.api.order_data != None)
         if self.api.order_data["status"] == 2000:
             return True, self.api.order_data["msg"]
         else:
@@ -1338,8 +1322,7 @@ class IQ_Option:
     def get_pending(self, instrument_type):
         self.api.deferred_orders = None
         self.api.get_pending(instrument_type)
-        while self.api.deferred_orders == None:
-            pass
+        self.api.wait_for(lambda: self.api.deferred_orders != None)
         if self.api.deferred_orders["status"] == 2000:
             return True, self.api.deferred_orders["msg"]
         else:
@@ -1349,8 +1332,7 @@ class IQ_Option:
     def get_positions(self, instrument_type):
         self.api.positions = None
         self.api.get_positions(instrument_type)
-        while self.api.positions == None:
-            pass
+        self.api.wait_for(lambda: self.api.positions != None)
         if self.api.positions["status"] == 2000:
             return True, self.api.positions["msg"]
         else:
@@ -1361,8 +1343,7 @@ class IQ_Option:
         check, order_data = self.get_order(buy_order_id)
         position_id = order_data["position_id"]
         self.api.get_position(position_id)
-        while self.api.position == None:
-            pass
+        self.api.wait_for(lambda: self.api.position != None)
         if self.api.position["status"] == 2000:
             return True, self.api.position["msg"]
         else:
@@ -1373,26 +1354,22 @@ class IQ_Option:
     def get_digital_position_by_position_id(self, position_id):
         self.api.position = None
         self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        self.api.wait_for(lambda: self.api.position != None)
         return self.api.position
 
     def get_digital_position(self, order_id):
         self.api.position = None
-        while self.get_async_order(order_id)["position-changed"] == {}:
-            pass
+        self.api.wait_for(lambda: self.get_async_order(order_id)["position-changed"] != {})
         position_id = self.get_async_order(
             order_id)["position-changed"]["msg"]["external_id"]
         self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        self.api.wait_for(lambda: self.api.position != None)
         return self.api.position
 
     def get_position_history(self, instrument_type):
         self.api.position_history = None
         self.api.get_position_history(instrument_type)
-        while self.api.position_history == None:
-            pass
+        self.api.wait_for(lambda: self.api.position_history != None)
 
         if self.api.position_history["status"] == 2000:
             return True, self.api.position_history["msg"]
@@ -1404,8 +1381,7 @@ class IQ_Option:
         self.api.position_history_v2 = None
         self.api.get_position_history_v2(
             instrument_type, limit, offset, start, end)
-        while self.api.position_history_v2 == None:
-            pass
+        self.api.wait_for(lambda: self.api.position_history_v2 != None)
 
         if self.api.position_history_v2["status"] == 2000:
             return True, self.api.position_history_v2["msg"]
@@ -1419,8 +1395,7 @@ class IQ_Option:
         else:
             self.api.get_available_leverages(
                 instrument_type, OP_code.ACTIVES[actives])
-        while self.api.available_leverages == None:
-            pass
+        self.api.wait_for(lambda: self.api.available_leverages != None)
         if self.api.available_leverages["status"] == 2000:
             return True, self.api.available_leverages["msg"]
         else:
@@ -1429,8 +1404,7 @@ class IQ_Option:
     def cancel_order(self, buy_order_id):
         self.api.order_canceled = None
         self.api.cancel_order(buy_order_id)
-        while self.api.order_canceled == None:
-            pass
+        self.api.wait_for(lambda: self.api.order_canceled != None)
         if self.api.order_canceled["status"] == 2000:
             return True
         else:
@@ -1441,8 +1415,7 @@ class IQ_Option:
         if data["position_id"] != None:
             self.api.close_position_data = None
             self.api.close_position(data["position_id"])
-            while self.api.close_position_data == None:
-                pass
+            self.api.wait_for(lambda: self.api.close_position_data != None)
             if self.api.close_position_data["status"] == 2000:
                 return True
             else:
@@ -1451,12 +1424,10 @@ class IQ_Option:
             return False
 
     def close_position_v2(self, position_id):
-        while self.get_async_order(position_id) == None:
-            pass
+        self.api.wait_for(lambda: self.get_async_order(position_id) != None)
         position_changed = self.get_async_order(position_id)
         self.api.close_position(position_changed["id"])
-        while self.api.close_position_data == None:
-            pass
+        self.api.wait_for(lambda: self.api.close_position_data != None)
         if self.api.close_position_data["status"] == 2000:
             return True
         else:
@@ -1465,8 +1436,7 @@ class IQ_Option:
     def get_overnight_fee(self, instrument_type, active):
         self.api.overnight_fee = None
         self.api.get_overnight_fee(instrument_type, OP_code.ACTIVES[active])
-        while self.api.overnight_fee == None:
-            pass
+        self.api.wait_for(lambda: self.api.overnight_fee != None)
         if self.api.overnight_fee["status"] == 2000:
             return True, self.api.overnight_fee["msg"]
         else:
@@ -1481,7 +1451,7 @@ class IQ_Option:
     # -----------------------------------------------------------------
 
     def opcode_to_name(self, opcode):
-        return list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(opcode)]
+        return OP_code.ACTIVES.get_name(opcode)
 
     # name:
     # "live-deal-binary-option-placed"
@@ -1528,8 +1498,7 @@ class IQ_Option:
     def get_user_profile_client(self, user_id):
         self.api.user_profile_client = None
         self.api.Get_User_Profile_Client(user_id)
-        while self.api.user_profile_client == None:
-            pass
+        self.api.wait_for(lambda: self.api.user_profile_client != None)
 
         return self.api.user_profile_client
 
@@ -1537,14 +1506,11 @@ class IQ_Option:
         self.api.leaderboard_userinfo_deals_client = None
 
         while True:
-            try:
-                if self.api.leaderboard_userinfo_deals_client["isSuccessful"] == True:
-                    break
-            except:
-                pass
             self.api.Request_Leaderboard_Userinfo_Deals_Client(
                 user_id, country_id)
-            time.sleep(0.2)
+            if self.api.wait_for(
+                    lambda: self.api.leaderboard_userinfo_deals_client["isSuccessful"] == True, 0.2):
+                break
 
         return self.api.leaderboard_userinfo_deals_client
 
@@ -1553,7 +1519,7 @@ class IQ_Option:
 
         while self.api.users_availability == None:
             self.api.Get_Users_Availability(user_id)
-            time.sleep(0.2)
+            self.api.wait_for(lambda: self.api.users_availability != None, 0.2)
         return self.api.users_availability
 
     def get_digital_payout(self, active, seconds=0):
@@ -1562,10 +1528,8 @@ class IQ_Option:
 
         self.api.subscribe_digital_price_splitter(asset_id)
 
-        start = time.time()
-        while self.api.digital_payout is None:
-            if seconds and int(time.time() - start) > seconds:
-                break
+        self.api.wait_for(lambda: self.api.digital_payout is not None,
+                          seconds if seconds else None)
 
         self.api.unsubscribe_digital_price_splitter(asset_id)
 
@@ -1609,8 +1573,7 @@ class IQ_Option:
         logger.info(instrument_id)
         request_id = self.api.place_digital_option_v2(instrument_id, active_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) is None:
-            pass
+        self.api.wait_for(lambda: self.api.digital_option_placed_id.get(request_id) is not None)
 
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
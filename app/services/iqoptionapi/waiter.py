@@ -0,0 +1,56 @@
+"""Module for waiting on IQ Option websocket responses."""
+import threading
+import time
+
+# Max seconds between predicate checks: a waiter of a replaced api (a
+# reconnect) gets no more notifications, the predicate may read the new one
+RECHECK_INTERVAL = 1.0
+
+
+class ResponseWaiter(object):
+    """Class to block callers until a websocket response arrives.
+
+    The websocket thread calls :meth:`notify` after every processed frame,
+    so waiting threads sleep on a condition instead of spinning on the
+    response attributes.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+
+    def notify(self):
+        """Method to wake up every thread waiting for a response."""
+        with self.condition:
+            self.condition.notify_all()
+
+    def wait_for(self, predicate, timeout=None):
+        """Method to block until predicate() is true.
+
+        Exceptions raised by the predicate (e.g. a missing key of a
+        response that did not arrive yet) count as "not ready".
+
+        The predicate is also checked every RECHECK_INTERVAL seconds, so a
+        wait without timeout cannot hang on a condition nobody notifies.
+
+        :param predicate: The callable checked after every response.
+        :param timeout: (optional) The max seconds to wait, None for ever.
+
+        :returns: True if the predicate became true, False on timeout.
+        """
+        def ready():
+            try:
+                return bool(predicate())
+            except Exception:
+                return False
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while not ready():
+                if deadline is None:
+                    remaining = RECHECK_INTERVAL
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self.condition.wait(min(remaining, RECHECK_INTERVAL))
+            return True
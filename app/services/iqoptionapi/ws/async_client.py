@@ -0,0 +1,228 @@
+"""Module for IQ option asyncio websocket."""
+
+import asyncio
+import itertools
+import json
+import logging
+import ssl
+
+import websockets
+
+from .chanels.candles import GetCandles
+from .chanels.heartbeat import Heartbeat
+from .chanels.ssid import Ssid
+from .objects.timesync import TimeSync
+
+
+class AsyncWebsocketClient(object):
+    """Class for work with IQ option websocket from an asyncio event loop.
+
+    It exposes the same ``send_websocket_request`` method as
+    :class:`IQOptionAPI <iqoptionapi.api.IQOptionAPI>`, so every chanel in
+    ``ws/chanels`` can be used with it. Responses are matched to their
+    request through ``request_id`` and awaited instead of polled, so one
+    event loop can keep many requests in flight without any thread.
+    """
+
+    def __init__(self, wss_url, ssid, timeout=10):
+        """
+        :param str wss_url: The websocket url of a IQ Option server.
+        :param str ssid: The session id of an authenticated http login.
+        :param timeout: The seconds to wait for a response.
+        """
+        self.wss_url = wss_url
+        self.ssid = ssid
+        self.timeout = timeout
+        self.timesync = TimeSync()
+        self.websocket = None
+        self.profile = None
+        self.__request_counter = itertools.count(1)
+        self.__pending = {}
+        self.__listeners = {}
+        self.__outgoing = None
+        self.__reader_task = None
+        self.__writer_task = None
+
+    @property
+    def is_connected(self):
+        """Property to check if the reader is still running."""
+        return self.__reader_task is not None and not self.__reader_task.done()
+
+    async def connect(self):
+        """Method to open the websocket and authenticate with the ssid.
+
+        :returns: True if the server accepted the ssid.
+        """
+        ssl_context = None
+        if self.wss_url.startswith("wss://"):
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        self.websocket = await websockets.connect(
+            self.wss_url, ssl=ssl_context, max_size=None)
+        self.__outgoing = asyncio.Queue()
+        self.__reader_task = asyncio.create_task(self.__reader())
+        self.__writer_task = asyncio.create_task(self.__writer())
+
+        profile = self.wait_message("profile")
+        Ssid(self)(self.ssid)
+        try:
+            message = await asyncio.wait_for(profile, self.timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            return False
+        self.profile = message["msg"]
+        if self.profile == False:
+            await self.close()
+            return False
+        return True
+
+    async def close(self):
+        """Method to close the websocket and fail pending requests."""
+        for task in (self.__writer_task, self.__reader_task):
+            if task is not None:
+                task.cancel()
+        if self.websocket is not None:
+            try:
+                await self.websocket.close()
+            except Exception:
+                pass
+        self.__fail_pending(ConnectionError("Websocket connection closed."))
+        self.websocket = None
+        self.__reader_task = None
+        self.__writer_task = None
+
+    def send_websocket_request(self, name, msg, request_id="", no_force_send=True):  # pylint: disable=unused-argument
+        """Send websocket request to IQ Option server.
+
+        Frames are queued and written in order by the writer task, so
+        chanels can call this synchronously from the event loop.
+
+        :param str name: The websocket request name.
+        :param dict msg: The websocket request msg.
+        """
+        data = json.dumps(dict(name=name, msg=msg, request_id=request_id))
+        self.__outgoing.put_nowait(data)
+
+    def new_request_id(self):
+        """Method to get a request id unique for this connection."""
+        return "async_{}".format(next(self.__request_counter))
+
+    def expect(self, request_id, name=None):
+        """Method to register a future resolved with the response frame.
+
+        Register it before sending the request, so a fast response can
+        not be missed.
+
+        :param request_id: The request id echoed back by the server.
+        :param name: (optional) The response name, to skip other frames
+            (e.g. "result" acks) carrying the same request id.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.__pending[str(request_id)] = (name, future)
+        return future
+
+    def wait_message(self, name):
+        """Method to get a future resolved with the next frame named name."""
+        future = asyncio.get_running_loop().create_future()
+
+        def resolve(message):
+            if not future.done():
+                future.set_result(message)
+            self.remove_listener(name, resolve)
+
+        self.add_listener(name, resolve)
+        return future
+
+    def add_listener(self, name, callback):
+        """Method to call callback(message) for every frame named name."""
+        self.__listeners.setdefault(name, []).append(callback)
+
+    def remove_listener(self, name, callback):
+        """Method to stop calling callback for frames named name."""
+        callbacks = self.__listeners.get(name, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    async def wait_response(self, request_id, future, timeout=None):
+        """Method to await a future returned by :meth:`expect`.
+
+        :returns: The response frame.
+        """
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        finally:
+            self.__pending.pop(str(request_id), None)
+
+    async def send_message(self, msg, name=None, timeout=None):
+        """Method to send a "sendMessage" request and await its response.
+
+        :param dict msg: The websocket request msg.
+        :param name: (optional) The expected response name.
+
+        :returns: The response frame.
+        """
+        request_id = self.new_request_id()
+        future = self.expect(request_id, name)
+        self.send_websocket_request("sendMessage", msg, request_id)
+        return await self.wait_response(request_id, future, timeout)
+
+    async def get_candles(self, active_id, interval, count, endtime):
+        """Method to fetch candles without blocking the event loop.
+
+        :returns: The list of candles data, None if none were returned.
+        """
+        request_id = self.new_request_id()
+        future = self.expect(request_id, "candles")
+        GetCandles(self)(active_id, interval, count, endtime, request_id)
+        message = await self.wait_response(request_id, future)
+        try:
+            return message["msg"]["candles"]
+        except (KeyError, TypeError):
+            return None
+
+    async def __writer(self):
+        while True:
+            data = await self.__outgoing.get()
+            await self.websocket.send(data)
+
+    async def __reader(self):
+        logger = logging.getLogger(__name__)
+        try:
+            async for raw in self.websocket:
+                try:
+                    self.__dispatch(json.loads(raw))
+                except Exception as exc:
+                    logger.error(exc)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error(exc)
+        finally:
+            self.__fail_pending(ConnectionError("Websocket connection closed."))
+
+    def __dispatch(self, message):
+        name = message.get("name")
+        if name == "timeSync":
+            self.timesync.server_timestamp = message["msg"]
+        elif name == "heartbeat":
+            Heartbeat(self)(message["msg"])
+
+        request_id = message.get("request_id")
+        if request_id not in (None, ""):
+            expected_name, future = self.__pending.get(
+                str(request_id), (None, None))
+            if future is not None and expected_name in (None, name):
+                del self.__pending[str(request_id)]
+                if not future.done():
+                    future.set_result(message)
+
+        for callback in list(self.__listeners.get(name, ())):
+            callback(message)
+
+    def __fail_pending(self, exc):
+        pending, self.__pending = self.__pending, {}
+        for _, future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
@@ -1,6 +1,5 @@
 """Module for IQ Option buyV2 websocket chanel."""
 from datetime import datetime, timedelta
-from ... import global_value as global_value
 from .base import Base
 from ...expiration import get_expiration_time
 
@@ -32,7 +31,7 @@ class Buyv2(Base):
             "exp": int(exp),
             "type": option,
             "direction": direction.lower(),
-            "user_balance_id": int(global_value.balance_id),
+            "user_balance_id": int(self.api.global_value.balance_id),
             "time": self.api.timesync.server_timestamp
         }
 
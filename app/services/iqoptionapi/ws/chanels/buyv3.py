@@ -2,7 +2,6 @@ import datetime
 import time
 from .base import Base
 import logging
-from ... import global_value as global_value
 from ...expiration import get_expiration_time
 
 
@@ -26,7 +25,7 @@ class Buyv3(Base):
                      "expired": int(exp),
                      "direction": direction.lower(),
                      "option_type_id": option,
-                     "user_balance_id": int(global_value.balance_id)
+                     "user_balance_id": int(self.api.global_value.balance_id)
                      },
             "name": "binary-options.open-option",
             "version": "1.0"
@@ -53,7 +52,7 @@ class Buyv3_by_raw_expired(Base):
                      "expired": int(expired),
                      "direction": direction.lower(),
                      "option_type_id": option_id,
-                     "user_balance_id": int(global_value.balance_id)
+                     "user_balance_id": int(self.api.global_value.balance_id)
                      },
             "name": "binary-options.open-option",
             "version": "1.0"
@@ -4,7 +4,6 @@ import json
 import logging
 import websocket
 from .. import constants as OP_code
-from .. import global_value as global_value
 from threading import Thread
 from .received.technical_indicators import technical_indicators
 from .received.time_sync import time_sync
@@ -62,6 +61,61 @@ from .received.client_price_generated import client_price_generated
 from .received.users_availability import users_availability
 
 
+# message name -> handler(api, message) of ws/received
+RECEIVED_HANDLERS = (
+    ("timeSync", time_sync),
+    ("heartbeat", heartbeat),
+    ("balances", balances),
+    ("profile", profile),
+    ("balance-changed", balance_changed),
+    ("candles", candles),
+    ("buyComplete", buy_complete),
+    ("option", option),
+    ("position-history", position_history),
+    ("listInfoData", list_info_data),
+    ("commission-changed", commission_changed),
+    ("socket-option-opened", socket_option_opened),
+    ("api_option_init_all_result", api_option_init_all_result),
+    ("initialization-data", initialization_data),
+    ("underlying-list", underlying_list),
+    ("instruments", instruments),
+    ("financial-information", financial_information),
+    ("position-changed", position_changed),
+    ("option-opened", option_opened),
+    ("option-closed", option_closed),
+    ("top-assets-updated", top_assets_updated),
+    ("strike-list", strike_list),
+    ("api_game_betinfo_result", api_game_betinfo_result),
+    ("traders-mood-changed", traders_mood_changed),
+    ("order-placed-temp", order_placed_temp),
+    ("order", order),
+    ("position", position),
+    ("positions", positions),
+    ("deferred-orders", deferred_orders),
+    ("history-positions", history_positions),
+    ("available-leverages", available_leverages),
+    ("order-canceled", order_canceled),
+    ("position-closed", position_closed),
+    ("overnight-fee", overnight_fee),
+    ("api_game_getoptions_result", api_game_getoptions_result),
+    ("sold-options", sold_options),
+    ("tpsl-changed", tpsl_changed),
+    ("auto-margin-call-changed", auto_margin_call_changed),
+    ("result", result),
+    ("instrument-quotes-generated", instrument_quotes_generated),
+    ("training-balance-reset", training_balance_reset),
+    ("socket-option-closed", socket_option_closed),
+    ("live-deal-binary-option-placed", live_deal_binary_option_placed),
+    ("live-deal-digital-option", live_deal_digital_option),
+    ("leaderboard-deals-client", leaderboard_deals_client),
+    ("live-deal", live_deal),
+    ("user-profile-client", user_profile_client),
+    ("leaderboard-userinfo-deals-client", leaderboard_userinfo_deals_client),
+    ("users-availability", users_availability),
+    ("client-price-generated", client_price_generated),
+)
+
+
 class WebsocketClient(object):
     """Class for work with IQ option websocket."""
 
@@ -75,6 +129,23 @@ class WebsocketClient(object):
             self.api.wss_url, on_message=self.on_message,
             on_error=self.on_error, on_close=self.on_close,
             on_open=self.on_open)
+        # message name -> [(handler, extra_args)], so each frame only runs
+        # the handlers registered for its name
+        self.handlers = {}
+        for name, handler in RECEIVED_HANDLERS:
+            self.register_handler(name, handler)
+        self.register_handler(
+            "technical-indicators", technical_indicators, self.api_dict_clean)
+        self.register_handler(
+            "candle-generated", candle_generated_realtime, self.dict_queue_add)
+        self.register_handler(
+            "candles-generated", candle_generated_v2, self.dict_queue_add)
+        self.register_handler(
+            "digital-option-placed", digital_option_placed, self.api_dict_clean)
+
+    def register_handler(self, name, handler, *extra_args):
+        """Method to run handler(api, message, *extra_args) on frames named name."""
+        self.handlers.setdefault(name, []).append((handler, extra_args))
 
     def dict_queue_add(self, dict, maxdict, key1, key2, key3, value):
         if key3 in dict[key1][key2]:
@@ -111,90 +182,45 @@ class WebsocketClient(object):
         else:
             message = args[1]
 
-        global_value.ssl_Mutual_exclusion = True
+        self.api.global_value.ssl_Mutual_exclusion = True
+        try:
+            self.process_message(message)
+        finally:
+            self.api.global_value.ssl_Mutual_exclusion = False
+            # wake up every thread waiting for a response set by the handlers
+            self.api.response_waiter.notify()
+
+    def process_message(self, message):
+        """Method to run the received handlers on one websocket frame."""
         logger = logging.getLogger(__name__)
         logger.debug(message)
 
         message = json.loads(str(message))
 
+        handlers = self.handlers.get(message.get("name"))
+        if handlers:
+            for handler, extra_args in handlers:
+                handler(self.api, message, *extra_args)
 
-        technical_indicators(self.api, message, self.api_dict_clean)
-        time_sync(self.api, message)
-        heartbeat(self.api, message)
-        balances(self.api, message)
-        profile(self.api, message)
-        balance_changed(self.api, message)
-        candles(self.api, message)
-        buy_complete(self.api, message)
-        option(self.api, message)
-        position_history(self.api, message)
-        list_info_data(self.api, message)
-        candle_generated_realtime(self.api, message, self.dict_queue_add)
-        candle_generated_v2(self.api, message, self.dict_queue_add)
-        commission_changed(self.api, message)
-        socket_option_opened(self.api, message)
-        api_option_init_all_result(self.api, message)
-        initialization_data(self.api, message)
-        underlying_list(self.api, message)
-        instruments(self.api, message)
-        financial_information(self.api, message)
-        position_changed(self.api, message)
-        option_opened(self.api, message)
-        option_closed(self.api, message)
-        top_assets_updated(self.api, message)
-        strike_list(self.api, message)
-        api_game_betinfo_result(self.api, message)
-        traders_mood_changed(self.api, message)
-         # ------for forex&cfd&crypto..
-        order_placed_temp(self.api, message)
-        order(self.api, message)
-        position(self.api, message)
-        positions(self.api, message)
-        order_placed_temp(self.api, message)
-        deferred_orders(self.api, message)
-        history_positions(self.api, message)
-        available_leverages(self.api, message)
-        order_canceled(self.api, message)
-        position_closed(self.api, message)
-        overnight_fee(self.api, message)
-        api_game_getoptions_result(self.api, message)
-        sold_options(self.api, message)
-        tpsl_changed(self.api, message)
-        auto_margin_call_changed(self.api, message)
-        digital_option_placed(self.api, message, self.api_dict_clean)
-        result(self.api, message)
-        instrument_quotes_generated(self.api, message)
-        training_balance_reset(self.api, message)
-        socket_option_closed(self.api, message)
-        live_deal_binary_option_placed(self.api, message)
-        live_deal_digital_option(self.api, message)
-        leaderboard_deals_client(self.api, message)
-        live_deal(self.api, message)
-        user_profile_client(self.api, message)
-        leaderboard_userinfo_deals_client(self.api, message)
-        users_availability(self.api, message)
-        client_price_generated(self.api, message)
-
-        global_value.ssl_Mutual_exclusion = False
-
-    @staticmethod
-    def on_error(wss, error):  # pylint: disable=unused-argument
+    def on_error(self, wss, error):  # pylint: disable=unused-argument
         """Method to process websocket errors."""
         logger = logging.getLogger(__name__)
         logger.error(error)
-        global_value.websocket_error_reason = str(error)
-        global_value.check_websocket_if_error = True
+        self.api.global_value.websocket_error_reason = str(error)
+        self.api.global_value.check_websocket_if_error = True
+        self.api.response_waiter.notify()
 
-    @staticmethod
-    def on_open(wss):  # pylint: disable=unused-argument
+    def on_open(self, wss):  # pylint: disable=unused-argument
         """Method to process websocket open."""
         logger = logging.getLogger(__name__)
         logger.debug("Websocket client connected.")
-        global_value.check_websocket_if_connect = 1
+        self.api.global_value.check_websocket_if_connect = 1
+        self.api.response_waiter.notify()
 
-    @staticmethod
-    def on_close(wss):  # pylint: disable=unused-argument
+    def on_close(self, wss, *args):  # pylint: disable=unused-argument
         """Method to process websocket close."""
+        # websocket-client >=1.0 also passes (close_status_code, close_msg)
         logger = logging.getLogger(__name__)
         logger.debug("Websocket connection closed.")
-        global_value.check_websocket_if_connect = 0
+        self.api.global_value.check_websocket_if_connect = 0
+        self.api.response_waiter.notify()
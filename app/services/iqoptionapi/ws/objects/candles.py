@@ -1,4 +1,7 @@
 """Module for IQ Option Candles websocket object."""
+import itertools
+import threading
+from concurrent.futures import Future
 
 from .base import Base
 
@@ -71,6 +74,9 @@ class Candles(Base):
         super(Candles, self).__init__()
         self.__name = "candles"
         self.__candles_data = None
+        self.__request_counter = itertools.count(1)
+        self.__requests = {}
+        self.__requests_lock = threading.Lock()
 
     @property
     def candles_data(self):
@@ -85,6 +91,40 @@ class Candles(Base):
         """Method to set candles data."""
         self.__candles_data = candles_data
 
+    def add_request(self):
+        """Method to register a pending candles request.
+
+        :returns: The tuple (request_id, future) where the future is
+            resolved with the candles data of the matching response.
+        """
+        with self.__requests_lock:
+            request_id = "candles_{}".format(next(self.__request_counter))
+            future = Future()
+            self.__requests[request_id] = future
+        return request_id, future
+
+    def set_response(self, request_id, candles_data):
+        """Method to resolve the pending request with its candles data.
+
+        :param request_id: The request id echoed by the server.
+        :param candles_data: The list of candles data.
+
+        :returns: True if a pending request was resolved.
+        """
+        with self.__requests_lock:
+            future = self.__requests.pop(str(request_id), None)
+        if future is None:
+            return False
+        future.set_result(candles_data)
+        return True
+
+    def discard_request(self, request_id):
+        """Method to drop a pending request (e.g. on timeout)."""
+        with self.__requests_lock:
+            future = self.__requests.pop(request_id, None)
+        if future is not None:
+            future.cancel()
+
     @property
     def first_candle(self):
         """Method to get first candle.
@@ -14,6 +14,7 @@ class TimeSync(Base):
         self.__name = "timeSync"
         self.__server_timestamp = time.time()
         self.__expiration_time = 1
+        self.__clock_offset = None
 
     @property
     def server_timestamp(self):
@@ -31,6 +32,19 @@ class TimeSync(Base):
     def server_timestamp(self, timestamp):
         """Method to set server timestamp."""
         self.__server_timestamp = timestamp
+        if timestamp is not None:
+            self.__clock_offset = timestamp / 1000 - time.time()
+
+    @property
+    def clock_offset(self):
+        """Property to get the server clock offset.
+
+        Measured when the last timeSync arrived, so ``time.time() +
+        clock_offset`` is the server time between two syncs.
+
+        :returns: The seconds to add to the local clock, None if never synced.
+        """
+        return self.__clock_offset
 
     @property
     def server_datetime(self):
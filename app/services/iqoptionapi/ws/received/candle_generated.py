@@ -1,18 +1,17 @@
 """Module for IQ option websocket."""
 from ... import constants as OP_code
-from ... import global_value as global_value
 
 def candle_generated_realtime(api, message, dict_queue_add):
     if message["name"] == "candle-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-            OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.ACTIVES.get_name(message["msg"]["active_id"])
 
         active = str(Active_name)
         size = int(message["msg"]["size"])
         from_ = int(message["msg"]["from"])
         msg = message["msg"]
-        maxdict = api.real_time_candles_maxdict_table[Active_name][size]
-
-        dict_queue_add(api.real_time_candles,
-                            maxdict, active, size, from_, msg)
+        api.candle_buffers.update(active, size, msg)
+        maxdict = api.real_time_candles_maxdict_table[Active_name].get(size)
+        if maxdict is not None:
+            dict_queue_add(api.real_time_candles,
+                                maxdict, active, size, from_, msg)
         api.candle_generated_check[active][size] = True
\ No newline at end of file
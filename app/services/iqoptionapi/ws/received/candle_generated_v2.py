@@ -2,8 +2,7 @@ from ... import constants as OP_code
 
 def candle_generated_v2(api, message, dict_queue_add):
     if message["name"] == "candles-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-                OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.ACTIVES.get_name(message["msg"]["active_id"])
         active = str(Active_name)
         for k, v in message["msg"]["candles"].items():
             v["active_id"] = message["msg"]["active_id"]
@@ -14,8 +13,10 @@ def candle_generated_v2(api, message, dict_queue_add):
             v["size"] = int(k)
             size = int(v["size"])
             from_ = int(v["from"])
-            maxdict = api.real_time_candles_maxdict_table[Active_name][size]
             msg = v
-            dict_queue_add(api.real_time_candles, maxdict, active, size, from_, msg)
+            api.candle_buffers.update(active, size, msg)
+            maxdict = api.real_time_candles_maxdict_table[Active_name].get(size)
+            if maxdict is not None:
+                dict_queue_add(api.real_time_candles, maxdict, active, size, from_, msg)
 
         api.candle_generated_all_size_check[active] = True
\ No newline at end of file
@@ -3,6 +3,8 @@
 def candles(api, message):
     if message['name'] == 'candles':
         try:
-            api.candles.candles_data = message["msg"]["candles"]
+            candles_data = message["msg"]["candles"]
         except:
-            pass
\ No newline at end of file
+            return
+        api.candles.candles_data = candles_data
+        api.candles.set_response(message.get("request_id"), candles_data)
@@ -4,7 +4,7 @@ from ... import constants as OP_code
 def instrument_quotes_generated(api, message):
     if message["name"] == "instrument-quotes-generated":
 
-        Active_name = list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(message["msg"]["active"])]
+        Active_name = OP_code.ACTIVES.get_name(message["msg"]["active"])
         period = message["msg"]["expiration"]["period"]
         ans = {}
         for data in message["msg"]["quotes"]:
@@ -1,5 +1,4 @@
 """Module for IQ option websocket."""
-from ... import global_value as global_value
 
 def profile(api, message):
     if message["name"] == "profile":
@@ -11,10 +10,10 @@ def profile(api, message):
             except:
                 pass
             # Set Default account
-            if global_value.balance_id == None:
+            if api.global_value.balance_id == None:
                 for balance in message["msg"]["balances"]:
                     if balance["type"] == 4:
-                        global_value.balance_id = balance["id"]
+                        api.global_value.balance_id = balance["id"]
                         break
             try:
                 api.profile.balance_id = message["msg"]["balance_id"]
@@ -4,9 +4,22 @@ Detects classic candlestick patterns for binary options trading
 """
 import pandas as pd
 import numpy as np
-from typing import List, Optional, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Tuple
 from ...models.schemas import PriceActionPattern
 
+# mask name -> (pattern_type, description)
+PATTERNS = {
+    "pin_bar_bullish": ("pin_bar", "Pin Bar de Alta (Martelo) - Rejeição de preços baixos"),
+    "pin_bar_bearish": ("pin_bar", "Pin Bar de Baixa (Estrela Cadente) - Rejeição de preços altos"),
+    "engulfing_bullish": ("engulfing_bullish", "Engolfo de Alta - Reversão bullish forte"),
+    "engulfing_bearish": ("engulfing_bearish", "Engolfo de Baixa - Reversão bearish forte"),
+    "inside_bar": ("inside_bar", "Inside Bar - Consolidação antes de movimento"),
+    "doji": ("doji", "Doji - Indecisão do mercado, possível reversão"),
+    "bos_bullish": ("bos_bullish", "Break of Structure de Alta - Rompimento de topo"),
+    "bos_bearish": ("bos_bearish", "Break of Structure de Baixa - Rompimento de fundo"),
+}
+
 
 class PriceActionDetector:
     """Detect Price Action patterns in candlestick data"""
@@ -63,192 +76,189 @@ class PriceActionDetector:
         if len(df) < 3:
             return patterns
 
+        # Only the last 3 candles (plus the ones they are compared with) matter
+        offset = max(len(df) - 5, 0)
+        masks = self._masks(*self._ohlc(df, offset))
+
         # Check last 3 candles for patterns
         for i in range(len(df) - 3, len(df)):
             if i < 1:
                 continue
-
-            # Pin Bar (Hammer/Shooting Star)
-            pin = self._detect_pin_bar(df, i)
-            if pin:
-                patterns.append(pin)
-
-            # Engulfing patterns
-            engulf = self._detect_engulfing(df, i)
-            if engulf:
-                patterns.append(engulf)
-
-            # Inside Bar
-            inside = self._detect_inside_bar(df, i)
-            if inside:
-                patterns.append(inside)
-
-            # Doji
-            doji = self._detect_doji(df, i)
-            if doji:
-                patterns.append(doji)
+            patterns.extend(self._patterns_at(masks, i - offset, i))
 
         # Break of Structure (needs more candles)
         if len(df) >= 5:
-            bos = self._detect_break_of_structure(df)
+            bos = self._bos_at(masks, len(df) - 1 - offset, len(df) - 1)
             if bos:
                 patterns.append(bos)
 
         return patterns
 
-    def _detect_pin_bar(self, df: pd.DataFrame, index: int) -> Optional[PriceActionPattern]:
-        """Detect Pin Bar (Hammer or Shooting Star)"""
-        candle = df.iloc[index]
-
-        o, h, l, c = candle['open'], candle['high'], candle['low'], candle['close']
-        body = abs(c - o)
-        total_range = h - l
-
-        if total_range == 0:
-            return None
-
-        upper_wick = h - max(o, c)
-        lower_wick = min(o, c) - l
-
-        # Bullish Pin Bar (Hammer)
-        if lower_wick > body * self.thresholds["pin_bar_ratio"]:
-            if lower_wick / total_range >= self.thresholds["pin_bar_wick"]:
-                return PriceActionPattern(
-                    pattern_type="pin_bar",
-                    description="Pin Bar de Alta (Martelo) - Rejeição de preços baixos",
-                    candle_index=index
-                )
-
-        # Bearish Pin Bar (Shooting Star)
-        if upper_wick > body * self.thresholds["pin_bar_ratio"]:
-            if upper_wick / total_range >= self.thresholds["pin_bar_wick"]:
-                return PriceActionPattern(
-                    pattern_type="pin_bar",
-                    description="Pin Bar de Baixa (Estrela Cadente) - Rejeição de preços altos",
-                    candle_index=index
-                )
+    def detect_patterns_batch(
+        self,
+        o: np.ndarray,
+        h: np.ndarray,
+        l: np.ndarray,
+        c: np.ndarray
+    ) -> List[List[PriceActionPattern]]:
+        """
+        detect_patterns() of many symbols with the same number of candles
 
-        return None
+        Args:
+            o, h, l, c: (symbols, candles) OHLC arrays
 
-    def _detect_engulfing(self, df: pd.DataFrame, index: int) -> Optional[PriceActionPattern]:
-        """Detect Engulfing patterns"""
-        if index < 1:
-            return None
-
-        current = df.iloc[index]
-        previous = df.iloc[index - 1]
-
-        curr_body = abs(current['close'] - current['open'])
-        prev_body = abs(previous['close'] - previous['open'])
-
-        if prev_body == 0:
-            return None
-
-        # Bullish Engulfing
-        if (current['close'] > current['open'] and  # Current is bullish
-            previous['close'] < previous['open'] and  # Previous is bearish
-            current['open'] <= previous['close'] and  # Opens at or below previous close
-            current['close'] > previous['open'] and  # Closes above previous open
-            curr_body > prev_body * self.thresholds["engulfing_body"]):
-
-            return PriceActionPattern(
-                pattern_type="engulfing_bullish",
-                description="Engolfo de Alta - Reversão bullish forte",
-                candle_index=index
-            )
-
-        # Bearish Engulfing
-        if (current['close'] < current['open'] and  # Current is bearish
-            previous['close'] > previous['open'] and  # Previous is bullish
-            current['open'] >= previous['close'] and  # Opens at or above previous close
-            current['close'] < previous['open'] and  # Closes below previous open
-            curr_body > prev_body * self.thresholds["engulfing_body"]):
-
-            return PriceActionPattern(
-                pattern_type="engulfing_bearish",
-                description="Engolfo de Baixa - Reversão bearish forte",
-                candle_index=index
-            )
+        Returns:
+            The detect_patterns() list of every symbol, in row order
+        """
+        rows, n = c.shape
+        if n < 3:
+            return [[] for _ in range(rows)]
+
+        offset = max(n - 5, 0)
+        masks = self._masks(*(a[:, offset:] for a in (o, h, l, c)))
+
+        results = []
+        for symbol in range(rows):
+            row_masks = {key: mask[symbol] for key, mask in masks.items()}
+            patterns = []
+            for i in range(n - 3, n):
+                if i < 1:
+                    continue
+                patterns.extend(self._patterns_at(row_masks, i - offset, i))
+            if n >= 5:
+                bos = self._bos_at(row_masks, n - 1 - offset, n - 1)
+                if bos:
+                    patterns.append(bos)
+            results.append(patterns)
+        return results
+
+    def detect_all_patterns(self, df: pd.DataFrame) -> List[PriceActionPattern]:
+        """
+        Detect the patterns of every candle of the dataframe (backtesting)
 
-        return None
+        Each candle gets the patterns detect_patterns() would report for it
+        if it were one of the last 3 candles, followed by its BOS.
 
-    def _detect_inside_bar(self, df: pd.DataFrame, index: int) -> Optional[PriceActionPattern]:
-        """Detect Inside Bar pattern"""
-        if index < 1:
-            return None
+        Args:
+            df: DataFrame with OHLC data
 
-        current = df.iloc[index]
-        previous = df.iloc[index - 1]
+        Returns:
+            List of detected patterns, ordered by candle_index
+        """
+        masks = self.pattern_masks(df)
+        patterns = []
+        hits = np.flatnonzero(np.logical_or.reduce(list(masks.values()))) if len(df) else []
+        for i in hits:
+            i = int(i)
+            if i >= 1:
+                patterns.extend(self._patterns_at(masks, i, i))
+            bos = self._bos_at(masks, i, i)
+            if bos:
+                patterns.append(bos)
+        return patterns
 
-        # Current candle is completely inside previous candle
-        if (current['high'] <= previous['high'] and
-            current['low'] >= previous['low']):
+    def pattern_masks(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every pattern on every candle in one vectorized pass
 
-            curr_range = current['high'] - current['low']
-            prev_range = previous['high'] - previous['low']
+        Args:
+            df: DataFrame with OHLC data
 
-            if prev_range > 0 and curr_range / prev_range <= self.thresholds["inside_bar_ratio"]:
-                return PriceActionPattern(
-                    pattern_type="inside_bar",
-                    description="Inside Bar - Consolidação antes de movimento",
-                    candle_index=index
-                )
+        Returns:
+            Boolean array per pattern ("pin_bar_bullish", "pin_bar_bearish",
+            "engulfing_bullish", "engulfing_bearish", "inside_bar", "doji",
+            "bos_bullish", "bos_bearish"), True where the candle shows it
+        """
+        return self._masks(*self._ohlc(df))
 
-        return None
+    @staticmethod
+    def _ohlc(df: pd.DataFrame, offset: int = 0) -> Tuple[np.ndarray, ...]:
+        """open, high, low, close arrays from row offset on"""
+        return tuple(
+            df[column].to_numpy(dtype=float)[offset:]
+            for column in ('open', 'high', 'low', 'close')
+        )
 
-    def _detect_doji(self, df: pd.DataFrame, index: int) -> Optional[PriceActionPattern]:
-        """Detect Doji pattern"""
-        candle = df.iloc[index]
+    def _masks(self, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> Dict[str, np.ndarray]:
+        """Pattern masks along the last axis (one row of candles or many)"""
+        n = c.shape[-1]
 
-        o, h, l, c = candle['open'], candle['high'], candle['low'], candle['close']
-        body = abs(c - o)
+        body = np.abs(c - o)
         total_range = h - l
+        upper_wick = h - np.maximum(o, c)
+        lower_wick = np.minimum(o, c) - l
+        has_range = total_range != 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            lower_ratio = lower_wick / total_range
+            upper_ratio = upper_wick / total_range
+            body_ratio = body / total_range
+
+        # Pin Bar: the bullish (hammer) check wins over the bearish one
+        pin_bull = has_range & (lower_wick > body * self.thresholds["pin_bar_ratio"]) & \
+            (lower_ratio >= self.thresholds["pin_bar_wick"])
+        pin_bear = has_range & ~pin_bull & \
+            (upper_wick > body * self.thresholds["pin_bar_ratio"]) & \
+            (upper_ratio >= self.thresholds["pin_bar_wick"])
+
+        # Candle vs previous candle (never true for the first one)
+        po, ph, pl, pc = (np.roll(a, 1, axis=-1) for a in (o, h, l, c))
+        prev_body = np.abs(pc - po)
+        has_prev = np.arange(n) >= 1
+        engulf_size = has_prev & (prev_body != 0) & \
+            (body > prev_body * self.thresholds["engulfing_body"])
+        engulf_bull = engulf_size & (c > o) & (pc < po) & (o <= pc) & (c > po)
+        engulf_bear = engulf_size & ~engulf_bull & (c < o) & (pc > po) & (o >= pc) & (c < po)
+
+        prev_range = ph - pl
+        with np.errstate(divide="ignore", invalid="ignore"):
+            range_ratio = total_range / prev_range
+        inside = has_prev & (h <= ph) & (l >= pl) & (prev_range > 0) & \
+            (range_ratio <= self.thresholds["inside_bar_ratio"])
+
+        doji = has_range & (body_ratio <= self.thresholds["doji_body"])
+
+        # Break of Structure: candle vs the 4 candles before it
+        bos_bull = np.zeros(c.shape, dtype=bool)
+        bos_bear = np.zeros(c.shape, dtype=bool)
+        if n >= 5:
+            prev_high = sliding_window_view(h[..., :-1], 4, axis=-1).max(axis=-1)
+            prev_low = sliding_window_view(l[..., :-1], 4, axis=-1).min(axis=-1)
+            bos_bull[..., 4:] = h[..., 4:] > prev_high * 1.001  # 0.1% buffer
+            bos_bear[..., 4:] = ~bos_bull[..., 4:] & (l[..., 4:] < prev_low * 0.999)
+
+        return {
+            "pin_bar_bullish": pin_bull,
+            "pin_bar_bearish": pin_bear,
+            "engulfing_bullish": engulf_bull,
+            "engulfing_bearish": engulf_bear,
+            "inside_bar": inside,
+            "doji": doji,
+            "bos_bullish": bos_bull,
+            "bos_bearish": bos_bear,
+        }
 
-        if total_range == 0:
-            return None
-
-        # Body is very small compared to total range
-        if body / total_range <= self.thresholds["doji_body"]:
-            return PriceActionPattern(
-                pattern_type="doji",
-                description="Doji - Indecisão do mercado, possível reversão",
-                candle_index=index
-            )
-
+    def _patterns_at(self, masks: Dict[str, np.ndarray], row: int, index: int) -> List[PriceActionPattern]:
+        """Candle patterns of masks row, reported at candle_index index"""
+        found = []
+        for key in ("pin_bar_bullish", "pin_bar_bearish", "engulfing_bullish",
+                    "engulfing_bearish", "inside_bar", "doji"):
+            if masks[key][row]:
+                found.append(self._pattern(key, index))
+        return found
+
+    def _bos_at(self, masks: Dict[str, np.ndarray], row: int, index: int) -> Optional[PriceActionPattern]:
+        """Break of Structure of masks row, reported at candle_index index"""
+        for key in ("bos_bullish", "bos_bearish"):
+            if masks[key][row]:
+                return self._pattern(key, index)
         return None
 
-    def _detect_break_of_structure(self, df: pd.DataFrame) -> Optional[PriceActionPattern]:
-        """Detect Break of Structure (BOS)"""
-        if len(df) < 5:
-            return None
-
-        # Get recent highs and lows
-        recent_data = df.iloc[-5:]
-        highs = recent_data['high'].values
-        lows = recent_data['low'].values
-
-        # Bullish BOS: Break above recent high
-        if len(highs) >= 3:
-            prev_high = max(highs[:-1])
-            current_high = highs[-1]
-
-            if current_high > prev_high * 1.001:  # 0.1% buffer
-                return PriceActionPattern(
-                    pattern_type="bos_bullish",
-                    description="Break of Structure de Alta - Rompimento de topo",
-                    candle_index=len(df) - 1
-                )
-
-        # Bearish BOS: Break below recent low
-        if len(lows) >= 3:
-            prev_low = min(lows[:-1])
-            current_low = lows[-1]
-
-            if current_low < prev_low * 0.999:  # 0.1% buffer
-                return PriceActionPattern(
-                    pattern_type="bos_bearish",
-                    description="Break of Structure de Baixa - Rompimento de fundo",
-                    candle_index=len(df) - 1
-                )
-
-        return None
+    @staticmethod
+    def _pattern(key: str, index: int) -> PriceActionPattern:
+        pattern_type, description = PATTERNS[key]
+        return PriceActionPattern(
+            pattern_type=pattern_type,
+            description=description,
+            candle_index=index
+        )
@@ -3,10 +3,48 @@ Support and Resistance Level Detection
 """
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List
 from ...models.schemas import SupportResistanceLevel
 
 
+class _TouchCounter:
+    """
+    Count candles whose [low, high] range touches a price band
+
+    Lows and highs are sorted once (O(n log n)); each band is then counted
+    with two binary searches: a candle misses [level - tol, level + tol]
+    only if its low is above the band or its high is below it.
+    """
+
+    def __init__(self, highs: np.ndarray, lows: np.ndarray):
+        self.highs = highs
+        self.lows = lows
+        regular = lows <= highs  # False for NaN or inverted candles
+        self.sorted_lows = np.sort(lows[regular])
+        self.sorted_highs = np.sort(highs[regular])
+        # irregular candles are few (usually none): checked one by one
+        self.other_highs = highs[~regular]
+        self.other_lows = lows[~regular]
+
+    def count(self, level: float, tolerance_range: float) -> int:
+        upper = level + tolerance_range
+        lower = level - tolerance_range
+        if not upper >= lower:
+            # inverted band (negative level): a candle can miss it both ways
+            return int(np.count_nonzero((self.lows <= upper) & (self.highs >= lower)))
+
+        total = len(self.sorted_lows)
+        low_above = total - int(np.searchsorted(self.sorted_lows, upper, side='right'))
+        high_below = int(np.searchsorted(self.sorted_highs, lower, side='left'))
+        touches = total - low_above - high_below
+        if len(self.other_lows):
+            touches += int(np.count_nonzero(
+                (self.other_lows <= upper) & (self.other_highs >= lower)
+            ))
+        return touches
+
+
 class SupportResistanceDetector:
     """Detect support and resistance levels"""
 
@@ -39,21 +77,47 @@ class SupportResistanceDetector:
         if len(df) < self.lookback:
             return []
 
-        # Get recent data
-        recent_df = df.iloc[-self.lookback:]
+        return self.detect_levels_from_arrays(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float),
+            df['close'].iloc[-1],
+            max_levels
+        )
+
+    def detect_levels_from_arrays(
+        self,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        current_price: float,
+        max_levels: int = 5
+    ) -> List[SupportResistanceLevel]:
+        """
+        detect_levels() on high/low arrays (batch evaluation, no DataFrame)
+
+        Args:
+            highs: High prices, oldest first
+            lows: Low prices, oldest first
+            current_price: Last close
+            max_levels: Maximum number of levels to return
 
-        # Find pivot points (local highs and lows)
-        pivots = self._find_pivot_points(recent_df)
+        Returns:
+            List of support/resistance levels
+        """
+        if len(highs) < self.lookback:
+            return []
+
+        # Find pivot points (local highs and lows) of the recent data
+        pivots = self._find_pivot_points(highs[-self.lookback:], lows[-self.lookback:])
 
         # Cluster nearby levels
         levels = self._cluster_levels(pivots)
 
         # Calculate level strength
         levels_with_strength = []
-        current_price = df['close'].iloc[-1]
+        touches_counter = _TouchCounter(highs, lows)
 
         for level_price, level_type in levels:
-            touches = self._count_touches(df, level_price)
+            touches = touches_counter.count(level_price, level_price * self.tolerance)
             strength = min(touches, 5)  # Max strength is 5
 
             levels_with_strength.append(
@@ -73,76 +137,82 @@ class SupportResistanceDetector:
 
         return levels_with_strength[:max_levels]
 
-    def _find_pivot_points(self, df: pd.DataFrame) -> List[tuple]:
-        """Find pivot highs and lows"""
-        pivots = []
+    def _find_pivot_points(self, highs: np.ndarray, lows: np.ndarray) -> List[tuple]:
+        """
+        Find pivot highs and lows
+
+        A pivot is strictly above (below) the 2 candles on each side: the
+        rolling max (min) of its 4 neighbours, all windows at once.
+        """
+        if len(highs) < 5:
+            return []
+
+        high_windows = sliding_window_view(highs, 5)
+        low_windows = sliding_window_view(lows, 5)
+        neighbours = [0, 1, 3, 4]
 
-        for i in range(2, len(df) - 2):
-            # Pivot High (resistance)
-            if (df['high'].iloc[i] > df['high'].iloc[i-1] and
-                df['high'].iloc[i] > df['high'].iloc[i-2] and
-                df['high'].iloc[i] > df['high'].iloc[i+1] and
-                df['high'].iloc[i] > df['high'].iloc[i+2]):
-                pivots.append((df['high'].iloc[i], 'resistance'))
-
-            # Pivot Low (support)
-            if (df['low'].iloc[i] < df['low'].iloc[i-1] and
-                df['low'].iloc[i] < df['low'].iloc[i-2] and
-                df['low'].iloc[i] < df['low'].iloc[i+1] and
-                df['low'].iloc[i] < df['low'].iloc[i+2]):
-                pivots.append((df['low'].iloc[i], 'support'))
+        # Pivot High (resistance) / Pivot Low (support)
+        is_high = high_windows[:, 2] > high_windows[:, neighbours].max(axis=1)
+        is_low = low_windows[:, 2] < low_windows[:, neighbours].min(axis=1)
+
+        pivots = []
+        for i in np.flatnonzero(is_high | is_low) + 2:
+            if is_high[i - 2]:
+                pivots.append((highs[i], 'resistance'))
+            if is_low[i - 2]:
+                pivots.append((lows[i], 'support'))
 
         return pivots
 
     def _cluster_levels(self, pivots: List[tuple]) -> List[tuple]:
-        """Cluster nearby price levels"""
+        """
+        Cluster nearby price levels
+
+        One sweep over the pivots sorted by price: the cluster average is
+        kept as a running sum instead of recomputed for every pivot.
+        """
         if not pivots:
             return []
 
         clustered = []
         sorted_pivots = sorted(pivots, key=lambda x: x[0])
+        prices = np.array([p[0] for p in sorted_pivots], dtype=float)
 
-        current_cluster = [sorted_pivots[0]]
+        start = 0
+        cluster_sum = prices[0]
 
-        for pivot in sorted_pivots[1:]:
+        for i in range(1, len(prices)):
             # If pivot is close to current cluster, add it
-            cluster_avg = np.mean([p[0] for p in current_cluster])
+            cluster_avg = cluster_sum / (i - start)
 
-            if abs(pivot[0] - cluster_avg) / cluster_avg <= self.tolerance:
-                current_cluster.append(pivot)
+            if abs(prices[i] - cluster_avg) / cluster_avg <= self.tolerance:
+                cluster_sum += prices[i]
             else:
                 # Finish current cluster and start new one
-                avg_price = np.mean([p[0] for p in current_cluster])
-                # Determine if support or resistance (most common in cluster)
-                types = [p[1] for p in current_cluster]
-                level_type = max(set(types), key=types.count)
-
-                clustered.append((avg_price, level_type))
-                current_cluster = [pivot]
+                clustered.append(self._cluster_level(prices, sorted_pivots, start, i))
+                start = i
+                cluster_sum = prices[i]
 
         # Add last cluster
-        if current_cluster:
-            avg_price = np.mean([p[0] for p in current_cluster])
-            types = [p[1] for p in current_cluster]
-            level_type = max(set(types), key=types.count)
-            clustered.append((avg_price, level_type))
+        clustered.append(self._cluster_level(prices, sorted_pivots, start, len(prices)))
 
         return clustered
 
+    @staticmethod
+    def _cluster_level(prices: np.ndarray, sorted_pivots: List[tuple], start: int, end: int) -> tuple:
+        """(average price, most common type) of sorted_pivots[start:end]"""
+        avg_price = np.mean(prices[start:end])
+        types = [p[1] for p in sorted_pivots[start:end]]
+        level_type = max(set(types), key=types.count)
+        return avg_price, level_type
+
     def _count_touches(self, df: pd.DataFrame, level: float) -> int:
         """Count how many times price touched a level"""
-        touches = 0
-        tolerance_range = level * self.tolerance
-
-        for i in range(len(df)):
-            high = df['high'].iloc[i]
-            low = df['low'].iloc[i]
-
-            # Check if candle touched the level
-            if low <= level + tolerance_range and high >= level - tolerance_range:
-                touches += 1
-
-        return touches
+        counter = _TouchCounter(
+            df['high'].to_numpy(dtype=float),
+            df['low'].to_numpy(dtype=float)
+        )
+        return counter.count(level, level * self.tolerance)
 
     def is_near_level(
         self,
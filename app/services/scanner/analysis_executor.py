@@ -0,0 +1,239 @@
+"""
+Analysis Executor
+Runs SignalGenerator analysis off the asyncio event loop
+"""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ...models.schemas import ScanConfig, TradingSignal
+from .signal_generator import SignalGenerator, stack_candles
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+# generators of a process pool worker, per config
+_worker_generators: Dict[str, SignalGenerator] = {}
+
+
+def _timed(fn, *args):
+    """Run fn(*args) and return (result, seconds spent running it)"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _generate_in_worker(
+    config: ScanConfig,
+    shm_name: str,
+    shape: tuple,
+    symbols: List[str]
+) -> Dict[str, Optional[TradingSignal]]:
+    """Process pool task: generate_signals on candles in shared memory"""
+    key = config.model_dump_json()
+    generator = _worker_generators.get(key)
+    if generator is None:
+        generator = _worker_generators[key] = SignalGenerator(config)
+
+    block = shared_memory.SharedMemory(name=shm_name)
+    try:
+        candles = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+        try:
+            return generator.generate_signals(symbols, candles)
+        finally:
+            del candles  # the buffer must be released before close()
+    finally:
+        block.close()
+
+
+class AnalysisExecutor:
+    """
+    Executor stage for signal analysis
+
+    Modes:
+    - thread: a thread pool; the numpy/pandas kernels release the GIL, and
+      the event loop keeps serving websockets and HTTP while pairs run;
+    - process: a process pool; the candles of a batch are copied once into
+      a shared memory block that the worker maps instead of unpickling
+      DataFrames, and evaluated with generate_signals;
+    - inline: on the event loop (the previous behaviour).
+
+    Every mode computes the same signals: the frame and batch paths share
+    the indicator definitions and keep no state between calls, so
+    concurrent tasks of the thread pool cannot interfere.
+
+    At most ``max_pending`` tasks are queued or running; further calls wait
+    for a slot (backpressure). Every task records its wait and run time.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        max_workers: int = 4,
+        max_pending: int = 64,
+        history: int = 500
+    ):
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Invalid executor mode {mode!r}, expected one of {EXECUTOR_MODES}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending = 0
+        self.timings: deque = deque(maxlen=history)
+        self.totals = {"tasks": 0, "failures": 0, "symbols": 0, "wait_s": 0.0, "run_s": 0.0, "max_run_s": 0.0}
+
+    async def generate_signal(
+        self,
+        generator: SignalGenerator,
+        symbol: str,
+        df: pd.DataFrame
+    ) -> Optional[TradingSignal]:
+        """
+        generator.generate_signal(symbol, df) on the executor
+
+        Args:
+            generator: Signal generator of the scan
+            symbol: Trading pair symbol
+            df: DataFrame with OHLC data
+
+        Returns:
+            TradingSignal if valid signal found, None otherwise
+        """
+        if self.mode == "process":
+            results = await self.generate_signals(generator, {symbol: df})
+            return results[symbol]
+        return await self._run(symbol, 1, generator.generate_signal, symbol, df)
+
+    async def generate_signals(
+        self,
+        generator: SignalGenerator,
+        frames: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Optional[TradingSignal]]:
+        """
+        generator.generate_signals_for_frames(frames) on the executor
+
+        Args:
+            generator: Signal generator of the scan
+            frames: Dict of symbol -> DataFrame with OHLC data
+
+        Returns:
+            Dict of symbol -> TradingSignal or None, in frames order
+        """
+        if not frames:
+            return {}
+        if self.mode != "process":
+            return await self._run(
+                f"batch[{len(frames)}]", len(frames), generator.generate_signals_for_frames, frames
+            )
+
+        groups: Dict[int, List[str]] = {}
+        for symbol, df in frames.items():
+            groups.setdefault(len(df), []).append(symbol)
+
+        results: Dict[str, Optional[TradingSignal]] = {}
+        for symbols in groups.values():
+            candles = stack_candles([frames[symbol] for symbol in symbols])
+            block = shared_memory.SharedMemory(create=True, size=max(candles.nbytes, 1))
+            try:
+                np.ndarray(candles.shape, dtype=np.float64, buffer=block.buf)[:] = candles
+                results.update(await self._run(
+                    f"batch[{len(symbols)}]", len(symbols),
+                    _generate_in_worker, generator.config, block.name, candles.shape, symbols
+                ))
+            finally:
+                block.close()
+                block.unlink()
+        return {symbol: results[symbol] for symbol in frames}
+
+    async def _run(self, label: str, symbols: int, fn, *args):
+        queued = time.perf_counter()
+        async with self._slots:
+            self._pending += 1
+            started = time.perf_counter()
+            run = 0.0
+            failed = False
+            try:
+                if self.mode == "inline":
+                    result, run = _timed(fn, *args)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result, run = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+                return result
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                self._pending -= 1
+                self._record(label, symbols, started - queued, run, failed)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="analysis"
+                )
+        return self._executor
+
+    def _record(self, label: str, symbols: int, wait: float, run: float, failed: bool):
+        self.timings.append({
+            "task": label,
+            "symbols": symbols,
+            "wait_ms": round(wait * 1000, 3),
+            "run_ms": round(run * 1000, 3),
+            "failed": failed,
+        })
+        totals = self.totals
+        totals["tasks"] += 1
+        totals["failures"] += failed
+        totals["symbols"] += symbols
+        totals["wait_s"] += wait
+        totals["run_s"] += run
+        totals["max_run_s"] = max(totals["max_run_s"], run)
+
+    def stats(self, recent: int = 20) -> dict:
+        """Executor configuration, load, timing totals and the last tasks"""
+        tasks = self.totals["tasks"] or 1
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "tasks": self.totals["tasks"],
+            "failures": self.totals["failures"],
+            "symbols": self.totals["symbols"],
+            "avg_wait_ms": round(self.totals["wait_s"] / tasks * 1000, 3),
+            "avg_run_ms": round(self.totals["run_s"] / tasks * 1000, 3),
+            "max_run_ms": round(self.totals["max_run_s"] * 1000, 3),
+            "recent": list(self.timings)[-recent:],
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool (recreated on the next task)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_analysis_executor: Optional[AnalysisExecutor] = None
+
+
+def get_analysis_executor() -> AnalysisExecutor:
+    """Return the process-wide analysis executor, configured from settings"""
+    global _analysis_executor
+    if _analysis_executor is None:
+        from ...core.config import settings
+        _analysis_executor = AnalysisExecutor(
+            mode=settings.ANALYSIS_EXECUTOR,
+            max_workers=settings.ANALYSIS_WORKERS,
+            max_pending=settings.ANALYSIS_MAX_PENDING
+        )
+    return _analysis_executor
@@ -4,23 +4,36 @@ Scans multiple pairs simultaneously for trading opportunities
 NOW USING REAL MARKET DATA FROM BINANCE!
 """
 import asyncio
+import logging
+import time
 from typing import List, Optional, Dict, Union
-from datetime import datetime, timedelta
+import pandas as pd
+from ...core.config import settings
+from ...core.metrics import SCAN_CYCLE_SECONDS, SCAN_FETCH_SECONDS, SCAN_PAIRS, SIGNALS_PER_CYCLE
 from ...models.schemas import ScanConfig, TradingSignal
 from .mboption_client import MBOptionClient
 from .market_data_client import RealMarketDataClient
 from .iqoption_client import IQOptionClient
 from .signal_generator import SignalGenerator
+from .analysis_executor import get_analysis_executor
+from .candle_scheduler import CandleScheduler
+from .signal_store import SignalStore
 from ...websocket.signal_websocket import ws_manager
 
+logger = logging.getLogger(__name__)
+
 
 class AutoScanner:
     """Automatically scan multiple pairs for trading signals"""
 
+    # Source of this scanner's events in the owner's WebSocket event log
+    SOURCE = "auto"
+
     def __init__(
         self,
         client: Union[MBOptionClient, RealMarketDataClient, IQOptionClient],
-        config: ScanConfig
+        config: ScanConfig,
+        owner: Optional[str] = None
     ):
         """
         Initialize auto scanner
@@ -28,67 +41,114 @@ class AutoScanner:
         Args:
             client: MB Option client
             config: Scan configuration
+            owner: Username whose WebSocket clients receive the signals
+                (None: every client)
         """
         self.client = client
         self.config = config
+        self.owner = owner
         self.signal_generator = SignalGenerator(config)
+        self.executor = get_analysis_executor()
+        # Scans aligned to candle close (server time when the client has it)
+        self.scheduler = CandleScheduler(clock=getattr(client, "server_time", None))
+        self._stop = asyncio.Event()
         self.is_running = False
-        self.latest_signals: Dict[str, TradingSignal] = {}  # ultimo por simbolo
-        self.signal_history: List[TradingSignal] = []
-        self.signal_index: Dict[str, TradingSignal] = {}
+        # Historico indexado por id, simbolo, horario e confianca
+        self.signals = SignalStore(
+            max_size=settings.SIGNAL_HISTORY_SIZE,
+            ttl=settings.SIGNAL_HISTORY_TTL_MINUTES * 60
+        )
+
+    @property
+    def latest_signals(self) -> Dict[str, TradingSignal]:
+        """Last signal per symbol"""
+        return self.signals.latest_by_symbol()
 
     async def start_scanning(self):
         """Start the scanning process"""
         self.is_running = True
+        self._stop.clear()
+        await self._broadcast_status()
 
         while self.is_running:
             try:
                 pairs = await self._get_pairs_to_scan()
                 if not pairs:
-                    print('[AutoScanner] Nenhuma paridade disponivel para o modo atual.')
+                    logger.info("[AutoScanner] Nenhuma paridade disponivel para o modo atual.")
                     await asyncio.sleep(8)
                     continue
 
-                print(f"[AutoScanner] Varredura em {len(pairs)} paridades...")
+                # Acorda logo apos o fechamento do candle, pares com dados novos primeiro
+                timeframe = self.config.timeframe
+                pairs_by_symbol = {pair['symbol']: pair for pair in pairs}
+                self.scheduler.sync(((symbol, timeframe), timeframe) for symbol in pairs_by_symbol)
+                jobs = await self.scheduler.next_batch(stop=self._stop)
+                pairs = [pairs_by_symbol[symbol] for symbol, _ in jobs if symbol in pairs_by_symbol]
+                if not self.is_running or not pairs:
+                    continue
+
+                logger.info("[AutoScanner] Varredura em %s paridades...", len(pairs))
+                cycle_start = time.perf_counter()
 
-                tasks = [self._scan_pair(pair) for pair in pairs]
+                tasks = [self._fetch_pair(pair) for pair in pairs]
                 results = await asyncio.gather(*tasks, return_exceptions=True)
+                frames = {
+                    pair['symbol']: df
+                    for pair, df in zip(pairs, results)
+                    if isinstance(df, pd.DataFrame)
+                }
+                for symbol, df in frames.items():
+                    self.scheduler.observe((symbol, timeframe), df)
 
-                # Process results
-                new_signals = []
-                for result in results:
-                    if isinstance(result, TradingSignal):
-                        new_signals.append(result)
+                # Todos os pares avaliados de uma vez (indicadores vetorizados)
+                new_signals = await self._scan_frames(frames)
 
                 # Log new signals and broadcast via WebSocket
                 if new_signals:
-                    print(f"[AutoScanner] {len(new_signals)} novos sinais detectados!")
+                    logger.info("[AutoScanner] %s novos sinais detectados!", len(new_signals))
                     for signal in new_signals:
-                        print(f"  - {signal.symbol}: {signal.direction} "
-                              f"({signal.confidence:.1f}% confianca)")
-                        self.latest_signals[signal.symbol] = signal
-                        self.signal_history.append(signal)
-                        self.signal_index[signal.signal_id] = signal
-                        if len(self.signal_history) > 200:
-                            oldest = self.signal_history.pop(0)
-                            self.signal_index.pop(oldest.signal_id, None)
-                            if self.latest_signals.get(oldest.symbol) == oldest:
-                                self.latest_signals.pop(oldest.symbol, None)
-
-                        await ws_manager.broadcast_signal(signal.dict())
-
-                # Wait before next scan cycle - REDUZIDO para gerar mais sinais
-                # Modo agressivo: 2 segundos, outros: 4 segundos
-                await asyncio.sleep(2 if self.config.sensitivity == "aggressive" else 4)
+                        logger.info("  - %s: %s (%.1f%% confianca)",
+                                    signal.symbol, signal.direction, signal.confidence)
+                        self.signals.add(signal)
+
+                    # One frame per client for the whole cycle (none after a stop's reset)
+                    if self.is_running:
+                        await ws_manager.broadcast_signals(
+                            [signal.dict() for signal in new_signals], owner=self.owner, source=self.SOURCE
+                        )
+
+                SCAN_CYCLE_SECONDS.labels("auto").observe(time.perf_counter() - cycle_start)
+                SCAN_PAIRS.labels("auto").inc(len(pairs))
+                SIGNALS_PER_CYCLE.labels("auto").observe(len(new_signals))
 
             except Exception as e:
-                print(f"[AutoScanner] Erro durante scan: {e}")
+                logger.error("[AutoScanner] Erro durante scan: %s", e)
                 await asyncio.sleep(5)
 
     def stop_scanning(self):
         """Stop the scanning process"""
         self.is_running = False
-        print("[AutoScanner] Scan interrompido.")
+        self._stop.set()
+        self.scheduler.clear()
+        # Clients drop this scanner's signals (the other scanners' stay)
+        asyncio.ensure_future(ws_manager.reset_signals(self.owner, source=self.SOURCE))
+        asyncio.ensure_future(self._broadcast_status())
+        logger.info("[AutoScanner] Scan interrompido.")
+
+    def get_status(self) -> dict:
+        """Get scanner status"""
+        return {
+            "is_running": self.is_running,
+            "signals_count": len(self.latest_signals),
+            "config": {
+                "timeframe": self.config.timeframe,
+                "sensitivity": self.config.sensitivity,
+            }
+        }
+
+    async def _broadcast_status(self):
+        """Send get_status() to the owner's WebSocket clients"""
+        await ws_manager.broadcast_scanner_status(self.get_status(), owner=self.owner, source=self.SOURCE)
 
     async def _get_pairs_to_scan(self) -> List[dict]:
         """Get list of pairs to scan based on configuration"""
@@ -101,16 +161,16 @@ class AutoScanner:
         pairs = await self.client.get_available_pairs(include_otc=include_otc_flag)
 
         # LOG: Pares obtidos antes do filtro
-        print(f"[AutoScanner] Pares disponíveis ANTES do filtro: {len(pairs)}")
+        logger.debug("[AutoScanner] Pares disponíveis ANTES do filtro: %s", len(pairs))
 
         if self.config.only_otc:
             pairs = [p for p in pairs if p['is_otc']]
-            print(f"[AutoScanner] Filtro OTC aplicado: {len(pairs)} pares OTC")
+            logger.debug("[AutoScanner] Filtro OTC aplicado: %s pares OTC", len(pairs))
         elif self.config.only_open_market:
             pairs = [p for p in pairs if not p['is_otc']]
-            print(f"[AutoScanner] Filtro MERCADO ABERTO aplicado: {len(pairs)} pares")
+            logger.debug("[AutoScanner] Filtro MERCADO ABERTO aplicado: %s pares", len(pairs))
         else:
-            print(f"[AutoScanner] SEM FILTRO de mercado: {len(pairs)} pares (OTC + Aberto)")
+            logger.debug("[AutoScanner] SEM FILTRO de mercado: %s pares (OTC + Aberto)", len(pairs))
 
         # Aumentar para 30 pares para compensar os que falham
         max_pairs = 30
@@ -119,28 +179,29 @@ class AutoScanner:
 
         limit = pairs[:max_pairs]
 
-        print(f"[AutoScanner] Total de pares que serão analisados: {len(limit)}")
+        logger.debug("[AutoScanner] Total de pares que serão analisados: %s", len(limit))
         return limit
 
-    async def _scan_pair(self, pair: dict) -> Optional[TradingSignal]:
+    async def _fetch_pair(self, pair: dict) -> Optional[pd.DataFrame]:
         """
-        Scan a single pair for trading signals
+        Fetch the candles of a single pair
 
         Args:
             pair: Trading pair information
 
         Returns:
-            TradingSignal if found, None otherwise
+            DataFrame with OHLC data, None if unavailable or too short
         """
         try:
             symbol = pair['symbol']
 
             # Get candlestick data
-            data = await self.client.get_candles(
-                symbol=symbol,
-                timeframe=self.config.timeframe,
-                limit=100
-            )
+            with SCAN_FETCH_SECONDS.labels("auto").time():
+                data = await self.client.get_candles(
+                    symbol=symbol,
+                    timeframe=self.config.timeframe,
+                    limit=100
+                )
 
             # Reduzir requisito mínimo para gerar mais sinais
             min_needed = 20 if self.config.sensitivity == "aggressive" else 30
@@ -149,30 +210,50 @@ class AutoScanner:
 
             # Convert to DataFrame if needed (IQ Option returns list of dicts)
             if isinstance(data, list):
-                import pandas as pd
-                df = pd.DataFrame(data)
-            else:
-                df = data
-
-            # Generate signal
-            signal = self.signal_generator.generate_signal(symbol, df)
+                return pd.DataFrame(data)
+            return data
 
-            # Check if this is a new signal (not duplicate)
-            if signal:
-                # Check if we already have a recent signal for this symbol
-                if symbol in self.latest_signals:
-                    prev_signal = self.latest_signals[symbol]
-                    time_diff = (signal.timestamp - prev_signal.timestamp).total_seconds()
+        except Exception as e:
+            logger.warning("[AutoScanner] Erro ao escanear %s: %s", pair['symbol'], e)
+            return None
 
-                    # Ignore duplicates only se IDÊNTICO (15 segundos + mesma direção)
-                    if time_diff < 15 and signal.direction == prev_signal.direction:
-                        return None
+    async def _scan_frames(self, frames: Dict[str, pd.DataFrame]) -> List[TradingSignal]:
+        """
+        Generate the signals of every fetched pair in one batch, on the
+        analysis executor so the event loop stays free
 
-            return signal
+        Args:
+            frames: Dict of symbol -> candles
 
+        Returns:
+            New (non duplicate) trading signals
+        """
+        try:
+            results = await self.executor.generate_signals(self.signal_generator, frames)
         except Exception as e:
-            print(f"[AutoScanner] Erro ao escanear {pair['symbol']}: {e}")
-            return None
+            # Um par com dados invalidos nao derruba o lote: avalia um a um
+            logger.error("[AutoScanner] Erro na avaliacao em lote: %s", e)
+            results = {}
+            for symbol, df in frames.items():
+                try:
+                    results[symbol] = await self.executor.generate_signal(self.signal_generator, symbol, df)
+                except Exception as exc:
+                    logger.warning("[AutoScanner] Erro ao escanear %s: %s", symbol, exc)
+
+        return [
+            signal for signal in results.values()
+            if signal and not self._is_duplicate(signal)
+        ]
+
+    def _is_duplicate(self, signal: TradingSignal) -> bool:
+        """Check if we already have a recent signal for this symbol"""
+        prev_signal = self.signals.latest(signal.symbol)
+        if prev_signal is None:
+            return False
+        time_diff = (signal.timestamp - prev_signal.timestamp).total_seconds()
+
+        # Ignore duplicates only se IDÊNTICO (15 segundos + mesma direção)
+        return time_diff < 15 and signal.direction == prev_signal.direction
 
     def get_latest_signals(
         self,
@@ -189,30 +270,17 @@ class AutoScanner:
         Returns:
             List of trading signals
         """
-        signals = [s for s in reversed(self.signal_history) if s.confidence >= min_confidence]
-        return signals[:limit]
+        return self.signals.recent(limit, min_confidence)
 
     def get_signal_by_id(self, signal_id: str) -> Optional[TradingSignal]:
         """Get a specific signal by ID"""
-        return self.signal_index.get(signal_id)
+        return self.signals.get(signal_id)
 
     def clear_old_signals(self, max_age_minutes: int = 30):
         """Remove signals older than specified minutes"""
-        cutoff = datetime.now() - timedelta(minutes=max_age_minutes)
-
-        initial_count = len(self.signal_history)
-        self.signal_history = [s for s in self.signal_history if s.timestamp >= cutoff]
-        self.signal_index = {s.signal_id: s for s in self.signal_history}
-
-        self.latest_signals = {}
-        for sig in self.signal_history:
-            prev = self.latest_signals.get(sig.symbol)
-            if not prev or sig.timestamp > prev.timestamp:
-                self.latest_signals[sig.symbol] = sig
-
-        removed = initial_count - len(self.signal_history)
+        removed = self.signals.evict_before(time.time() - max_age_minutes * 60)
         if removed > 0:
-            print(f"[AutoScanner] Removidos {removed} sinais antigos.")
+            logger.info("[AutoScanner] Removidos %s sinais antigos.", removed)
 
 
 
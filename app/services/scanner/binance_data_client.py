@@ -3,12 +3,15 @@ Binance Data Client - DADOS REAIS SEM LIMITE
 Fornece dados de criptomoedas em tempo real da Binance
 """
 import asyncio
+import logging
 import aiohttp
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import time
 
+logger = logging.getLogger(__name__)
+
 
 class BinanceDataClient:
     """Client para dados REAIS da Binance - SEM LIMITE DE REQUISICOES"""
@@ -56,12 +59,12 @@ class BinanceDataClient:
         try:
             async with self.session.get(f"{self.base_url}/ping") as response:
                 if response.status == 200:
-                    print("[BINANCE] OK Conectado a Binance API (DADOS REAIS)")
-                    print(f"[BINANCE] {len(self.trading_pairs)} pares de cripto disponiveis")
-                    print("[BINANCE] SEM LIMITE de requisicoes!")
+                    logger.info("[BINANCE] OK Conectado a Binance API (DADOS REAIS)")
+                    logger.info("[BINANCE] %s pares de cripto disponiveis", len(self.trading_pairs))
+                    logger.info("[BINANCE] SEM LIMITE de requisicoes!")
                     return True
         except Exception as e:
-            print(f"[BINANCE] ERRO ao conectar: {e}")
+            logger.warning("[BINANCE] ERRO ao conectar: %s", e)
             return False
 
     async def disconnect(self):
@@ -147,14 +150,14 @@ class BinanceDataClient:
                     # Selecionar colunas necessarias
                     df = df[['timestamp', 'open', 'high', 'low', 'close', 'volume']]
 
-                    print(f"[BINANCE] OK {symbol} - {len(df)} candles REAIS obtidos")
+                    logger.debug("[BINANCE] OK %s - %s candles REAIS obtidos", symbol, len(df))
                     return df
                 else:
-                    print(f"[BINANCE] ERRO HTTP {response.status} para {symbol}")
+                    logger.warning("[BINANCE] ERRO HTTP %s para %s", response.status, symbol)
                     return None
 
         except Exception as e:
-            print(f"[BINANCE] ERRO ao buscar {symbol}: {e}")
+            logger.warning("[BINANCE] ERRO ao buscar %s: %s", symbol, e)
             return None
 
     async def get_current_price(self, symbol: str) -> Optional[float]:
@@ -180,7 +183,7 @@ class BinanceDataClient:
                     return float(data['price'])
 
         except Exception as e:
-            print(f"[BINANCE] ERRO ao buscar preco {symbol}: {e}")
+            logger.warning("[BINANCE] ERRO ao buscar preco %s: %s", symbol, e)
 
         return None
 
@@ -0,0 +1,190 @@
+"""
+Candle Close Scheduler
+Wakes each (pair, timeframe) right after its candle closes
+"""
+import asyncio
+import math
+import time
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class CandleScheduler:
+    """
+    Schedule pair scans on candle boundaries instead of fixed sleeps
+
+    - Every job waits for the close of its timeframe's candle in server time
+      (``clock``, e.g. IQOptionClient.server_time), plus ``close_delay``
+      seconds for the closed candle to reach the candle stream.
+    - Jobs due at the same close (a cohort: at :00 every timeframe closes)
+      are ordered by priority, pairs whose data changed on the last scan
+      first, and released in slices of ``slice_size`` spread over ``spread``
+      seconds so the CPU is not hit in one burst.
+    - Jobs added with run_now are due immediately (first scan on start).
+    """
+
+    def __init__(
+        self,
+        clock: Optional[Callable[[], float]] = None,
+        close_delay: float = 1.0,
+        spread: float = 3.0,
+        slice_size: int = 10
+    ):
+        self.clock = clock or time.time
+        self.close_delay = close_delay
+        self.spread = spread
+        self.slice_size = max(1, slice_size)
+        # key -> (candle seconds, server time it is due at)
+        self._jobs: Dict[Hashable, Tuple[int, float]] = {}
+        # key -> priority score, raised by changed data and decayed otherwise
+        self._scores: Dict[Hashable, float] = {}
+        # key -> (timestamp, close) of the last candle seen
+        self._last_candles: Dict[Hashable, tuple] = {}
+        # slices of the current cohort not released yet: (release time, keys)
+        self._slices: List[Tuple[float, List[Hashable]]] = []
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._jobs
+
+    def add(self, key: Hashable, timeframe: int, run_now: bool = True):
+        """
+        Schedule a job
+
+        Args:
+            key: Job identifier, usually (symbol, timeframe)
+            timeframe: Candle size in minutes
+            run_now: Due immediately instead of at the next close
+        """
+        seconds = max(1, int(timeframe)) * 60
+        now = self.clock()
+        due = now if run_now else self.next_close(seconds, now) + self.close_delay
+        self._jobs[key] = (seconds, due)
+        self._scores.setdefault(key, 0.0)
+
+    def remove(self, key: Hashable):
+        """Unschedule a job"""
+        self._jobs.pop(key, None)
+        self._scores.pop(key, None)
+        self._last_candles.pop(key, None)
+        for _, keys in self._slices:
+            if key in keys:
+                keys.remove(key)
+
+    def sync(self, jobs: Iterable[Tuple[Hashable, int]]):
+        """
+        Make the scheduled jobs match (key, timeframe) pairs: new keys are
+        added (due now) and keys no longer listed removed
+        """
+        wanted = dict(jobs)
+        for key in [key for key in self._jobs if key not in wanted]:
+            self.remove(key)
+        for key, timeframe in wanted.items():
+            if key not in self._jobs:
+                self.add(key, timeframe)
+
+    def clear(self):
+        """Unschedule every job"""
+        self._jobs.clear()
+        self._scores.clear()
+        self._last_candles.clear()
+        self._slices.clear()
+
+    def mark(self, key: Hashable, changed: bool):
+        """
+        Report whether a scan saw new data, raising or decaying the
+        priority of the job in its next cohort
+        """
+        if key in self._scores:
+            self._scores[key] = self._scores[key] * 0.5 + (1.0 if changed else 0.0)
+
+    def observe(self, key: Hashable, candles) -> bool:
+        """
+        Record the last candle fetched for a job and mark() whether it changed
+
+        Args:
+            key: Job identifier
+            candles: DataFrame of the scan (timestamp and close columns)
+
+        Returns:
+            True if the last candle differs from the previous scan's
+        """
+        last = candles.iloc[-1]
+        marker = (last.get("timestamp", len(candles)), last["close"])
+        changed = self._last_candles.get(key) != marker
+        self._last_candles[key] = marker
+        self.mark(key, changed)
+        return changed
+
+    @staticmethod
+    def next_close(seconds: int, now: float) -> float:
+        """Server time of the next candle boundary after now"""
+        return (math.floor(now / seconds) + 1) * seconds
+
+    def close_in(self, timeframe: int) -> float:
+        """Seconds until the current candle of a timeframe closes"""
+        seconds = max(1, int(timeframe)) * 60
+        now = self.clock()
+        return self.next_close(seconds, now) - now
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next slice is released, None if nothing scheduled"""
+        times = [release for release, keys in self._slices if keys]
+        times.extend(due for _, due in self._jobs.values())
+        if not times:
+            return None
+        return max(0.0, min(times) - self.clock())
+
+    def due(self) -> List[Hashable]:
+        """
+        Release the jobs due now (without waiting)
+
+        Returns:
+            Keys to scan now, highest priority first
+        """
+        now = self.clock()
+        self._slices = [(release, keys) for release, keys in self._slices if keys]
+        if self._slices and self._slices[0][0] <= now:
+            return self._slices.pop(0)[1]
+
+        cohort = [key for key, (_, due) in self._jobs.items() if due <= now]
+        if not cohort:
+            return []
+
+        for key in cohort:
+            seconds, _ = self._jobs[key]
+            self._jobs[key] = (seconds, self.next_close(seconds, now) + self.close_delay)
+
+        cohort.sort(key=lambda key: self._scores.get(key, 0.0), reverse=True)
+        slices = [cohort[i:i + self.slice_size] for i in range(0, len(cohort), self.slice_size)]
+        step = self.spread / len(slices)
+        self._slices.extend((now + step * i, keys) for i, keys in enumerate(slices[1:], 1))
+        self._slices.sort(key=lambda item: item[0])
+        return slices[0]
+
+    async def next_batch(self, stop: Optional[asyncio.Event] = None) -> List[Hashable]:
+        """
+        Wait for the next due slice
+
+        Args:
+            stop: Event that interrupts the wait (returns [] when set)
+
+        Returns:
+            Keys to scan now, highest priority first ([] if stopped or empty)
+        """
+        while True:
+            keys = self.due()
+            if keys:
+                return keys
+            wait = self.next_due_in()
+            if wait is None or (stop is not None and stop.is_set()):
+                return []
+            if stop is None:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=wait)
+                return []
+            except asyncio.TimeoutError:
+                pass
@@ -3,12 +3,15 @@ Real FOREX Data Client
 Integrates with Alpha Vantage API for real-time FOREX data
 """
 import asyncio
+import logging
 import aiohttp
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import json
 
+logger = logging.getLogger(__name__)
+
 
 class RealForexDataClient:
     """Client for Real FOREX Data using Alpha Vantage API"""
@@ -53,8 +56,8 @@ class RealForexDataClient:
         """Establish connection"""
         if not self.session:
             self.session = aiohttp.ClientSession()
-        print("[RealForexData] OK Conectado a API Alpha Vantage (dados REAIS de FOREX)")
-        print("[RealForexData] 15 pares de moedas disponiveis")
+        logger.info("[RealForexData] OK Conectado a API Alpha Vantage (dados REAIS de FOREX)")
+        logger.info("[RealForexData] 15 pares de moedas disponiveis")
         return True
 
     async def disconnect(self):
@@ -80,7 +83,7 @@ class RealForexDataClient:
                 "is_active": True
             })
 
-        print(f"[RealForexData] OK {len(pairs)} pares REAIS de FOREX disponiveis")
+        logger.debug("[RealForexData] OK %s pares REAIS de FOREX disponiveis", len(pairs))
         return pairs
 
     async def get_candles(
@@ -105,7 +108,7 @@ class RealForexDataClient:
 
         # Converter símbolo
         if symbol not in self.symbol_map:
-            print(f"[RealForexData] AVISO Símbolo {symbol} não encontrado, usando EURUSD")
+            logger.debug("[RealForexData] AVISO Símbolo %s não encontrado, usando EURUSD", symbol)
             symbol = "EURUSD"
 
         from_symbol = self.symbol_map[symbol]["from"]
@@ -131,7 +134,7 @@ class RealForexDataClient:
                     # Verificar se há dados
                     time_series_key = f"Time Series FX ({interval})"
                     if time_series_key not in data:
-                        print(f"[RealForexData] AVISO Usando dados simulados (limite de API atingido)")
+                        logger.warning("[RealForexData] AVISO Usando dados simulados (limite de API atingido)")
                         return self._generate_fallback_data(symbol, timeframe, limit)
 
                     time_series = data[time_series_key]
@@ -149,15 +152,15 @@ class RealForexDataClient:
                         })
 
                     df = pd.DataFrame(candles[::-1])  # Inverter para ordem cronológica
-                    print(f"[RealForexData] OK {len(df)} candles REAIS de FOREX obtidos para {symbol}")
+                    logger.debug("[RealForexData] OK %s candles REAIS de FOREX obtidos para %s", len(df), symbol)
                     return df
                 else:
-                    print(f"[RealForexData] ERRO ao buscar dados: {response.status}")
+                    logger.warning("[RealForexData] ERRO ao buscar dados: %s", response.status)
                     return self._generate_fallback_data(symbol, timeframe, limit)
 
         except Exception as e:
-            print(f"[RealForexData] ERRO: {e}")
-            print(f"[RealForexData] AVISO: Usando dados simulados como fallback")
+            logger.warning("[RealForexData] ERRO: %s", e)
+            logger.warning("[RealForexData] AVISO: Usando dados simulados como fallback")
             return self._generate_fallback_data(symbol, timeframe, limit)
 
     def _generate_fallback_data(self, symbol: str, timeframe: int, limit: int) -> pd.DataFrame:
@@ -167,7 +170,7 @@ class RealForexDataClient:
         """
         import numpy as np
 
-        print(f"[RealForexData] INFO Gerando {limit} candles simulados para {symbol}")
+        logger.debug("[RealForexData] INFO Gerando %s candles simulados para %s", limit, symbol)
 
         # Preços base para cada par
         base_prices = {
@@ -256,7 +259,7 @@ class RealForexDataClient:
                     return 0.0
 
         except Exception as e:
-            print(f"[RealForexData] Erro ao buscar preço: {e}")
+            logger.warning("[RealForexData] Erro ao buscar preço: %s", e)
             return 0.0
 
 
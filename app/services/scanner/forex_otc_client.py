@@ -3,12 +3,15 @@ FOREX + OTC Data Client - SEM LIMITE
 Usa dados gratuitos de APIs públicas para FOREX e simula OTC
 """
 import asyncio
+import logging
 import aiohttp
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import random
 
+logger = logging.getLogger(__name__)
+
 
 class ForexOTCDataClient:
     """Cliente FOREX + OTC usando APIs gratuitas SEM LIMITE"""
@@ -54,9 +57,9 @@ class ForexOTCDataClient:
         if not self.session:
             self.session = aiohttp.ClientSession()
 
-        print("[FOREX+OTC] OK Conectado (dados REAIS de FOREX)")
-        print(f"[FOREX+OTC] {len(self.forex_pairs)} pares FOREX + {len(self.otc_pairs)} pares OTC")
-        print("[FOREX+OTC] SEM LIMITE de requisicoes!")
+        logger.info("[FOREX+OTC] OK Conectado (dados REAIS de FOREX)")
+        logger.info("[FOREX+OTC] %s pares FOREX + %s pares OTC", len(self.forex_pairs), len(self.otc_pairs))
+        logger.info("[FOREX+OTC] SEM LIMITE de requisicoes!")
         return True
 
     async def disconnect(self):
@@ -115,10 +118,10 @@ class ForexOTCDataClient:
                     data = await response.json()
                     self.rates_cache = data['rates']
                     self.cache_time = now
-                    print(f"[FOREX+OTC] Taxas atualizadas: {len(self.rates_cache)} moedas")
+                    logger.debug("[FOREX+OTC] Taxas atualizadas: %s moedas", len(self.rates_cache))
                     return self.rates_cache
         except Exception as e:
-            print(f"[FOREX+OTC] Erro ao obter taxas: {e}")
+            logger.warning("[FOREX+OTC] Erro ao obter taxas: %s", e)
 
         # Se falhar, retornar cache antigo ou taxas default
         if self.rates_cache:
@@ -213,7 +216,7 @@ class ForexOTCDataClient:
             })
 
         df = pd.DataFrame(candles)
-        print(f"[FOREX+OTC] OK {symbol} - {len(df)} candles gerados (taxa atual: {current_rate:.5f})")
+        logger.debug("[FOREX+OTC] OK %s - %s candles gerados (taxa atual: %.5f)", symbol, len(df), current_rate)
         return df
 
     async def get_realtime_price(self, symbol: str) -> float:
@@ -4,11 +4,17 @@ Connects to IQ Option API for real market data
 """
 import time
 import asyncio
-from typing import List, Dict, Optional
+import logging
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import os
 import json
 from dotenv import load_dotenv
+import pandas as pd
+
+from ...core.metrics import CANDLE_FETCH_ERRORS, CANDLE_FETCH_SECONDS
+
+logger = logging.getLogger(__name__)
 
 try:
     import sys
@@ -17,8 +23,16 @@ try:
     IQ_OPTION_AVAILABLE = True
 except ImportError as e:
     IQ_OPTION_AVAILABLE = False
-    print(f"[WARNING] IQ Option API not available: {e}")
-    print("[INFO] Please check the iqoptionapi folder exists in app/services/")
+    logger.warning("[WARNING] IQ Option API not available: %s", e)
+    logger.warning("[INFO] Please check the iqoptionapi folder exists in app/services/")
+
+try:
+    from iqoptionapi import constants as OP_code
+    from iqoptionapi.ws.async_client import AsyncWebsocketClient
+    ASYNC_TRANSPORT_AVAILABLE = True
+except ImportError as e:
+    ASYNC_TRANSPORT_AVAILABLE = False
+    logger.warning("[WARNING] IQ Option asyncio transport not available: %s", e)
 
 
 load_dotenv()
@@ -48,10 +62,17 @@ class IQOptionClient:
         self.awaiting_two_factor: bool = False
         self.two_factor_message: Optional[str] = None
         self.two_factor_started_at: Optional[datetime] = None
+        # Asyncio websocket used for candle requests (no executor threads)
+        self._transport: Optional["AsyncWebsocketClient"] = None
+        # (symbol, seconds) -> (IQOptionAPI instance whose buffer it is, start
+        # future); the library's internal reconnects replace that instance
+        self._candle_buffers: Dict[tuple, Tuple[object, asyncio.Future]] = {}
+        self.max_candle_buffers = 40
+        self.candle_buffer_max_age = 30  # seconds without a frame before falling back
 
         if not self.email or not self.password:
-            print("[ERROR] IQ Option credentials not found in .env file")
-            print("Please add IQOPTION_EMAIL and IQOPTION_PASSWORD to your .env file")
+            logger.error("[ERROR] IQ Option credentials not found in .env file")
+            logger.error("Please add IQOPTION_EMAIL and IQOPTION_PASSWORD to your .env file")
 
     @property
     def is_connected(self) -> bool:
@@ -76,7 +97,7 @@ class IQOptionClient:
         """Connect to IQ Option API"""
         if not IQ_OPTION_AVAILABLE:
             error_msg = "[ERRO CRITICO] Biblioteca IQ Option nao disponivel no executavel! Validacao de credenciais DESABILITADA!"
-            print(error_msg)
+            logger.error(error_msg)
             self.last_error = "Biblioteca IQ Option nao encontrada. Reinstale a aplicacao."
             return False
 
@@ -102,7 +123,7 @@ class IQOptionClient:
 
         if self.connected and self.api:
             if credentials_changed:
-                print("[IQ Option] Credentials changed - reconnecting")
+                logger.info("[IQ Option] Credentials changed - reconnecting")
                 await self.disconnect()
             else:
                 if account_changed:
@@ -110,11 +131,11 @@ class IQOptionClient:
                         None,
                         lambda: self.api.change_balance(self.account_type)
                     )
-                    print(f"[IQ Option] Account switched to {self.account_type}")
+                    logger.info("[IQ Option] Account switched to %s", self.account_type)
                 return True
 
         if not self.email or not self.password:
-            print("[ERROR] Missing IQ Option credentials")
+            logger.error("[ERROR] Missing IQ Option credentials")
             self.last_error = "Missing credentials"
             return False
 
@@ -130,12 +151,12 @@ class IQOptionClient:
                 if self._is_two_factor_challenge(reason):
                     self._handle_two_factor_challenge(reason)
                     self.last_error = self.two_factor_message
-                    print(f"[IQ Option] 2FA required: {self.two_factor_message}")
+                    logger.info("[IQ Option] 2FA required: %s", self.two_factor_message)
                     return False
 
-                print(f"[IQ Option] Raw failure reason: {repr(reason)}")
+                logger.warning("[IQ Option] Raw failure reason: %r", reason)
                 error_message = self._interpret_reason(reason)
-                print(f"[IQ Option] Connection failed: {error_message}")
+                logger.warning("[IQ Option] Connection failed: %s", error_message)
                 self.last_error = error_message
                 self._clear_connection_state()
                 return False
@@ -144,9 +165,9 @@ class IQOptionClient:
             return True
 
         except Exception as exc:
-            print(f"[IQ Option] Connection exception raw: {repr(exc)}")
+            logger.warning("[IQ Option] Connection exception raw: %r", exc)
             error_message = self._interpret_exception(exc)
-            print(f"[IQ Option] Connection error: {error_message}")
+            logger.warning("[IQ Option] Connection error: %s", error_message)
             self.last_error = error_message
             self._clear_connection_state()
             return False
@@ -164,7 +185,7 @@ class IQOptionClient:
             )
         except Exception as exc:
             message = f"Erro ao validar codigo: {exc}"
-            print(f"[IQ Option] 2FA exception: {exc}")
+            logger.warning("[IQ Option] 2FA exception: %s", exc)
             self.last_error = message
             return False, message
 
@@ -176,12 +197,12 @@ class IQOptionClient:
                 message = self._interpret_reason(reason)
                 self._clear_connection_state()
             self.last_error = message
-            print(f"[IQ Option] 2FA verification failed: {message}")
+            logger.warning("[IQ Option] 2FA verification failed: %s", message)
             return False, message
 
         await self._finalize_successful_login()
         success_message = f"Verificacao concluida! Conta {self.account_type}"
-        print(f"[IQ Option] 2FA complete: {success_message}")
+        logger.info("[IQ Option] 2FA complete: %s", success_message)
         return True, success_message
 
     async def connect_with_credentials(
@@ -224,7 +245,7 @@ class IQOptionClient:
 
             return self.connected
         except Exception as exc:
-            print(f"[IQ Option] Connection check error: {exc}")
+            logger.warning("[IQ Option] Connection check error: %s", exc)
             self.connected = False
             self.last_error = str(exc)
             return False
@@ -260,7 +281,7 @@ class IQOptionClient:
                 "account_type": self._normalize_account_type(balance_type or self.account_type),
             }
         except Exception as exc:
-            print(f"[IQ Option] Error getting balance: {exc}")
+            logger.warning("[IQ Option] Error getting balance: %s", exc)
             return {
                 "balance": self._last_known_balance or 0,
                 "currency": "USD",
@@ -269,6 +290,7 @@ class IQOptionClient:
 
     async def disconnect(self):
         """Disconnect from IQ Option"""
+        await self._close_transport()
         try:
             if self.api and self.connected:
                 loop = asyncio.get_event_loop()
@@ -277,15 +299,17 @@ class IQOptionClient:
                     await loop.run_in_executor(None, self.api.close)
                 elif hasattr(self.api, 'disconnect'):
                     await loop.run_in_executor(None, self.api.disconnect)
-                print("[IQ Option] Disconnected")
+                logger.info("[IQ Option] Disconnected")
         except Exception as exc:
-            print(f"[IQ Option] Disconnect error: {exc}")
+            logger.warning("[IQ Option] Disconnect error: %s", exc)
         finally:
             self._clear_connection_state()
 
     def _clear_connection_state(self):
         """Reset cached connection data"""
         self.api = None
+        self._transport = None
+        self._candle_buffers = {}
         self.connected = False
         self._connected_email = None
         self._connected_password = None
@@ -402,20 +426,20 @@ class IQOptionClient:
         self.two_factor_message = None
         self.two_factor_started_at = None
         self.last_error = None
-        print("[IQ Option] Connected successfully!")
+        logger.info("[IQ Option] Connected successfully!")
 
         await loop.run_in_executor(
             None,
             lambda: self.api.change_balance(self.account_type)
         )
-        print(f"[IQ Option] Using {self.account_type} account")
+        logger.info("[IQ Option] Using %s account", self.account_type)
 
         checker = getattr(self.api, "check_connect", None)
         if callable(checker):
             is_alive = await loop.run_in_executor(None, checker)
             if not is_alive:
                 self.last_error = "IQ Option disconnected right after login."
-                print("[IQ Option] Connection validation failed immediately after login")
+                logger.warning("[IQ Option] Connection validation failed immediately after login")
                 await self.disconnect()
                 raise RuntimeError(self.last_error)
 
@@ -428,13 +452,13 @@ class IQOptionClient:
             if self._last_known_balance < 0:
                 raise RuntimeError("Saldo invalido retornado. Credenciais podem estar incorretas.")
 
-            print(f"[IQ Option] [OK] VALIDACAO PASSOU: Saldo obtido com sucesso: ${self._last_known_balance:.2f}")
+            logger.info("[IQ Option] [OK] VALIDACAO PASSOU: Saldo obtido com sucesso: $%.2f", self._last_known_balance)
         except Exception as balance_error:
             self.last_error = (
                 "Falha ao validar credenciais. "
                 "Verifique se o email e senha estao corretos."
             )
-            print(f"[IQ Option] VALIDACAO FALHOU: Erro ao buscar saldo: {balance_error}")
+            logger.warning("[IQ Option] VALIDACAO FALHOU: Erro ao buscar saldo: %s", balance_error)
             await self.disconnect()
             raise
 
@@ -442,6 +466,32 @@ class IQOptionClient:
         self._connected_password = self.password
         self._connected_account_type = self.account_type
 
+        await self._open_transport()
+
+    async def _open_transport(self):
+        """Open the asyncio websocket used for candle requests."""
+        if not ASYNC_TRANSPORT_AVAILABLE or not self.api:
+            return
+
+        await self._close_transport()
+        transport = AsyncWebsocketClient(
+            self.api.api.wss_url, self.api.global_value.SSID)
+        try:
+            if await transport.connect():
+                self._transport = transport
+                logger.info("[IQ Option] Asyncio transport connected")
+            else:
+                logger.warning("[IQ Option] Asyncio transport rejected the session - using executor")
+        except Exception as exc:
+            logger.warning("[IQ Option] Asyncio transport unavailable - using executor: %s", exc)
+            await transport.close()
+
+    async def _close_transport(self):
+        """Close the asyncio websocket if it is open."""
+        transport, self._transport = self._transport, None
+        if transport is not None:
+            await transport.close()
+
     async def get_candles(
         self,
         symbol: str,
@@ -460,7 +510,7 @@ class IQOptionClient:
             List of candle dictionaries with OHLCV data
         """
         if not self.connected or not self.api:
-            print("[IQ Option] Not connected. Attempting to connect...")
+            logger.info("[IQ Option] Not connected. Attempting to connect...")
             connected = await self.connect()
             if not connected:
                 raise Exception("Failed to connect to IQ Option")
@@ -470,19 +520,47 @@ class IQOptionClient:
             timeframe_seconds = self._convert_timeframe_to_seconds(timeframe)
             end_time = int(time.time())
 
-            loop = asyncio.get_event_loop()
-            candles = await loop.run_in_executor(
-                None,
-                lambda: self.api.get_candles(
-                    normalized_symbol,
-                    timeframe_seconds,
-                    limit,
-                    end_time
-                )
-            )
+            candles = None
+            transport = self._transport
+            if (
+                transport is not None
+                and transport.is_connected
+                and normalized_symbol in OP_code.ACTIVES
+            ):
+                try:
+                    with CANDLE_FETCH_SECONDS.labels("transport").time():
+                        candles = await transport.get_candles(
+                            OP_code.ACTIVES[normalized_symbol],
+                            timeframe_seconds,
+                            limit,
+                            end_time
+                        )
+                except (asyncio.TimeoutError, ConnectionError) as exc:
+                    CANDLE_FETCH_ERRORS.labels("transport").inc()
+                    logger.warning("[IQ Option] Asyncio transport failed for %s, using executor: %r", normalized_symbol, exc)
+                    transport = None
+            else:
+                transport = None
+
+            if transport is None:
+                loop = asyncio.get_event_loop()
+                try:
+                    with CANDLE_FETCH_SECONDS.labels("executor").time():
+                        candles = await loop.run_in_executor(
+                            None,
+                            lambda: self.api.get_candles(
+                                normalized_symbol,
+                                timeframe_seconds,
+                                limit,
+                                end_time
+                            )
+                        )
+                except Exception:
+                    CANDLE_FETCH_ERRORS.labels("executor").inc()
+                    raise
 
             if not candles:
-                print(f"[IQ Option] No candles returned for {normalized_symbol}")
+                logger.debug("[IQ Option] No candles returned for %s", normalized_symbol)
                 return []
 
             formatted_candles = []
@@ -496,13 +574,121 @@ class IQOptionClient:
                     "volume": float(candle.get("volume", 0)),
                 })
 
-            print(f"[IQ Option] Fetched {len(formatted_candles)} candles for {normalized_symbol} ({timeframe}M)")
+            logger.debug("[IQ Option] Fetched %s candles for %s (%sM)", len(formatted_candles), normalized_symbol, timeframe)
             return formatted_candles
 
         except Exception as exc:
-            print(f"[IQ Option] Error fetching candles for {symbol}: {exc}")
+            logger.warning("[IQ Option] Error fetching candles for %s: %s", symbol, exc)
             raise
 
+    def watch_candles(self, symbol: str, timeframe: int = 1, capacity: int = 100) -> bool:
+        """
+        Start streaming a pair into a candle ring buffer (in background)
+
+        The stream is subscribed, then the buffer is seeded from history and
+        updated in place by the candle-generated stream, so
+        read_candle_buffer() can serve it without a get-candles request. A
+        pair whose buffer was lost (the library reconnected, which replaces
+        its API instance) is watched again, and a buffer that reported a gap
+        in the stream is seeded again.
+
+        Returns:
+            True if the pair is (being) streamed
+        """
+        if not self.connected or not self.api:
+            return False
+
+        normalized_symbol = self._normalize_symbol(symbol)
+        timeframe_seconds = self._convert_timeframe_to_seconds(timeframe)
+        key = (normalized_symbol, timeframe_seconds)
+        api = self.api
+        loop = asyncio.get_event_loop()
+
+        def _reseeded(done: asyncio.Future):
+            if not done.cancelled() and done.exception() is not None:
+                logger.info("[IQ Option] Candle buffer reseed failed for %s (%sM): %s",
+                            normalized_symbol, timeframe, done.exception())
+
+        watched = self._candle_buffers.get(key)
+        if watched is not None:
+            generation, future = watched
+            buffer = api.get_candles_buffer(normalized_symbol, timeframe_seconds)
+            if generation is api.api and (buffer is not None or not future.done()):
+                if buffer is not None and buffer.gap and future.done():
+                    future = loop.run_in_executor(
+                        None, lambda: api.seed_candles_buffer(normalized_symbol, timeframe_seconds, buffer)
+                    )
+                    future.add_done_callback(_reseeded)
+                    self._candle_buffers[key] = (generation, future)
+                return True
+            del self._candle_buffers[key]
+        if len(self._candle_buffers) >= self.max_candle_buffers:
+            return False
+
+        future = loop.run_in_executor(
+            None,
+            lambda: api.start_candles_buffer(normalized_symbol, timeframe_seconds, capacity)
+        )
+        self._candle_buffers[key] = (api.api, future)
+
+        def _started(done: asyncio.Future):
+            if done.cancelled() or done.exception() is not None or done.result() is None:
+                watched = self._candle_buffers.get(key)
+                if watched is not None and watched[1] is done:
+                    del self._candle_buffers[key]
+                logger.info("[IQ Option] Candle stream unavailable for %s (%sM)", normalized_symbol, timeframe)
+
+        future.add_done_callback(_started)
+        return True
+
+    def read_candle_buffer(self, symbol: str, timeframe: int = 1, limit: int = 100) -> Optional[pd.DataFrame]:
+        """
+        Read the last candles of a streamed pair without a network request
+
+        Returns:
+            DataFrame with OHLCV data, None if the pair is not streamed, has
+            fewer than ``limit`` candles or its stream went quiet
+        """
+        if not self.connected or not self.api:
+            return None
+
+        buffer = self.api.get_candles_buffer(
+            self._normalize_symbol(symbol), self._convert_timeframe_to_seconds(timeframe)
+        )
+        if buffer is None or buffer.gap or len(buffer) < limit:
+            return None
+        age = buffer.age()
+        if age is None or age > self.candle_buffer_max_age:
+            return None
+
+        from_, open_, high, low, close, volume = buffer.snapshot(limit)
+        return pd.DataFrame({
+            "timestamp": [datetime.fromtimestamp(value) for value in from_.tolist()],
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+        }, copy=False)
+
+    def server_time(self) -> float:
+        """
+        Current IQ Option server time (epoch seconds)
+
+        The local clock corrected by the offset measured on the last
+        timeSync of the candle transport (or of the API websocket); the
+        local clock if neither has synced yet.
+        """
+        sources = (
+            self._transport.timesync if self._transport is not None else None,
+            self.api.api.timesync if self.api is not None else None,
+        )
+        for timesync in sources:
+            offset = timesync.clock_offset if timesync is not None else None
+            if offset is not None:
+                return time.time() + offset
+        return time.time()
+
     async def get_current_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
         if not self.connected or not self.api:
@@ -531,7 +717,7 @@ class IQOptionClient:
             return None
 
         except Exception as exc:
-            print(f"[IQ Option] Error getting current price for {symbol}: {exc}")
+            logger.warning("[IQ Option] Error getting current price for %s: %s", symbol, exc)
             return None
 
     async def get_available_pairs(self, include_otc: bool = True) -> List[Dict]:
@@ -569,7 +755,7 @@ class IQOptionClient:
             if assets:
                 for market_key, market_label in market_map.items():
                     market_assets = assets.get(market_key, {})
-                    print(f"[IQ Option] Mercado '{market_key}': {len(market_assets)} assets")
+                    logger.debug("[IQ Option] Mercado '%s': %s assets", market_key, len(market_assets))
 
                     for asset_name, asset_data in market_assets.items():
                         total_assets += 1
@@ -603,26 +789,26 @@ class IQOptionClient:
                         })
                         seen_symbols.add(symbol_key)
 
-            print(f"[IQ Option] ========================================")
-            print(f"[IQ Option] RESUMO DOS PARES:")
-            print(f"[IQ Option] Total de assets processados: {total_assets}")
-            print(f"[IQ Option] Distribuição OTC vs Regular: {otc_count} OTC, {non_otc_count} Regular")
-            print(f"[IQ Option] Status: {active_count} ativos, {inactive_count} inativos")
-            print(f"[IQ Option] Total de pares retornados: {len(pairs)}")
-            print(f"[IQ Option] ========================================")
+            logger.info("[IQ Option] ========================================")
+            logger.info("[IQ Option] RESUMO DOS PARES:")
+            logger.info("[IQ Option] Total de assets processados: %s", total_assets)
+            logger.info("[IQ Option] Distribuição OTC vs Regular: %s OTC, %s Regular", otc_count, non_otc_count)
+            logger.info("[IQ Option] Status: %s ativos, %s inativos", active_count, inactive_count)
+            logger.info("[IQ Option] Total de pares retornados: %s", len(pairs))
+            logger.info("[IQ Option] ========================================")
 
             # Log de alguns exemplos
             if pairs:
-                print(f"[IQ Option] Exemplos de pares retornados:")
+                logger.debug("[IQ Option] Exemplos de pares retornados:")
                 for p in pairs[:10]:
                     status = "ATIVO" if p["is_active"] else "INATIVO"
                     tipo = "OTC" if p["is_otc"] else "REGULAR"
-                    print(f"  - {p['symbol']} ({tipo}, {status})")
+                    logger.debug("  - %s (%s, %s)", p['symbol'], tipo, status)
 
             return pairs
 
         except Exception as exc:
-            print(f"[IQ Option] Error getting available pairs: {exc}")
+            logger.warning("[IQ Option] Error getting available pairs: %s", exc)
             return self._get_default_pairs()
 
     def _get_default_pairs(self) -> List[Dict]:
@@ -1,17 +1,30 @@
 """IQ Option Scanner - Scans OTC pairs using IQ Option data"""
 import asyncio
-from typing import List, Optional, Dict
+import logging
+import time
+from functools import partial
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
 import pandas as pd
 
+from ...core.metrics import SCAN_CYCLE_SECONDS, SCAN_FETCH_SECONDS, SCAN_PAIRS, SIGNALS_PER_CYCLE
 from ...models.schemas import ScanConfig, TradingSignal
 from ..iqoption import get_session_manager
 from .signal_generator import SignalGenerator
+from .analysis_executor import get_analysis_executor
+from .candle_scheduler import CandleScheduler
+from .scan_queue import get_scan_queue
+from ...websocket.signal_websocket import ws_manager
+
+logger = logging.getLogger(__name__)
 
 
 class IQOptionScanner:
     """Scanner that uses IQ Option data for signal generation"""
 
+    # Source of this scanner's events in the user's WebSocket event log
+    SOURCE = "iqoption"
+
     def __init__(self, username: str, config: ScanConfig):
         """
         Initialize IQ Option scanner
@@ -22,43 +35,52 @@ class IQOptionScanner:
         """
         self.username = username
         self.config = config
-        self.signal_generator = SignalGenerator(config)
+        # Copia: mudancas in-place em self.config nao alcancam o gerador ja montado
+        self.signal_generator = SignalGenerator(config.model_copy(deep=True))
+        self.executor = get_analysis_executor()
+        # Um SignalGenerator por (timeframe, sensitivity), refeito se a config mudar
+        self._generators: Dict[Tuple[int, str], SignalGenerator] = {}
+        self._generators_config: Optional[str] = None
         self.is_running = False
         self.latest_signals: Dict[str, TradingSignal] = {}
         self.session_manager = get_session_manager()
         self._scan_task: Optional[asyncio.Task] = None
-        # CRITICAL: Limit concurrent requests to prevent memory explosion
-        self._semaphore = asyncio.Semaphore(5)  # Max 5 concurrent pair scans
-        self._scan_interval = 30  # Scan every 30 seconds (more stable)
+        # Pares escaneados pelo pool compartilhado (limite por usuario, prazo, justica)
+        self.queue = get_scan_queue()
+        self._scan_interval = 30  # Idle wait when no pair is scheduled
+        # Scans aligned to candle close in IQ Option server time
+        self.scheduler = CandleScheduler(
+            clock=lambda: self.session_manager.get_server_time(self.username)
+        )
 
     async def start_scanning(self):
         """Start scanning IQ Option OTC pairs"""
         self.is_running = True
 
-        print(f"[IQOptionScanner] ========================================")
-        print(f"[IQOptionScanner] INICIANDO SCAN")
-        print(f"[IQOptionScanner] Usuario: {self.username}")
-        print(f"[IQOptionScanner] Timeframe configurado: {self.config.timeframe} minutos")
-        print(f"[IQOptionScanner] Timeframe em segundos: {self.config.timeframe * 60}")
-        print(f"[IQOptionScanner] ========================================")
+        logger.info("[IQOptionScanner] ========================================")
+        logger.info("[IQOptionScanner] INICIANDO SCAN")
+        logger.info("[IQOptionScanner] Usuario: %s", self.username)
+        logger.info("[IQOptionScanner] Timeframe configurado: %s minutos", self.config.timeframe)
+        logger.info("[IQOptionScanner] Timeframe em segundos: %s", self.config.timeframe * 60)
+        logger.info("[IQOptionScanner] ========================================")
 
         # Check if user is connected
         is_connected = self.session_manager.is_connected(self.username)
-        print(f"[IQOptionScanner] Verificando conexao: is_connected={is_connected}")
+        logger.info("[IQOptionScanner] Verificando conexao: is_connected=%s", is_connected)
 
         if not is_connected:
-            print(f"[IQOptionScanner] ERRO: Usuario {self.username} nao conectado ao IQ Option")
-            print(f"[IQOptionScanner] Scanner nao pode iniciar sem conexao ativa")
+            logger.error("[IQOptionScanner] ERRO: Usuario %s nao conectado ao IQ Option", self.username)
+            logger.error("[IQOptionScanner] Scanner nao pode iniciar sem conexao ativa")
             self.is_running = False
             return
 
         # Refresh session timeout
         client = self.session_manager.get_client(self.username)
         if client:
-            print(f"[IQOptionScanner] Conexao OK - Cliente ativo: {client.is_connected}")
-            print(f"[IQOptionScanner] Timeout da sessao atualizado")
+            logger.info("[IQOptionScanner] Conexao OK - Cliente ativo: %s", client.is_connected)
+            logger.info("[IQOptionScanner] Timeout da sessao atualizado")
         else:
-            print(f"[IQOptionScanner] AVISO: Cliente nao encontrado no session_manager")
+            logger.warning("[IQOptionScanner] AVISO: Cliente nao encontrado no session_manager")
             self.is_running = False
             return
 
@@ -66,7 +88,7 @@ class IQOptionScanner:
         pairs = await self._get_trading_pairs()
 
         if not pairs:
-            print("[IQOptionScanner] Nenhum par disponível para escanear")
+            logger.warning("[IQOptionScanner] Nenhum par disponível para escanear")
             self.is_running = False
             return
 
@@ -74,71 +96,97 @@ class IQOptionScanner:
         # Se timeframes for None ou lista vazia, usa timeframe primário
         if self.config.timeframes and len(self.config.timeframes) > 0:
             timeframes_to_scan = self.config.timeframes
-            print(f"[IQOptionScanner] Usando MULTIPLOS timeframes: {timeframes_to_scan}")
+            logger.info("[IQOptionScanner] Usando MULTIPLOS timeframes: %s", timeframes_to_scan)
         else:
             timeframes_to_scan = [self.config.timeframe]
-            print(f"[IQOptionScanner] Usando timeframe UNICO (fallback): {timeframes_to_scan}")
+            logger.info("[IQOptionScanner] Usando timeframe UNICO (fallback): %s", timeframes_to_scan)
+
+        logger.info("[IQOptionScanner] Iniciando scan em %s pares OTC", len(pairs))
+        logger.info("[IQOptionScanner] Timeframes a escanear: %s minutos", timeframes_to_scan)
+
+        await self._broadcast_status()
 
-        print(f"[IQOptionScanner] Iniciando scan em {len(pairs)} pares OTC")
-        print(f"[IQOptionScanner] Timeframes a escanear: {timeframes_to_scan} minutos")
+        # Cada (par, timeframe) acorda logo apos o fechamento do seu candle
+        pairs_by_symbol = {pair["symbol"]: pair for pair in pairs}
+        self.scheduler.sync(
+            ((pair["symbol"], timeframe), timeframe)
+            for pair in pairs
+            for timeframe in timeframes_to_scan
+        )
 
         while self.is_running:
             try:
                 # Verify connection is still active before scanning
                 if not self.session_manager.is_connected(self.username):
-                    print(f"[IQOptionScanner] ERRO: Conexao perdida durante scan!")
-                    print(f"[IQOptionScanner] Parando scanner - reconecte e tente novamente")
+                    logger.error("[IQOptionScanner] ERRO: Conexao perdida durante scan!")
+                    logger.error("[IQOptionScanner] Parando scanner - reconecte e tente novamente")
                     self.is_running = False
+                    await self._broadcast_status()
                     break
 
-                # Scan all OTC pairs with controlled concurrency
-                # CRITICAL FIX: Process pairs in batches to prevent memory explosion
-                new_signals = []
-                for pair in pairs:
-                    if not self.is_running:
-                        break
-
-                    # Escanear cada timeframe configurado
-                    for timeframe in timeframes_to_scan:
-                        if not self.is_running:
-                            break
-
-                        async with self._semaphore:
-                            try:
-                                # Add timeout to prevent hanging requests
-                                result = await asyncio.wait_for(
-                                    self._scan_pair(pair, timeframe),
-                                    timeout=10.0  # 10 second timeout per pair
-                                )
-                                if isinstance(result, TradingSignal):
-                                    new_signals.append(result)
-                                    # Usar chave única: símbolo + timeframe
-                                    signal_key = f"{result.symbol}_{result.timeframe}M"
-                                    self.latest_signals[signal_key] = result
-                            except asyncio.TimeoutError:
-                                print(f"[IQOptionScanner] Timeout ao escanear {pair.get('symbol', '?')} {timeframe}M")
-                            except Exception as e:
-                                print(f"[IQOptionScanner] Erro ao escanear {pair.get('symbol', '?')} {timeframe}M: {e}")
-
-                # Log new signals
-                if new_signals:
-                    print(f"[IQOptionScanner] {len(new_signals)} novos sinais OTC!")
-                    for signal in new_signals:
-                        print(f"  - {signal.symbol}: {signal.direction} "
-                              f"({signal.confidence:.1f}% confianca)")
-
-                # Wait before next scan (increased for stability)
-                await asyncio.sleep(self._scan_interval)
+                # Wait for the next candle close (server time), changed pairs first
+                jobs = await self.scheduler.next_batch()
+                if not jobs:
+                    await asyncio.sleep(self._scan_interval)
+                    continue
+                if not self.is_running:
+                    break
+                self._refresh_generators()
+
+                # Queue the due pairs; workers run them while the next slice is awaited
+                cycle_start = time.perf_counter()
+                futures = []
+                # Fechamento absoluto (hora do servidor): o mesmo para todo job
+                # desse fechamento, de qualquer usuario, para a fila alternar
+                server_now = self.scheduler.clock()
+                local_offset = time.time() - server_now
+                for symbol, timeframe in jobs:
+                    close = self.scheduler.next_close(max(1, int(timeframe)) * 60, server_now)
+                    deadline = close + self.scheduler.close_delay
+                    future = await self.queue.submit(
+                        self.username,
+                        (symbol, timeframe),
+                        deadline,
+                        partial(self._scan_pair, pairs_by_symbol[symbol], timeframe),
+                        # Vale ate o proximo fechamento do candle deste timeframe
+                        expires=close + local_offset
+                    )
+                    future.add_done_callback(self._on_scan_done)
+                    futures.append(future)
+                asyncio.ensure_future(self._record_cycle(cycle_start, futures))
 
             except asyncio.CancelledError:
-                print(f"[IQOptionScanner] Scan cancelado via stop_scanning()")
+                logger.info("[IQOptionScanner] Scan cancelado via stop_scanning()")
                 break
             except Exception as e:
-                print(f"[IQOptionScanner] Erro durante scan: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("[IQOptionScanner] Erro durante scan: %s", e)
                 await asyncio.sleep(5)
 
+    def _on_scan_done(self, future: asyncio.Future):
+        """Keep the signal of a finished scan job"""
+        if future.cancelled() or not self.is_running:
+            return
+        signal = future.result()
+        if isinstance(signal, TradingSignal):
+            # Usar chave única: símbolo + timeframe
+            signal_key = f"{signal.symbol}_{signal.timeframe}M"
+            self.latest_signals[signal_key] = signal
+            # So os clientes deste usuario inscritos no par recebem
+            asyncio.ensure_future(
+                ws_manager.broadcast_signal(signal.dict(), owner=self.username, source=self.SOURCE)
+            )
+
+    async def _record_cycle(self, started: float, futures: List[asyncio.Future]):
+        """Record cycle metrics once every job of a released batch is done"""
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        if not self.is_running:
+            return
+        SCAN_CYCLE_SECONDS.labels("iqoption").observe(time.perf_counter() - started)
+        SCAN_PAIRS.labels("iqoption").inc(len(futures))
+        SIGNALS_PER_CYCLE.labels("iqoption").observe(
+            sum(isinstance(result, TradingSignal) for result in results)
+        )
+
     def stop_scanning(self):
         """Stop scanning and clean up state"""
         self.is_running = False
@@ -146,12 +194,20 @@ class IQOptionScanner:
         # Cancel the scanning task if it exists
         if self._scan_task and not self._scan_task.done():
             self._scan_task.cancel()
-            print("[IQOptionScanner] Task de scan cancelada")
+            logger.info("[IQOptionScanner] Task de scan cancelada")
+
+        # Drop the queued and running pair scans of this user
+        cancelled = self.queue.cancel(self.username)
+        if cancelled:
+            logger.info("[IQOptionScanner] %s scans pendentes cancelados", cancelled)
 
         # Clear latest signals to ensure fresh start on resume
         self.latest_signals.clear()
+        self.scheduler.clear()
+        asyncio.ensure_future(ws_manager.reset_signals(self.username, source=self.SOURCE))
+        asyncio.ensure_future(self._broadcast_status())
 
-        print("[IQOptionScanner] Scan interrompido e estado limpo")
+        logger.info("[IQOptionScanner] Scan interrompido e estado limpo")
 
     async def _get_trading_pairs(self) -> List[Dict]:
         """Get available trading pairs from IQ Option (OTC or regular) honoring scanner config"""
@@ -161,10 +217,10 @@ class IQOptionScanner:
             # If only_otc=True, we want include_otc=True (include OTC)
             # Otherwise, include both (include_otc=True by default)
             include_otc_flag = not self.config.only_open_market
-            print(f"[IQOptionScanner] Solicitando pares com include_otc={include_otc_flag}")
+            logger.info("[IQOptionScanner] Solicitando pares com include_otc=%s", include_otc_flag)
 
             pairs = await self.session_manager.get_user_pairs(self.username, include_otc=include_otc_flag)
-            print(f"[IQOptionScanner] Total de pares recebidos da IQ Option: {len(pairs)}")
+            logger.info("[IQOptionScanner] Total de pares recebidos da IQ Option: %s", len(pairs))
 
             # FILTRO: Remover pares não suportados pela API (evita "Asset X not found on consts")
             from ..scanner.iqoption_client import IQOptionClient
@@ -174,26 +230,26 @@ class IQOptionScanner:
             pairs = [p for p in pairs if p.get("symbol") in supported_pairs]
             removed_count = before_filter - len(pairs)
             if removed_count > 0:
-                print(f"[IQOptionScanner] Removidos {removed_count} pares não suportados pela API")
+                logger.info("[IQOptionScanner] Removidos %s pares não suportados pela API", removed_count)
 
             # Filter only active pairs
             active_pairs = [p for p in pairs if p.get("is_active", False)]
-            print(f"[IQOptionScanner] Pares ativos e suportados: {len(active_pairs)}")
+            logger.info("[IQOptionScanner] Pares ativos e suportados: %s", len(active_pairs))
 
             # Count OTC vs non-OTC before filtering
             otc_count = sum(1 for p in active_pairs if p.get("is_otc", False))
             non_otc_count = len(active_pairs) - otc_count
-            print(f"[IQOptionScanner] Distribuição: {otc_count} OTC, {non_otc_count} Mercado Regular")
+            logger.info("[IQOptionScanner] Distribuição: %s OTC, %s Mercado Regular", otc_count, non_otc_count)
 
             # Respect scanner configuration filters
             if self.config.only_otc:
                 active_pairs = [p for p in active_pairs if p.get("is_otc", False)]
-                print(f"[IQOptionScanner] Filtro ONLY_OTC aplicado: {len(active_pairs)} pares")
+                logger.info("[IQOptionScanner] Filtro ONLY_OTC aplicado: %s pares", len(active_pairs))
             elif self.config.only_open_market:
                 active_pairs = [p for p in active_pairs if not p.get("is_otc", False)]
-                print(f"[IQOptionScanner] Filtro ONLY_OPEN_MARKET aplicado: {len(active_pairs)} pares")
+                logger.info("[IQOptionScanner] Filtro ONLY_OPEN_MARKET aplicado: %s pares", len(active_pairs))
             else:
-                print(f"[IQOptionScanner] SEM filtro de mercado: {len(active_pairs)} pares (OTC + Regular)")
+                logger.info("[IQOptionScanner] SEM filtro de mercado: %s pares (OTC + Regular)", len(active_pairs))
 
             if self.config.symbols:
                 symbols_set = {symbol.upper() for symbol in self.config.symbols}
@@ -201,23 +257,21 @@ class IQOptionScanner:
                     p for p in active_pairs
                     if p.get("symbol", "").upper() in symbols_set
                 ]
-                print(f"[IQOptionScanner] Filtro de símbolos aplicado: {len(active_pairs)} pares")
+                logger.info("[IQOptionScanner] Filtro de símbolos aplicado: %s pares", len(active_pairs))
 
             # Log alguns exemplos dos pares filtrados
             if active_pairs:
                 sample_pairs = active_pairs[:10]  # Mostrar mais exemplos
-                print(f"[IQOptionScanner] Exemplos de pares a escanear:")
+                logger.debug("[IQOptionScanner] Exemplos de pares a escanear:")
                 for p in sample_pairs:
                     otc_label = "OTC" if p.get('is_otc', False) else "REGULAR"
                     market_type = p.get('type', '?')
-                    print(f"  - {p.get('symbol')} ({otc_label}, Tipo: {market_type})")
+                    logger.debug("  - %s (%s, Tipo: %s)", p.get('symbol'), otc_label, market_type)
 
             return active_pairs
 
         except Exception as e:
-            print(f"[IQOptionScanner] Erro ao buscar pares: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[IQOptionScanner] Erro ao buscar pares: %s", e)
             return []
 
     async def _scan_pair(self, pair: Dict, timeframe: int) -> Optional[TradingSignal]:
@@ -238,17 +292,18 @@ class IQOptionScanner:
             # Convert timeframe from minutes to seconds for IQ Option
             timeframe_seconds = timeframe * 60
 
-            print(f"[IQOptionScanner] Buscando candles para {symbol}: timeframe={timeframe}min ({timeframe_seconds}s)")
+            logger.debug("[IQOptionScanner] Buscando candles para %s: timeframe=%smin (%ss)", symbol, timeframe, timeframe_seconds)
 
-            candles = await self.session_manager.get_user_candles(
-                username=self.username,
-                symbol=symbol,
-                timeframe=timeframe_seconds,
-                count=100  # Get 100 candles for analysis
-            )
+            with SCAN_FETCH_SECONDS.labels("iqoption").time():
+                candles = await self.session_manager.get_user_candles(
+                    username=self.username,
+                    symbol=symbol,
+                    timeframe=timeframe_seconds,
+                    count=100  # Get 100 candles for analysis
+                )
 
             if candles is None or candles.empty:
-                print(f"[IQOptionScanner] Nenhum candle retornado para {symbol}")
+                logger.debug("[IQOptionScanner] Nenhum candle retornado para %s", symbol)
                 return None
 
             # Ensure we have a DataFrame for the generator
@@ -257,48 +312,95 @@ class IQOptionScanner:
 
             # Validar dados dos candles
             if candles.empty or len(candles) < 5:
-                print(f"[IQOptionScanner] ❌ CANDLES INSUFICIENTES: {symbol} {timeframe}M - Recebidos: {len(candles)} candles (mínimo: 5)")
-                print(f"[IQOptionScanner]    → Possível causa: Par INATIVO ou SEM dados históricos")
+                logger.debug("[IQOptionScanner] ❌ CANDLES INSUFICIENTES: %s %sM - Recebidos: %s candles (mínimo: 5)", symbol, timeframe, len(candles))
+                logger.debug("[IQOptionScanner]    → Possível causa: Par INATIVO ou SEM dados históricos")
                 return None
 
             # Validar colunas necessárias
             required_columns = ['open', 'high', 'low', 'close', 'volume']
             missing_columns = [col for col in required_columns if col not in candles.columns]
             if missing_columns:
-                print(f"[IQOptionScanner] ❌ CANDLES INVÁLIDOS: {symbol} - Faltam colunas: {missing_columns}")
+                logger.warning("[IQOptionScanner] ❌ CANDLES INVÁLIDOS: %s - Faltam colunas: %s", symbol, missing_columns)
                 return None
 
-            # Log SUCCESS - candles válidos recebidos
-            print(f"[IQOptionScanner] ✅ CANDLES OK: {symbol} {timeframe}M - {len(candles)} candles recebidos")
+            # Pares com dados novos sobem na fila do proximo fechamento
+            self.scheduler.observe((symbol, timeframe), candles)
 
-            # Generate signal using signal generator (synchronous)
-            # Criar uma config temporária com o timeframe específico
-            from copy import copy
-            temp_config = copy(self.config)
-            temp_config.timeframe = timeframe
+            # Log SUCCESS - candles válidos recebidos
+            logger.debug("[IQOptionScanner] ✅ CANDLES OK: %s %sM - %s candles recebidos", symbol, timeframe, len(candles))
 
-            # Criar signal generator temporário com timeframe correto
-            from .signal_generator import SignalGenerator
-            temp_generator = SignalGenerator(temp_config)
-            signal = temp_generator.generate_signal(symbol, candles)
+            # Generate signal using the cached generator of this timeframe
+            # Analise roda no executor, fora do event loop
+            generator = self._get_generator(timeframe)
+            signal = await self.executor.generate_signal(generator, symbol, candles)
 
             if signal:
-                print(f"[IQOptionScanner] 🎯 SINAL GERADO: {symbol} {timeframe}M - {signal.direction} ({signal.confidence:.1f}%)")
+                logger.info("[IQOptionScanner] 🎯 SINAL GERADO: %s %sM - %s (%.1f%%)", symbol, timeframe, signal.direction, signal.confidence)
             else:
-                print(f"[IQOptionScanner] ⚠️  SEM SINAL: {symbol} {timeframe}M - Nenhum padrão/confluência detectado")
+                logger.debug("[IQOptionScanner] ⚠️  SEM SINAL: %s %sM - Nenhum padrão/confluência detectado", symbol, timeframe)
 
             return signal
 
         except Exception as e:
-            print(f"[IQOptionScanner] ERRO ao analisar {pair.get('symbol', '?')} {timeframe}M: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()  # Log completo do erro
+            # Log completo do erro
+            logger.exception("[IQOptionScanner] ERRO ao analisar %s %sM: %s: %s",
+                             pair.get('symbol', '?'), timeframe, type(e).__name__, e)
             return None
 
+    def _refresh_generators(self):
+        """
+        Drop the generators if self.config changed (also in place) since
+        they were built; checked once per released slice, not per pair
+        """
+        fingerprint = self.config.model_dump_json()
+        if fingerprint == self._generators_config:
+            return
+        self._generators.clear()
+        self._generators_config = fingerprint
+        # Geradores montados com copias da config, comparadas pelo conteudo
+        if self.signal_generator.config.model_dump_json() != fingerprint:
+            self.signal_generator = SignalGenerator(self.config.model_copy(deep=True))
+        self._generators[(self.config.timeframe, self.config.sensitivity)] = self.signal_generator
+
+    def _get_generator(self, timeframe: int) -> SignalGenerator:
+        """
+        Get the signal generator of a timeframe, built once per
+        (timeframe, sensitivity) and dropped by _refresh_generators when
+        the config changes
+
+        Args:
+            timeframe: Timeframe in minutes
+
+        Returns:
+            SignalGenerator configured for the timeframe
+        """
+        key = (timeframe, self.config.sensitivity)
+        generator = self._generators.get(key)
+        if generator is None:
+            generator = SignalGenerator(self.config.model_copy(update={"timeframe": timeframe}, deep=True))
+            self._generators[key] = generator
+        return generator
+
+    def update_config(self, config: ScanConfig):
+        """
+        Replace the scanner configuration
+
+        Args:
+            config: New scanner configuration
+        """
+        self.config = config
+        self.signal_generator = SignalGenerator(config.model_copy(deep=True))
+        self._generators.clear()
+        self._generators_config = None
+
     def get_latest_signals(self) -> List[TradingSignal]:
         """Get latest signals from all pairs"""
         return list(self.latest_signals.values())
 
+    async def _broadcast_status(self):
+        """Send get_status() to the user's WebSocket clients"""
+        await ws_manager.broadcast_scanner_status(self.get_status(), owner=self.username, source=self.SOURCE)
+
     def get_status(self) -> dict:
         """Get scanner status"""
         return {
@@ -3,12 +3,15 @@ Real Market Data Client
 Integrates with Binance API for real-time market data (FREE, no API key needed)
 """
 import asyncio
+import logging
 import aiohttp
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import json
 
+logger = logging.getLogger(__name__)
+
 
 class RealMarketDataClient:
     """Client for Real Market Data using Binance API"""
@@ -52,7 +55,7 @@ class RealMarketDataClient:
         """Establish connection"""
         if not self.session:
             self.session = aiohttp.ClientSession()
-        print("[RealMarketData] Conectado à API Binance (dados reais)")
+        logger.info("[RealMarketData] Conectado à API Binance (dados reais)")
         return True
 
     async def disconnect(self):
@@ -78,7 +81,7 @@ class RealMarketDataClient:
                 "is_active": True
             })
 
-        print(f"[RealMarketData] {len(pairs)} pares reais disponíveis")
+        logger.debug("[RealMarketData] %s pares reais disponíveis", len(pairs))
         return pairs
 
     async def get_candles(
@@ -103,7 +106,7 @@ class RealMarketDataClient:
 
         # Converter símbolo
         if symbol not in self.symbol_map:
-            print(f"[RealMarketData] AVISO Símbolo {symbol} não encontrado, usando BTCUSDT")
+            logger.debug("[RealMarketData] AVISO Símbolo %s não encontrado, usando BTCUSDT", symbol)
             symbol = "BTCUSDT"
 
         binance_symbol = self.symbol_map[symbol]["binance"]
@@ -135,14 +138,14 @@ class RealMarketDataClient:
                         })
 
                     df = pd.DataFrame(candles)
-                    print(f"[RealMarketData] OK {len(df)} candles REAIS obtidos para {symbol}")
+                    logger.debug("[RealMarketData] OK %s candles REAIS obtidos para %s", len(df), symbol)
                     return df
                 else:
-                    print(f"[RealMarketData] ERRO Erro ao buscar dados: {response.status}")
+                    logger.warning("[RealMarketData] ERRO Erro ao buscar dados: %s", response.status)
                     return pd.DataFrame()
 
         except Exception as e:
-            print(f"[RealMarketData] ERRO Erro: {e}")
+            logger.warning("[RealMarketData] ERRO Erro: %s", e)
             return pd.DataFrame()
 
     async def get_realtime_price(self, symbol: str) -> float:
@@ -176,7 +179,7 @@ class RealMarketDataClient:
                     return 0.0
 
         except Exception as e:
-            print(f"[RealMarketData] Erro ao buscar preço: {e}")
+            logger.warning("[RealMarketData] Erro ao buscar preço: %s", e)
             return 0.0
 
 
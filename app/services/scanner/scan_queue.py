@@ -0,0 +1,300 @@
+"""
+Scan Queue
+Worker pool running (user, pair, timeframe) scan jobs of every scanner
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from ...core.metrics import SCAN_JOBS, SCAN_QUEUE_DEPTH, SCAN_QUEUE_JOBS
+
+logger = logging.getLogger(__name__)
+
+
+class ScanJob:
+    """A queued scan: identity, deadline and the coroutine factory that runs it"""
+
+    __slots__ = ("user", "key", "deadline", "expires", "factory", "future", "task", "queued_at", "cancelled")
+
+    def __init__(
+        self,
+        user: str,
+        key: Hashable,
+        deadline: float,
+        expires: float,
+        factory: Callable[[], Awaitable],
+        future: asyncio.Future
+    ):
+        self.user = user
+        self.key = key
+        self.deadline = deadline
+        self.expires = expires
+        self.factory = factory
+        self.future = future
+        self.task: Optional[asyncio.Task] = None
+        self.queued_at = time.time()
+        self.cancelled = False
+
+
+class ScanQueue:
+    """
+    Bounded priority queue of scan jobs served by ``workers`` asyncio workers
+
+    Ordering:
+    - closest deadline first (the candle close of the job's timeframe, the
+      same value for every job of that close, so 1M pairs go before 5M
+      pairs released at the same close);
+    - among jobs of the same deadline, users take turns: a user's n-th job
+      is ranked in round n, so one user with 300 pairs does not hold back
+      another with 10;
+    - submission order last.
+
+    Jobs are kept in one heap per user: the next job is the best head among
+    the users below ``per_user`` running jobs (the connection limit of the
+    user's IQ Option session), so a user at the limit costs one comparison,
+    not a pop and push of each of its jobs. A job still queued when it
+    expires is dropped (its data would be a candle old). A (user, key)
+    already queued or running is not queued twice. When ``max_size`` jobs
+    are queued, submit() waits for room (backpressure).
+    """
+
+    def __init__(
+        self,
+        workers: int = 10,
+        max_size: int = 1000,
+        per_user: int = 5,
+        timeout: float = 10.0
+    ):
+        self.workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.per_user = max(1, per_user)
+        self.timeout = timeout
+        # user -> heap of (deadline, round, seq, job)
+        self._heaps: Dict[str, List[Tuple[float, int, int, ScanJob]]] = {}
+        self._seq = itertools.count()
+        # (user, deadline) -> jobs ranked so far, for the round of the next one
+        self._rounds: Dict[Tuple[str, float], int] = {}
+        self._jobs: Dict[Tuple[str, Hashable], ScanJob] = {}
+        self._running: Dict[str, Set[ScanJob]] = {}
+        self._queued = 0
+        self._changed: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        self.totals = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0,
+                       "expired": 0, "cancelled": 0, "coalesced": 0, "wait_s": 0.0}
+
+    def __len__(self):
+        return self._queued
+
+    async def submit(
+        self,
+        user: str,
+        key: Hashable,
+        deadline: float,
+        factory: Callable[[], Awaitable],
+        expires: Optional[float] = None
+    ) -> asyncio.Future:
+        """
+        Queue a scan job
+
+        Args:
+            user: Owner of the job (fairness and cancellation unit)
+            key: Job identifier within the user, e.g. (symbol, timeframe)
+            deadline: Ordering key, the candle close the job is due by; jobs
+                of one close must pass the same value to take turns
+            factory: Called with no arguments to create the scan coroutine
+            expires: Epoch seconds after which the job is not worth running
+                (default: deadline)
+
+        Returns:
+            Future resolved with the coroutine result (None if the job
+            expired, timed out or failed; cancelled by cancel())
+        """
+        self._start()
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._queued < self.max_size)
+            existing = self._jobs.get((user, key))
+            if existing is not None:
+                self.totals["coalesced"] += 1
+                return existing.future
+            SCAN_QUEUE_DEPTH.observe(self._queued)
+            job = ScanJob(
+                user, key, deadline, deadline if expires is None else expires, factory,
+                asyncio.get_running_loop().create_future()
+            )
+            rank = self._rounds.get((user, deadline), 0)
+            self._rounds[(user, deadline)] = rank + 1
+            heapq.heappush(self._heaps.setdefault(user, []), (deadline, rank, next(self._seq), job))
+            self._jobs[(user, key)] = job
+            self._queued += 1
+            SCAN_QUEUE_JOBS.set(self._queued)
+            self.totals["submitted"] += 1
+            self._changed.notify_all()
+        return job.future
+
+    def cancel(self, user: str) -> int:
+        """
+        Cancel every queued and running job of a user
+
+        Returns:
+            Number of jobs cancelled
+        """
+        cancelled = 0
+        for (owner, _), job in list(self._jobs.items()):
+            if owner != user:
+                continue
+            job.cancelled = True
+            if job.task is not None:
+                job.task.cancel()
+            else:
+                self._finish(job)
+                self._queued -= 1
+            job.future.cancel()
+            cancelled += 1
+
+        if cancelled:
+            self._heaps.pop(user, None)
+            self._rounds = {k: v for k, v in self._rounds.items() if k[0] != user}
+            self.totals["cancelled"] += cancelled
+            SCAN_JOBS.labels("cancelled").inc(cancelled)
+            SCAN_QUEUE_JOBS.set(self._queued)
+            self._notify()
+        return cancelled
+
+    def _start(self):
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    def _notify(self):
+        if self._changed is None:
+            return
+
+        async def wake():
+            async with self._changed:
+                self._changed.notify_all()
+        asyncio.ensure_future(wake())
+
+    def _next_job(self) -> Optional[ScanJob]:
+        """Pop the best job whose user is below its concurrency limit"""
+        best = None
+        now = time.time()
+        for user, heap in list(self._heaps.items()):
+            while heap and heap[0][3].expires <= now:
+                self._expire(heapq.heappop(heap)[3])
+            if not heap:
+                del self._heaps[user]
+                continue
+            if len(self._running.get(user, ())) >= self.per_user:
+                continue
+            if best is None or heap[0] < best[0]:
+                best = heap[0], heap
+
+        job = None
+        if best is not None:
+            job = heapq.heappop(best[1])[3]
+            if not best[1]:
+                del self._heaps[job.user]
+            self._queued -= 1
+        SCAN_QUEUE_JOBS.set(self._queued)
+        return job
+
+    def _expire(self, job: ScanJob):
+        self._queued -= 1
+        self._finish(job)
+        self.totals["expired"] += 1
+        SCAN_JOBS.labels("expired").inc()
+        if not job.future.done():
+            job.future.set_result(None)
+
+    async def _worker(self):
+        while True:
+            async with self._changed:
+                job = self._next_job()
+                while job is None:
+                    await self._changed.wait()
+                    job = self._next_job()
+                # room in the queue for submit()
+                self._changed.notify_all()
+
+            self._running.setdefault(job.user, set()).add(job)
+            self.totals["wait_s"] += time.time() - job.queued_at
+            job.task = asyncio.ensure_future(asyncio.wait_for(job.factory(), timeout=self.timeout))
+            try:
+                result = await job.task
+                self.totals["completed"] += 1
+                SCAN_JOBS.labels("completed").inc()
+                if not job.future.done():
+                    job.future.set_result(result)
+            except asyncio.CancelledError:
+                # cancel(user) only stops the job; a cancelled worker stops too
+                if not job.cancelled or asyncio.current_task().cancelling():
+                    job.task.cancel()
+                    raise
+            except asyncio.TimeoutError:
+                self.totals["timeouts"] += 1
+                SCAN_JOBS.labels("timeout").inc()
+                logger.warning("[ScanQueue] Timeout: %s %s", job.user, job.key)
+                if not job.future.done():
+                    job.future.set_result(None)
+            except Exception as e:
+                self.totals["failed"] += 1
+                SCAN_JOBS.labels("failed").inc()
+                logger.warning("[ScanQueue] Erro em %s %s: %s", job.user, job.key, e)
+                if not job.future.done():
+                    job.future.set_result(None)
+            finally:
+                self._running.get(job.user, set()).discard(job)
+                self._finish(job)
+                # a slot of this user is free
+                self._notify()
+
+    def _finish(self, job: ScanJob):
+        if self._jobs.get((job.user, job.key)) is job:
+            del self._jobs[(job.user, job.key)]
+        now = time.time()
+        if len(self._rounds) > self.max_size:
+            self._rounds = {k: v for k, v in self._rounds.items() if k[1] > now}
+
+    def stats(self) -> dict:
+        """Queue configuration, load and totals"""
+        completed = self.totals["completed"] or 1
+        return {
+            "workers": self.workers,
+            "max_size": self.max_size,
+            "per_user": self.per_user,
+            "queued": self._queued,
+            "running": {user: len(jobs) for user, jobs in self._running.items() if jobs},
+            **{k: v for k, v in self.totals.items() if k != "wait_s"},
+            "avg_wait_ms": round(self.totals["wait_s"] / completed * 1000, 3),
+        }
+
+    async def shutdown(self):
+        """Cancel every job and stop the workers (restarted on the next submit)"""
+        for worker in self._workers:
+            worker.cancel()
+        for user in {user for user, _ in self._jobs}:
+            self.cancel(user)
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+_scan_queue: Optional[ScanQueue] = None
+
+
+def get_scan_queue() -> ScanQueue:
+    """Return the process-wide scan queue, configured from settings"""
+    global _scan_queue
+    if _scan_queue is None:
+        from ...core.config import settings
+        _scan_queue = ScanQueue(
+            workers=settings.SCAN_WORKERS,
+            max_size=settings.SCAN_QUEUE_SIZE,
+            per_user=settings.SCAN_USER_CONCURRENCY,
+            timeout=settings.SCAN_JOB_TIMEOUT
+        )
+    return _scan_queue
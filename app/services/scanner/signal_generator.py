@@ -2,11 +2,15 @@
 Trading Signal Generator
 Combines Price Action, Indicators, and S/R levels to generate trading signals
 """
+import numpy as np
 import pandas as pd
 import uuid
 from datetime import datetime, timedelta
-from typing import List, Optional
+from functools import cached_property, partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
 import pytz
+from ...core.metrics import ANALYSIS_SECONDS
 from ...models.schemas import (
     TradingSignal,
     PriceActionPattern,
@@ -16,11 +20,151 @@ from ...models.schemas import (
 from ..price_action.pattern_detector import PriceActionDetector
 from ..price_action.support_resistance import SupportResistanceDetector
 from ..indicators.technical_indicators import TechnicalIndicators
+from ..indicators import batch_indicators
+
+logger = logging.getLogger(__name__)
+
+# last axis order of the candle arrays given to generate_signals
+OHLCV = ("open", "high", "low", "close", "volume")
+
+
+class SignalFeatures:
+    """
+    Indicator values of one generate_signal call
+
+    Every value is computed on first use and shared by the direction, filter
+    and confluence stages.
+    """
+
+    def __init__(self, df: pd.DataFrame, indicators: TechnicalIndicators):
+        self.df = df
+        self.indicators = indicators
+        self._high_volatility: Dict[float, bool] = {}
+
+    @cached_property
+    def trend(self) -> str:
+        return self.indicators.detect_trend(self.df)
+
+    @cached_property
+    def rsi(self) -> Optional[float]:
+        rsi = self.indicators.calculate_rsi(self.df)
+        return rsi.iloc[-1] if len(rsi) > 0 else None
+
+    @cached_property
+    def macd(self) -> Optional[Tuple[float, float]]:
+        """(MACD line, signal line) of the last candle"""
+        macd_line, signal_line, _ = self.indicators.calculate_macd(self.df)
+        if len(macd_line) > 1 and len(signal_line) > 1:
+            return macd_line.iloc[-1], signal_line.iloc[-1]
+        return None
+
+    @cached_property
+    def ma_crossover(self) -> str:
+        return self.indicators.check_ma_crossover(self.df, fast_period=9, slow_period=21)
+
+    @cached_property
+    def stochastic(self) -> Optional[Tuple[float, float]]:
+        """(%K, %D) of the last candle"""
+        k_line, d_line = self.indicators.calculate_stochastic(self.df, k_period=14, d_period=3)
+        if len(k_line) > 1 and len(d_line) > 1:
+            return k_line.iloc[-1], d_line.iloc[-1]
+        return None
+
+    @cached_property
+    def volume_increasing(self) -> bool:
+        return self.indicators.is_volume_increasing(self.df)
+
+    @cached_property
+    def volume_decreasing(self) -> bool:
+        return self.indicators.is_volume_decreasing(self.df)
+
+    def is_high_volatility(self, threshold: float) -> bool:
+        if threshold not in self._high_volatility:
+            self._high_volatility[threshold] = self.indicators.is_high_volatility(self.df, threshold=threshold)
+        return self._high_volatility[threshold]
+
+
+class BatchSignalFeatures:
+    """
+    Indicator values of one symbol of a generate_signals call
+
+    Same interface as SignalFeatures, read from the arrays computed for
+    every symbol at once by batch_indicators.signal_features.
+    """
+
+    def __init__(self, batch: Dict[str, np.ndarray], row: int, candle_count: int):
+        self.batch = batch
+        self.row = row
+        self.candle_count = candle_count
+
+    @property
+    def trend(self) -> str:
+        return self.batch["trend"][self.row]
+
+    @property
+    def rsi(self) -> Optional[float]:
+        return self.batch["rsi"][self.row] if self.candle_count > 0 else None
+
+    @property
+    def macd(self) -> Optional[Tuple[float, float]]:
+        """(MACD line, signal line) of the last candle"""
+        if self.candle_count > 1:
+            return self.batch["macd"][self.row], self.batch["macd_signal"][self.row]
+        return None
+
+    @property
+    def ma_crossover(self) -> str:
+        return self.batch["ma_crossover"][self.row]
+
+    @property
+    def stochastic(self) -> Optional[Tuple[float, float]]:
+        """(%K, %D) of the last candle"""
+        if self.candle_count > 1:
+            return self.batch["stoch_k"][self.row], self.batch["stoch_d"][self.row]
+        return None
+
+    @property
+    def volume_increasing(self) -> bool:
+        return bool(self.batch["volume_increasing"][self.row])
+
+    @property
+    def volume_decreasing(self) -> bool:
+        return bool(self.batch["volume_decreasing"][self.row])
+
+    def is_high_volatility(self, threshold: float) -> bool:
+        return bool(self.batch[f"high_volatility_{threshold}"][self.row])
+
+
+def stack_candles(frames: Sequence[pd.DataFrame]) -> np.ndarray:
+    """
+    Stack DataFrames with the same number of candles for generate_signals
+
+    Args:
+        frames: DataFrames with OHLC(V) columns, all of the same length
+
+    Returns:
+        (symbols, candles, OHLCV) float array, volume NaN where missing
+    """
+    count = len(frames[0]) if frames else 0
+    candles = np.full((len(frames), count, len(OHLCV)), np.nan)
+    for row, df in enumerate(frames):
+        for column, name in enumerate(OHLCV):
+            if name in df.columns:
+                candles[row, :, column] = df[name].to_numpy(dtype=float)
+    return candles
 
 
 class SignalGenerator:
     """Generate trading signals based on multiple confluences"""
 
+    # is_high_volatility thresholds used by _apply_filters
+    VOLATILITY_THRESHOLDS = (2.0, 2.5, 4.0)
+    # Smaller groups go through generate_signal (fixed cost of a batch)
+    BATCH_MIN_SYMBOLS = 3
+    # Longer series too: the batch only amortizes per-call overhead, which
+    # the per-candle cost outweighs beyond this (it also copies the candles)
+    BATCH_MAX_CANDLES = 4000
+
     def __init__(self, config: ScanConfig):
         """
         Initialize signal generator
@@ -34,12 +178,13 @@ class SignalGenerator:
         self.indicators = TechnicalIndicators()
 
         # LOG das configurações aplicadas
-        print(f"[SignalGenerator] Configuração aplicada:")
-        print(f"  - Sensibilidade: {config.sensitivity}")
-        print(f"  - Timeframe: {config.timeframe}M")
-        print(f"  - Somente OTC: {config.only_otc}")
-        print(f"  - Somente Mercado Aberto: {config.only_open_market}")
+        logger.info(
+            "[SignalGenerator] Configuração aplicada: Sensibilidade=%s | Timeframe=%sM | "
+            "Somente OTC=%s | Somente Mercado Aberto=%s",
+            config.sensitivity, config.timeframe, config.only_otc, config.only_open_market
+        )
 
+    @ANALYSIS_SECONDS.labels("single").time()
     def generate_signal(
         self,
         symbol: str,
@@ -55,56 +200,173 @@ class SignalGenerator:
         Returns:
             TradingSignal if valid signal found, None otherwise
         """
-        # VALIDAÇÃO: Mínimo de candles ajustado por sensibilidade
+        if len(df) < self._min_candles():
+            logger.debug("[SignalGenerator] %s: ❌ Candles insuficientes (%s/%s) - IGNORADO", symbol, len(df), self._min_candles())
+            return None
+
+        # Cada indicador e calculado uma unica vez, sob demanda
+        features = SignalFeatures(df, self.indicators)
+
+        # Detect patterns - APENAS PADRÕES REAIS
+        patterns = self.pattern_detector.detect_patterns(df)
+
+        return self._evaluate(
+            symbol,
+            len(df),
+            patterns,
+            features,
+            partial(self.sr_detector.detect_levels, df),
+            df['close'].iloc[-1]
+        )
+
+    @ANALYSIS_SECONDS.labels("batch").time()
+    def generate_signals(
+        self,
+        symbols: Sequence[str],
+        candles: np.ndarray
+    ) -> Dict[str, Optional[TradingSignal]]:
+        """
+        Generate trading signals for many symbols at once
+
+        Patterns are detected for every symbol in one vectorized pass over
+        the stacked candles, then indicators and filter inputs in one pass
+        over the symbols with a pattern (the only ones that read them); the
+        per-symbol
+        decision then runs the same stages as generate_signal, with the same
+        indicator definitions, so results match generate_signal on each
+        symbol's DataFrame.
+
+        Args:
+            symbols: Trading pair symbols, one per row of candles
+            candles: (symbols, candles, OHLCV) array, see stack_candles
+
+        Returns:
+            Dict of symbol -> TradingSignal or None, in symbols order
+        """
+        candles = np.asarray(candles, dtype=float)
+        count = candles.shape[1]
+        if count < self._min_candles():
+            for symbol in symbols:
+                logger.debug("[SignalGenerator] %s: ❌ Candles insuficientes (%s/%s) - IGNORADO", symbol, count, self._min_candles())
+            return {symbol: None for symbol in symbols}
+
+        o, h, l, c, v = (np.ascontiguousarray(candles[:, :, i]) for i in range(len(OHLCV)))
+        patterns = self.pattern_detector.detect_patterns_batch(o, h, l, c)
+        # Indicadores so dos simbolos com padrao (os outros nao os leem)
+        rows = [row for row in range(len(symbols)) if patterns[row]]
+        batch = {}
+        if rows:
+            batch = batch_indicators.signal_features(
+                h[rows], l[rows], c[rows], v[rows], volatility_thresholds=self.VOLATILITY_THRESHOLDS
+            )
+        positions = {row: position for position, row in enumerate(rows)}
+
+        return {
+            symbol: self._evaluate(
+                symbol,
+                count,
+                patterns[row],
+                BatchSignalFeatures(batch, positions.get(row), count),
+                partial(self.sr_detector.detect_levels_from_arrays, h[row], l[row], c[row, -1]),
+                c[row, -1]
+            )
+            for row, symbol in enumerate(symbols)
+        }
+
+    def generate_signals_for_frames(
+        self,
+        frames: Dict[str, pd.DataFrame]
+    ) -> Dict[str, Optional[TradingSignal]]:
+        """
+        generate_signals() of DataFrames, one batch per candle count
+
+        Candle counts with fewer than BATCH_MIN_SYMBOLS symbols, or more
+        than BATCH_MAX_CANDLES candles, run generate_signal per symbol
+        instead (same results).
+
+        Args:
+            frames: Dict of symbol -> DataFrame with OHLC data
+
+        Returns:
+            Dict of symbol -> TradingSignal or None, in frames order
+        """
+        groups: Dict[int, List[str]] = {}
+        for symbol, df in frames.items():
+            groups.setdefault(len(df), []).append(symbol)
+
+        results: Dict[str, Optional[TradingSignal]] = {}
+        for count, symbols in groups.items():
+            if len(symbols) < self.BATCH_MIN_SYMBOLS or count > self.BATCH_MAX_CANDLES:
+                results.update((symbol, self.generate_signal(symbol, frames[symbol])) for symbol in symbols)
+                continue
+            candles = stack_candles([frames[symbol] for symbol in symbols])
+            results.update(self.generate_signals(symbols, candles))
+        return {symbol: results[symbol] for symbol in frames}
+
+    def _min_candles(self) -> int:
+        """Mínimo de candles ajustado por sensibilidade"""
         min_candles_map = {
             "conservative": 50,
             "moderate": 40,
             "aggressive": 30
         }
-        min_candles = min_candles_map.get(self.config.sensitivity, 40)
+        return min_candles_map.get(self.config.sensitivity, 40)
 
-        if len(df) < min_candles:
-            print(f"[SignalGenerator] {symbol}: ❌ Candles insuficientes ({len(df)}/{min_candles}) - IGNORADO")
-            return None
+    def _evaluate(
+        self,
+        symbol: str,
+        candle_count: int,
+        patterns: List[PriceActionPattern],
+        features,
+        detect_levels: Callable[[], List[SupportResistanceLevel]],
+        current_price: float
+    ) -> Optional[TradingSignal]:
+        """
+        Decision stages shared by generate_signal and generate_signals
 
-        # Detect patterns - APENAS PADRÕES REAIS
-        patterns = self.pattern_detector.detect_patterns(df)
+        Args:
+            symbol: Trading pair symbol
+            candle_count: Number of candles analysed
+            patterns: Patterns detected on the last candles
+            features: SignalFeatures or BatchSignalFeatures of the symbol
+            detect_levels: Returns the S/R levels (only called with a pattern)
+            current_price: Last close
 
+        Returns:
+            TradingSignal if valid signal found, None otherwise
+        """
         # SEM PADRÕES REAIS = SEM SINAL (NUNCA INVENTAR!)
         if not patterns:
-            print(f"[SignalGenerator] {symbol}: ❌ Nenhum padrão detectado ({len(df)} candles analisados)")
+            logger.debug("[SignalGenerator] %s: ❌ Nenhum padrão detectado (%s candles analisados)", symbol, candle_count)
             return None
 
         # Get the most recent pattern
         pattern = patterns[-1]
 
         # Detect support/resistance levels
-        sr_levels = self.sr_detector.detect_levels(df)
-
-        # Get current price
-        current_price = df['close'].iloc[-1]
+        sr_levels = detect_levels()
 
         # Check if near S/R level
         is_near, sr_level = self.sr_detector.is_near_level(current_price, sr_levels)
 
         # Determine signal direction - APENAS SE HOUVER DIREÇÃO CLARA
-        direction = self._determine_direction(pattern, sr_level, df)
+        direction = self._determine_direction(pattern, sr_level, features)
 
         # SEM DIREÇÃO CLARA = SEM SINAL (NUNCA ADIVINHAR!)
         if not direction:
-            print(f"[SignalGenerator] {symbol}: ❌ Direção não determinada - Padrão: {pattern.pattern_type}")
+            logger.debug("[SignalGenerator] %s: ❌ Direção não determinada - Padrão: %s", symbol, pattern.pattern_type)
             return None
 
         # Apply filters - SEMPRE OBRIGATÓRIO
-        filters_ok, filter_reason = self._apply_filters(df, direction)
+        filters_ok, filter_reason = self._apply_filters(features, direction)
 
         # FILTROS FALHARAM = SEM SINAL (SEM EXCEÇÕES!)
         if not filters_ok:
-            print(f"[SignalGenerator] {symbol}: ❌ Filtros não aprovados - {filter_reason}")
+            logger.debug("[SignalGenerator] %s: ❌ Filtros não aprovados - %s", symbol, filter_reason)
             return None
 
         # Calculate confluences - MÍNIMO 2 CONFLUÊNCIAS REAIS
-        confluences = self._calculate_confluences(pattern, sr_level, df, direction)
+        confluences = self._calculate_confluences(pattern, sr_level, features, direction)
 
         # SEM CONFLUÊNCIAS SUFICIENTES = SEM SINAL
         min_confluences_map = {
@@ -116,8 +378,8 @@ class SignalGenerator:
 
         if len(confluences) < min_confluences:
             confluences_str = ", ".join(confluences) if confluences else "Nenhuma"
-            print(f"[SignalGenerator] {symbol}: ❌ Confluências insuficientes ({len(confluences)}/{min_confluences})")
-            print(f"[SignalGenerator]    → Encontradas: {confluences_str}")
+            logger.debug("[SignalGenerator] %s: ❌ Confluências insuficientes (%s/%s)", symbol, len(confluences), min_confluences)
+            logger.debug("[SignalGenerator]    → Encontradas: %s", confluences_str)
             return None
 
         # Calculate confidence - BASEADO APENAS EM CONFLUÊNCIAS REAIS
@@ -152,8 +414,8 @@ class SignalGenerator:
         )
 
         # LOG de sucesso
-        print(f"[SignalGenerator] ✅ SINAL GERADO: {symbol} - {direction} @ {current_price:.5f}")
-        print(f"[SignalGenerator]    → Confiança: {confidence:.1f}% | Confluências: {len(confluences)} | Padrão: {pattern.pattern_type}")
+        logger.info("[SignalGenerator] ✅ SINAL GERADO: %s - %s @ %.5f", symbol, direction, current_price)
+        logger.info("[SignalGenerator]    → Confiança: %.1f%% | Confluências: %s | Padrão: %s", confidence, len(confluences), pattern.pattern_type)
 
         return signal
 
@@ -161,7 +423,7 @@ class SignalGenerator:
         self,
         pattern: PriceActionPattern,
         sr_level: Optional[SupportResistanceLevel],
-        df: pd.DataFrame
+        features: SignalFeatures
     ) -> Optional[str]:
         """
         Determine signal direction (CALL or PUT) - 100% BASEADO EM ANÁLISE REAL
@@ -179,9 +441,8 @@ class SignalGenerator:
 
         # Doji - usar RSI para decidir APENAS se RSI estiver em zona extrema
         if pattern.pattern_type == "doji":
-            rsi = self.indicators.calculate_rsi(df)
-            if len(rsi) > 0:
-                rsi_value = rsi.iloc[-1]
+            rsi_value = features.rsi
+            if rsi_value is not None:
                 # APENAS zonas extremas
                 if rsi_value < 30:  # Sobrevenda clara
                     return "CALL"
@@ -192,7 +453,7 @@ class SignalGenerator:
 
         # Inside bar - usar tendência APENAS se for forte
         if pattern.pattern_type == "inside_bar":
-            trend = self.indicators.detect_trend(df)
+            trend = features.trend
             if trend == "bullish":
                 return "CALL"
             elif trend == "bearish":
@@ -203,14 +464,14 @@ class SignalGenerator:
         # Padrão não reconhecido = SEM SINAL
         return None
 
-    def _apply_filters(self, df: pd.DataFrame, direction: str) -> tuple[bool, str]:
+    def _apply_filters(self, features: SignalFeatures, direction: str) -> tuple[bool, str]:
         """
         Apply various filters based on configuration - SEMPRE RIGOROSO
 
         Returns:
             (passed: bool, reason: str) - True if passed, False with reason if failed
         """
-        trend = self.indicators.detect_trend(df)
+        trend = features.trend
 
         # MODO AGRESSIVO: Filtros básicos mas REAIS
         if self.config.sensitivity == "aggressive":
@@ -221,7 +482,7 @@ class SignalGenerator:
                 return False, f"Tendência bullish conflita com PUT"
 
             # Evita volatilidade extrema (mercado errático)
-            if self.indicators.is_high_volatility(df, threshold=4.0):
+            if features.is_high_volatility(4.0):
                 return False, f"Volatilidade extrema (threshold: 4.0)"
 
             return True, "OK"
@@ -235,11 +496,11 @@ class SignalGenerator:
                 return False, f"Tendência bullish conflita com PUT"
 
             # Volatility filter
-            if self.indicators.is_high_volatility(df, threshold=2.5):
+            if features.is_high_volatility(2.5):
                 return False, f"Volatilidade alta (threshold: 2.5)"
 
             # Volume deve estar pelo menos normal (não decrescente)
-            if self.indicators.is_volume_decreasing(df):
+            if features.volume_decreasing:
                 return False, f"Volume decrescente"
 
             return True, "OK"
@@ -247,11 +508,11 @@ class SignalGenerator:
         # MODO CONSERVADOR: Filtros MUITO RIGOROSOS
         if self.config.sensitivity == "conservative":
             # Volume filter (OBRIGATÓRIO - deve estar crescente)
-            if not self.indicators.is_volume_increasing(df):
+            if not features.volume_increasing:
                 return False, f"Volume não crescente"
 
             # Volatility filter (rigoroso)
-            if self.indicators.is_high_volatility(df, threshold=2.0):
+            if features.is_high_volatility(2.0):
                 return False, f"Volatilidade alta (threshold: 2.0)"
 
             # Trend filter (OBRIGATÓRIO - deve estar ALINHADO)
@@ -268,7 +529,7 @@ class SignalGenerator:
         self,
         pattern: PriceActionPattern,
         sr_level: Optional[SupportResistanceLevel],
-        df: pd.DataFrame,
+        features: SignalFeatures,
         direction: str
     ) -> List[str]:
         """Calculate all confluences supporting the signal"""
@@ -285,19 +546,18 @@ class SignalGenerator:
             )
 
         # Trend confluence
-        trend = self.indicators.detect_trend(df)
+        trend = features.trend
         if (direction == "CALL" and trend == "bullish") or \
            (direction == "PUT" and trend == "bearish"):
             confluences.append(f"Tendncia {trend} favorvel")
 
         # Volume confluence
-        if self.indicators.is_volume_increasing(df):
+        if features.volume_increasing:
             confluences.append("Volume crescente confirmando movimento")
 
         # RSI confluence - APENAS ZONAS EXTREMAS REAIS
-        rsi = self.indicators.calculate_rsi(df)
-        if len(rsi) > 0:
-            rsi_value = rsi.iloc[-1]
+        rsi_value = features.rsi
+        if rsi_value is not None:
             # Sobrevenda: RSI < 30 (não 40!)
             if direction == "CALL" and rsi_value < 30:
                 confluences.append(f"RSI em sobrevenda extrema ({rsi_value:.1f})")
@@ -306,15 +566,15 @@ class SignalGenerator:
                 confluences.append(f"RSI em sobrecompra extrema ({rsi_value:.1f})")
 
         # MACD confluence
-        macd_line, signal_line, _ = self.indicators.calculate_macd(df)
-        if len(macd_line) > 1 and len(signal_line) > 1:
-            if direction == "CALL" and macd_line.iloc[-1] > signal_line.iloc[-1]:
+        if features.macd is not None:
+            macd_value, signal_value = features.macd
+            if direction == "CALL" and macd_value > signal_value:
                 confluences.append("MACD bullish")
-            elif direction == "PUT" and macd_line.iloc[-1] < signal_line.iloc[-1]:
+            elif direction == "PUT" and macd_value < signal_value:
                 confluences.append("MACD bearish")
 
         # Moving Average Crossover (MA 9 x MA 21) confluence
-        ma_cross = self.indicators.check_ma_crossover(df, fast_period=9, slow_period=21)
+        ma_cross = features.ma_crossover
         if ma_cross == 'bullish_cross' and direction == "CALL":
             confluences.append("Cruzamento MA9 x MA21 (ALTA)")
         elif ma_cross == 'bearish_cross' and direction == "PUT":
@@ -325,10 +585,8 @@ class SignalGenerator:
             confluences.append("MA9 < MA21 (tendência de baixa)")
 
         # Stochastic Oscillator confluence
-        k_line, d_line = self.indicators.calculate_stochastic(df, k_period=14, d_period=3)
-        if len(k_line) > 1 and len(d_line) > 1:
-            k_value = k_line.iloc[-1]
-            d_value = d_line.iloc[-1]
+        if features.stochastic is not None:
+            k_value, d_value = features.stochastic
 
             # Oversold zone (< 20) - good for CALL
             if direction == "CALL" and k_value < 20 and d_value < 20:
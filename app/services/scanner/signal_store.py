@@ -0,0 +1,215 @@
+"""
+Signal Store
+Bounded signal history indexed by id, symbol, time and confidence
+"""
+import bisect
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from ...models.schemas import TradingSignal
+
+TimeBound = Union[datetime, float, None]
+
+
+def _epoch(value: TimeBound, default: float) -> float:
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class SignalStore:
+    """
+    Signal history of a scanner, capped at ``max_size`` signals and
+    ``ttl`` seconds
+
+    Indexes (entries are keyed by an insertion number):
+    - signal_id -> entry: get() in O(1);
+    - time: (timestamp, entry) sorted, consumed from a head offset, so
+      eviction of the oldest is O(1) amortized and time ranges are
+      O(log n + k);
+    - confidence: (confidence, entry) sorted, evicted entries are skipped
+      and purged once they are half of the index; confidence ranges are
+      O(log n + k);
+    - symbol: entries in insertion order per symbol (latest per symbol
+      and per-symbol history without scanning the others).
+
+    Signals usually arrive in time order, so adding one is an append; an
+    older timestamp is inserted in place.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: Optional[float] = None):
+        """
+        Args:
+            max_size: Signals kept; the oldest are evicted beyond it
+            ttl: Seconds a signal is kept (None or 0: no age limit)
+        """
+        self.max_size = max(1, max_size)
+        self.ttl = ttl or None
+        self._seq = 0
+        self._signals: Dict[int, TradingSignal] = {}
+        self._ids: Dict[str, int] = {}
+        self._times: List[Tuple[float, int]] = []
+        self._head = 0
+        self._confidence: List[Tuple[float, int]] = []
+        self._symbols: Dict[str, Deque[int]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._signals)
+
+    def __iter__(self) -> Iterator[TradingSignal]:
+        """Signals from the oldest to the newest"""
+        for _, entry in self._times[self._head:]:
+            yield self._signals[entry]
+
+    def add(self, signal: TradingSignal):
+        """Store a signal, evicting expired signals and the oldest beyond max_size"""
+        if signal.signal_id in self._ids:
+            self._discard(self._ids[signal.signal_id])
+        self._seq += 1
+        entry = self._seq
+        stamp = signal.timestamp.timestamp()
+        self._signals[entry] = signal
+        self._ids[signal.signal_id] = entry
+
+        if self._head == len(self._times) or stamp >= self._times[-1][0]:
+            self._times.append((stamp, entry))
+        else:
+            bisect.insort(self._times, (stamp, entry), lo=self._head)
+        bisect.insort(self._confidence, (signal.confidence, entry))
+        self._symbols.setdefault(signal.symbol, deque()).append(entry)
+        self._counts[signal.symbol] = self._counts.get(signal.symbol, 0) + 1
+
+        self.expire()
+        while len(self._signals) > self.max_size:
+            self._pop_oldest()
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Evict signals older than the TTL; returns how many"""
+        if self.ttl is None:
+            return 0
+        return self.evict_before((now if now is not None else time.time()) - self.ttl)
+
+    def evict_before(self, cutoff: TimeBound) -> int:
+        """Evict signals generated before a time (datetime or epoch seconds); returns how many"""
+        cutoff = _epoch(cutoff, 0.0)
+        removed = 0
+        while self._head < len(self._times) and self._times[self._head][0] < cutoff:
+            self._pop_oldest()
+            removed += 1
+        return removed
+
+    def get(self, signal_id: str) -> Optional[TradingSignal]:
+        entry = self._ids.get(signal_id)
+        return self._signals.get(entry) if entry is not None else None
+
+    def latest(self, symbol: str) -> Optional[TradingSignal]:
+        """Last signal stored for a symbol"""
+        for entry in reversed(self._symbols.get(symbol, ())):
+            signal = self._signals.get(entry)
+            if signal is not None:
+                return signal
+        return None
+
+    def latest_by_symbol(self) -> Dict[str, TradingSignal]:
+        """Last signal stored for every symbol"""
+        latest = {}
+        for symbol in self._symbols:
+            signal = self.latest(symbol)
+            if signal is not None:
+                latest[symbol] = signal
+        return latest
+
+    def symbol_counts(self) -> Dict[str, int]:
+        """Signals stored per symbol"""
+        return dict(self._counts)
+
+    def by_symbol(self, symbol: str, limit: Optional[int] = None) -> List[TradingSignal]:
+        """Signals of a symbol, newest first"""
+        signals = []
+        for entry in reversed(self._symbols.get(symbol, ())):
+            signal = self._signals.get(entry)
+            if signal is None:
+                continue
+            signals.append(signal)
+            if limit is not None and len(signals) >= limit:
+                break
+        return signals
+
+    def recent(self, limit: int = 10, min_confidence: float = 0.0) -> List[TradingSignal]:
+        """Newest signals first, at least ``min_confidence``"""
+        signals = []
+        index = len(self._times) - 1
+        while index >= self._head and len(signals) < limit:
+            signal = self._signals[self._times[index][1]]
+            if signal.confidence >= min_confidence:
+                signals.append(signal)
+            index -= 1
+        return signals
+
+    def between(
+        self,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        min_confidence: float = 0.0,
+        max_confidence: float = 100.0
+    ) -> List[TradingSignal]:
+        """Signals generated in [start, end], oldest first, within a confidence range"""
+        low = bisect.bisect_left(self._times, (_epoch(start, float("-inf")),), lo=self._head)
+        high = bisect.bisect_right(self._times, (_epoch(end, float("inf")), float("inf")), lo=low)
+        signals = []
+        for _, entry in self._times[low:high]:
+            signal = self._signals[entry]
+            if min_confidence <= signal.confidence <= max_confidence:
+                signals.append(signal)
+        return signals
+
+    def by_confidence(self, min_confidence: float = 0.0, max_confidence: float = 100.0) -> List[TradingSignal]:
+        """Signals within a confidence range, highest confidence first"""
+        low = bisect.bisect_left(self._confidence, (min_confidence,))
+        high = bisect.bisect_right(self._confidence, (max_confidence, float("inf")), lo=low)
+        signals = []
+        for _, entry in reversed(self._confidence[low:high]):
+            signal = self._signals.get(entry)
+            if signal is not None:
+                signals.append(signal)
+        return signals
+
+    def clear(self):
+        self.__init__(self.max_size, self.ttl)
+
+    def _pop_oldest(self):
+        _, entry = self._times[self._head]
+        self._head += 1
+        self._drop(entry)
+        if self._head > 1024 and self._head * 2 > len(self._times):
+            del self._times[:self._head]
+            self._head = 0
+
+    def _discard(self, entry: int):
+        """Remove an entry from anywhere in the time index (replaced signal)"""
+        signal = self._signals[entry]
+        index = bisect.bisect_left(self._times, (signal.timestamp.timestamp(), entry), lo=self._head)
+        del self._times[index]
+        self._drop(entry)
+
+    def _drop(self, entry: int):
+        signal = self._signals.pop(entry)
+        if self._ids.get(signal.signal_id) == entry:
+            del self._ids[signal.signal_id]
+
+        entries = self._symbols[signal.symbol]
+        while entries and entries[0] not in self._signals:
+            entries.popleft()
+        self._counts[signal.symbol] -= 1
+        if not self._counts[signal.symbol]:
+            del self._counts[signal.symbol]
+            del self._symbols[signal.symbol]
+
+        # purge evicted entries from the confidence index once they are half of it
+        if len(self._confidence) > 2 * len(self._signals) + 64:
+            self._confidence = [item for item in self._confidence if item[1] in self._signals]
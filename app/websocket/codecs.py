@@ -0,0 +1,120 @@
+"""
+WebSocket frame encodings
+json (the original format), compact JSON and MessagePack
+"""
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+ENCODINGS = ("json", "compact", "msgpack")
+DEFAULT_ENCODING = "json"
+# Sec-WebSocket-Protocol name -> encoding
+SUBPROTOCOLS = {f"gtsniper.{encoding}": encoding for encoding in ENCODINGS}
+
+# Short keys of the compact encodings (signal, pattern and S/R fields, envelope)
+SHORT_KEYS = {
+    "type": "t",
+    "data": "d",
+    "signal_id": "id",
+    "timestamp": "ts",
+    "symbol": "s",
+    "timeframe": "tf",
+    "direction": "dir",
+    "entry_price": "p",
+    "entry_time": "et",
+    "expiry_time": "xt",
+    "pattern": "pa",
+    "pattern_type": "pt",
+    "description": "ds",
+    "candle_index": "ci",
+    "support_resistance": "sr",
+    "level": "l",
+    "strength": "st",
+    "touches": "to",
+    "confluences": "cf",
+    "confidence": "c",
+    "expiry_minutes": "xm",
+}
+
+Frame = Union[str, bytes]
+
+
+class DateTimeEncoder(json.JSONEncoder):
+    """Custom JSON encoder for datetime objects"""
+    def default(self, obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        return super().default(obj)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Encodings this server can produce (msgpack needs the msgpack package)"""
+    return tuple(encoding for encoding in ENCODINGS if encoding != "msgpack" or MSGPACK_AVAILABLE)
+
+
+def negotiate(subprotocols: Sequence[str], requested: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    Pick the encoding of a connection
+
+    A gtsniper.<encoding> subprotocol offered by the client wins (it is
+    echoed in the handshake), then the ?encoding= query value, then json.
+
+    Returns:
+        (encoding, subprotocol to accept or None)
+    """
+    available = available_encodings()
+    for subprotocol in subprotocols or ():
+        encoding = SUBPROTOCOLS.get(subprotocol)
+        if encoding in available:
+            return encoding, subprotocol
+    if requested in available:
+        return requested, None
+    return DEFAULT_ENCODING, None
+
+
+def decode(frame: Frame) -> Optional[dict]:
+    """Parse a client frame (JSON text, or MessagePack/JSON bytes); None if invalid"""
+    try:
+        if isinstance(frame, (bytes, bytearray)):
+            if MSGPACK_AVAILABLE:
+                message = msgpack.unpackb(frame, raw=False)
+            else:
+                message = json.loads(frame)
+        else:
+            message = json.loads(frame)
+    except Exception:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def compact(value):
+    """Short keys and epoch millisecond timestamps, recursively"""
+    if isinstance(value, dict):
+        return {SHORT_KEYS.get(key, key): compact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [compact(item) for item in value]
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return value
+
+
+def encode(message: dict, encoding: str = DEFAULT_ENCODING) -> Frame:
+    """
+    Serialize a message for the wire
+
+    Returns:
+        str (text frame) for json and compact, bytes (binary frame) for msgpack
+    """
+    if encoding == "json":
+        return json.dumps(message, cls=DateTimeEncoder)
+    if encoding == "compact":
+        return json.dumps(compact(message), separators=(",", ":"), ensure_ascii=False)
+    if encoding == "msgpack":
+        return msgpack.packb(compact(message), use_bin_type=True)
+    raise ValueError(f"Invalid encoding {encoding!r}, expected one of {ENCODINGS}")
@@ -0,0 +1,123 @@
+"""
+Signal event log
+Sequence-numbered deltas of a user's signal state, for snapshot and resume
+"""
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Event types: a signal replaced the one of its (symbol, timeframe), the
+# scanner cleared its signals, the scanner status changed
+SIGNAL = "signal"
+RESET = "reset"
+STATUS = "status"
+
+
+def signal_key(signal_data: dict) -> str:
+    """State key of a signal: the latest one per (symbol, timeframe) is kept"""
+    return f"{signal_data.get('symbol')}:{signal_data.get('timeframe')}"
+
+
+def _epoch(value) -> Optional[float]:
+    """Epoch seconds of a datetime, epoch number or ISO string (None if neither)"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class EventLog:
+    """
+    Bounded log of the signal events of one owner's scanners
+
+    Every event gets the next sequence number; the current state (latest
+    signal per symbol/timeframe and status, per scanner ``source``) is kept
+    alongside, so a new client gets a snapshot and a reconnecting client
+    gets the events after the last sequence it saw. A reset clears only the
+    signals of its source. Signals leave the state once their expiry_time
+    passes or they are older than ``ttl`` seconds. The epoch changes
+    whenever sequences restart (a new log, i.e. a server restart), so a
+    client cannot resume against the wrong numbering.
+    """
+
+    def __init__(self, max_events: int = 500, ttl: Optional[float] = None):
+        """
+        Args:
+            max_events: Events kept for resume
+            ttl: Seconds a signal stays in the state (None or 0: until expiry_time)
+        """
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.ttl = ttl or None
+        self.events: deque = deque(maxlen=max(1, max_events))
+        # (source, signal_key) -> signal data
+        self.signals: Dict[Tuple[Optional[str], str], dict] = {}
+        # source -> last status
+        self.status: Dict[Optional[str], dict] = {}
+
+    def append(self, kind: str, data: Optional[dict] = None, source: Optional[str] = None) -> dict:
+        """Record an event of a scanner source and apply it to the state"""
+        self.seq += 1
+        event = {"seq": self.seq, "type": kind, "data": data}
+        if source is not None:
+            event["source"] = source
+        self.events.append(event)
+        if kind == SIGNAL:
+            self.signals[(source, signal_key(data))] = data
+        elif kind == RESET:
+            self.signals = {key: item for key, item in self.signals.items() if key[0] != source}
+        elif kind == STATUS:
+            self.status[source] = data
+        return event
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop signals past their expiry_time or older than the TTL; returns how many"""
+        now = time.time() if now is None else now
+        expired = []
+        for key, signal_data in self.signals.items():
+            expiry = _epoch(signal_data.get("expiry_time"))
+            if expiry is not None and expiry <= now:
+                expired.append(key)
+                continue
+            generated = _epoch(signal_data.get("timestamp"))
+            if self.ttl is not None and generated is not None and generated < now - self.ttl:
+                expired.append(key)
+        for key in expired:
+            del self.signals[key]
+        return len(expired)
+
+    def since(self, seq: int, epoch: Optional[str]) -> Optional[List[dict]]:
+        """
+        Events after a sequence number of an epoch
+
+        Returns:
+            The events (possibly none), or None if they are no longer all in
+            the log, or the epoch is missing or differs: the client needs a
+            snapshot
+        """
+        if epoch is None or epoch != self.epoch:
+            return None
+        if seq > self.seq or seq < 0:
+            return None
+        if seq == self.seq:
+            return []
+        first = self.events[0]["seq"] if self.events else self.seq + 1
+        if seq < first - 1:
+            return None
+        return [event for event in self.events if event["seq"] > seq]
+
+    def snapshot(self, matches: Callable[[dict], bool] = lambda signal_data: True) -> dict:
+        """Current state, signals filtered by a subscription check, status per source"""
+        self.expire()
+        return {
+            "signals": [signal_data for signal_data in self.signals.values() if matches(signal_data)],
+            "status": {source: status for source, status in self.status.items()},
+        }
@@ -1,90 +1,630 @@
 """
 WebSocket handler for real-time signal updates
+The single hub behind /ws and /ws/signals
 """
-import json
 import asyncio
-from typing import Set
-from datetime import datetime
+import logging
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 
+from ..core.config import settings
+from ..core.metrics import WS_CLIENTS, WS_FRAMES_DROPPED
+from .codecs import (
+    DEFAULT_ENCODING,
+    SHORT_KEYS,
+    DateTimeEncoder,
+    Frame,
+    available_encodings,
+    decode,
+    encode,
+    negotiate,
+)
+from .event_log import RESET, SIGNAL, STATUS, EventLog
 
-class DateTimeEncoder(json.JSONEncoder):
-    """Custom JSON encoder for datetime objects"""
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+logger = logging.getLogger(__name__)
+
+SLOW_CLIENT_POLICIES = ("drop_oldest", "disconnect")
+# Topic symbol of a subscription to every symbol
+ALL_SYMBOLS = "*"
+
+
+class Subscription:
+    """
+    What a client wants to receive: signals of its own user's scanners,
+    optionally limited to some symbols and timeframes and to a minimum
+    confidence
+    """
+
+    def __init__(
+        self,
+        symbols: Optional[Iterable[str]] = None,
+        timeframes: Optional[Iterable[int]] = None,
+        min_confidence: float = 0.0
+    ):
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        if isinstance(timeframes, int):
+            timeframes = [timeframes]
+        self.symbols = {symbol.upper() for symbol in symbols} if symbols else None
+        self.timeframes = {int(timeframe) for timeframe in timeframes} if timeframes else None
+        self.min_confidence = float(min_confidence or 0.0)
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Subscription":
+        """Build from a client "subscribe" message"""
+        return cls(
+            symbols=message.get("symbols"),
+            timeframes=message.get("timeframes"),
+            min_confidence=message.get("min_confidence", 0.0)
+        )
+
+    def accepts(self, signal_data: dict) -> bool:
+        """Symbol, timeframe and confidence checks"""
+        if self.symbols is not None and str(signal_data.get("symbol", "")).upper() not in self.symbols:
+            return False
+        return self.matches(signal_data)
+
+    def topic_symbols(self) -> Set[str]:
+        """Symbols under which the client is indexed"""
+        return set(self.symbols) if self.symbols else {ALL_SYMBOLS}
+
+    def matches(self, signal_data: dict) -> bool:
+        """Timeframe and confidence checks (symbol is matched by the index)"""
+        if self.timeframes is not None and signal_data.get("timeframe") not in self.timeframes:
+            return False
+        return (signal_data.get("confidence") or 0.0) >= self.min_confidence
+
+    def to_dict(self) -> dict:
+        return {
+            "symbols": sorted(self.symbols) if self.symbols else None,
+            "timeframes": sorted(self.timeframes) if self.timeframes else None,
+            "min_confidence": self.min_confidence,
+        }
+
+
+class ClientConnection:
+    """
+    One WebSocket client: a bounded send queue drained by its own writer task
+
+    Frames are already encoded in the client's encoding (str frames are sent
+    as text, bytes as binary).
+
+    Broadcasts only append the (already serialized) frame to the queue, so a
+    slow client never delays the others or the caller. A frame with a
+    coalesce key supersedes the queued frame with the same key (a newer
+    scanner status or signal of the same source and pair the client has not
+    received yet): the old frame is removed and the new one queued at the
+    tail, so frames still go out in the order they were produced. When the
+    queue is full, the slow client policy applies: "drop_oldest" drops the
+    queued frames and calls on_overflow, which queues a snapshot in their
+    place (without it, only the oldest frame is dropped); "disconnect"
+    closes the client. A send blocked for more than send_timeout closes the
+    client too.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user: Optional[str] = None,
+        encoding: str = DEFAULT_ENCODING,
+        max_queue: int = 100,
+        policy: str = "drop_oldest",
+        send_timeout: float = 5.0,
+        on_close: Optional[Callable[["ClientConnection"], None]] = None,
+        on_overflow: Optional[Callable[["ClientConnection"], None]] = None
+    ):
+        if policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Invalid slow client policy {policy!r}, expected one of {SLOW_CLIENT_POLICIES}")
+        self.websocket = websocket
+        self.user = user
+        self.encoding = encoding
+        self.subscription = Subscription()
+        self.max_queue = max(1, max_queue)
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.on_close = on_close
+        self.on_overflow = on_overflow
+        # (coalesce key, frame)
+        self.queue: deque = deque()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.resynced = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: Frame, coalesce: Optional[str] = None) -> bool:
+        """
+        Queue a frame for this client (never waits)
+
+        Returns:
+            False if the client is closed (or was closed by the policy)
+        """
+        if self.closed:
+            return False
+
+        if coalesce is not None:
+            for index, (key, _) in enumerate(self.queue):
+                if key == coalesce:
+                    del self.queue[index]
+                    self.coalesced += 1
+                    WS_FRAMES_DROPPED.labels("coalesced").inc()
+                    break
+
+        if len(self.queue) >= self.max_queue:
+            if self.policy == "disconnect":
+                logger.warning("[WebSocket] Cliente lento desconectado (%s frames na fila)", len(self.queue))
+                WS_FRAMES_DROPPED.labels("disconnected").inc(len(self.queue))
+                self.close()
+                return False
+            if self.on_overflow is None:
+                self.queue.popleft()
+                self.dropped += 1
+                WS_FRAMES_DROPPED.labels("queue_full").inc()
+            else:
+                # The snapshot supersedes the deltas the client would miss
+                dropped = len(self.queue)
+                self.queue.clear()
+                self.dropped += dropped
+                self.resynced += 1
+                WS_FRAMES_DROPPED.labels("queue_full").inc(dropped)
+                self.on_overflow(self)
+
+        self.queue.append((coalesce, frame))
+        self._ready.set()
+        return True
+
+    async def _writer(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                _, frame = self.queue.popleft()
+                if isinstance(frame, bytes):
+                    send = self.websocket.send_bytes(frame)
+                else:
+                    send = self.websocket.send_text(frame)
+                await asyncio.wait_for(send, timeout=self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning("[WebSocket] Envio excedeu %ss - cliente desconectado", self.send_timeout)
+        except Exception as e:
+            logger.info("[WebSocket] Erro ao enviar: %s", e)
+        finally:
+            self._finish()
+
+    def send(self, message: dict) -> bool:
+        """Encode a message for this client and queue it"""
+        return self.enqueue(encode(message, self.encoding))
+
+    def close(self):
+        """Stop the writer and close the socket (queued frames are discarded)"""
+        if self.closed:
+            return
+        self._task.cancel()
+        self._finish()
+        asyncio.ensure_future(self._close_socket())
+
+    async def _close_socket(self):
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+
+    def _finish(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self.on_close:
+            self.on_close(self)
+
+    def stats(self) -> dict:
+        return {
+            "encoding": self.encoding,
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "resynced": self.resynced,
+        }
 
 
 class SignalWebSocketManager:
-    """Manage WebSocket connections for real-time signal updates"""
+    """
+    Manage WebSocket connections for real-time signal updates
+
+    Clients are indexed by topic, (user, symbol) or (user, ALL_SYMBOLS):
+    a signal of a user's scanner only reaches that user's clients
+    subscribed to its symbol (or to every symbol), then filtered by
+    timeframe and minimum confidence. Signals without an owner are public
+    and go to every client whose subscription matches.
+
+    Each client picks an encoding at connect (json, compact or msgpack, see
+    codecs.negotiate); a frame is encoded once per encoding and per set of
+    signals, and shared by every client receiving it. Signals generated in
+    one scan cycle (broadcast_signals) reach a client as one "signals"
+    frame.
+
+    Signals, resets and status updates of an owner are recorded in its
+    EventLog, tagged with the scanner that produced them ("source", e.g.
+    "iqoption" or "auto"), and carry its sequence number ("seq") to the
+    owner's clients; a reset clears only the signals of its source. A
+    client gets a snapshot of the state on connect and on every subscribe;
+    a reconnecting client passes the epoch and last seq it saw (query
+    string or "resume" action) and gets only the events it missed, or a
+    snapshot if they are no longer in the log (or it sent no epoch). A
+    client whose send queue overflows gets a fresh snapshot in place of the
+    dropped frames.
+    """
 
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        policy: Optional[str] = None,
+        send_timeout: Optional[float] = None,
+        max_events: Optional[int] = None
+    ):
+        self.max_queue = max_queue or settings.WS_SEND_QUEUE
+        self.max_events = max_events or settings.WS_EVENT_LOG_SIZE
+        self.policy = policy or settings.WS_SLOW_CLIENT_POLICY
+        self.send_timeout = send_timeout or settings.WS_SEND_TIMEOUT
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # (user, symbol or ALL_SYMBOLS) -> subscribed clients
+        self._topics: Dict[Tuple[Optional[str], str], Set[ClientConnection]] = {}
+        # user -> clients (scanner status of the user)
+        self._users: Dict[Optional[str], Set[ClientConnection]] = {}
+        # owner -> signal event log (None: public signals)
+        self._logs: Dict[Optional[str], EventLog] = {}
 
-    async def connect(self, websocket: WebSocket):
-        """Accept new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections.add(websocket)
-        print(f"[WebSocket] Nova conexão. Total: {len(self.active_connections)}")
+    @property
+    def active_connections(self) -> Set[WebSocket]:
+        return set(self.clients)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user: Optional[str] = None,
+        encoding: Optional[str] = None,
+        since: Optional[int] = None,
+        epoch: Optional[str] = None
+    ):
+        """
+        Accept new WebSocket connection
+
+        Args:
+            websocket: Client socket
+            user: Authenticated username; the client receives that user's
+                signals, every symbol, until it subscribes
+            encoding: Encoding asked in the query string; a gtsniper.<encoding>
+                subprotocol offered in the handshake takes precedence
+            since: Last seq the client saw (resume); None: snapshot
+            epoch: Epoch of that seq (from a previous hello/snapshot)
+        """
+        scope = getattr(websocket, "scope", None) or {}
+        encoding, subprotocol = negotiate(scope.get("subprotocols", ()), encoding)
+        await websocket.accept(subprotocol=subprotocol)
+        client = ClientConnection(
+            websocket,
+            user=user,
+            encoding=encoding,
+            max_queue=self.max_queue,
+            policy=self.policy,
+            send_timeout=self.send_timeout,
+            on_close=self._on_client_closed,
+            on_overflow=self._sync
+        )
+        self.clients[websocket] = client
+        self._users.setdefault(user, set()).add(client)
+        self._index(client)
+        WS_CLIENTS.set(len(self.clients))
+        log = self.log(user)
+        client.send({
+            "type": "hello",
+            "data": {
+                "encoding": encoding,
+                "encodings": list(available_encodings()),
+                # [long, short] pairs: a dict would have its own keys compacted
+                "keys": [list(pair) for pair in SHORT_KEYS.items()] if encoding != "json" else None,
+                "epoch": log.epoch,
+                "seq": log.seq,
+            }
+        })
+        self._sync(client, since, epoch)
+        logger.info("[WebSocket] Nova conexão (%s, %s). Total: %s", user, encoding, len(self.clients))
 
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection"""
-        self.active_connections.discard(websocket)
-        print(f"[WebSocket] Conexão fechada. Total: {len(self.active_connections)}")
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._remove(client)
+            client.on_close = None
+            client.close()
+        logger.info("[WebSocket] Conexão fechada. Total: %s", len(self.clients))
+
+    def subscribe(self, websocket: WebSocket, subscription: Subscription) -> bool:
+        """Replace the subscription of a client (re-indexed)"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return False
+        self._unindex(client)
+        client.subscription = subscription
+        self._index(client)
+        return True
+
+    def handle_message(self, websocket: WebSocket, frame: Frame):
+        """
+        Apply a client control message (JSON text or MessagePack bytes)
+
+        {"action": "subscribe", "symbols": [...], "timeframes": [...],
+        "min_confidence": 70} narrows the stream (missing keys: no filter);
+        {"action": "unsubscribe"} restores every symbol of the user. Both
+        are followed by a snapshot of the new selection.
+        {"action": "resume", "since": 41, "epoch": "..."} sends the events
+        after seq 41 of that epoch (or a snapshot if they are gone or the
+        epoch is missing).
+        """
+        message = decode(frame)
+        if message is None:
+            return
+
+        action = message.get("action")
+        if action == "resume":
+            client = self.clients.get(websocket)
+            if client is not None:
+                since = message.get("since")
+                self._sync(client, since if isinstance(since, int) else None, message.get("epoch"))
+            return
+
+        try:
+            if action == "subscribe":
+                subscription = Subscription.from_message(message)
+            elif action == "unsubscribe":
+                subscription = Subscription()
+            else:
+                return
+        except (TypeError, ValueError, AttributeError) as e:
+            client = self.clients.get(websocket)
+            if client is not None:
+                client.send({"type": "error", "data": {"detail": f"Assinatura inválida: {e}"}})
+            return
+
+        if self.subscribe(websocket, subscription):
+            client = self.clients[websocket]
+            client.send({
+                "type": "subscribed",
+                "data": subscription.to_dict()
+            })
+            self._sync(client)
+
+    def log(self, owner: Optional[str]) -> EventLog:
+        """Event log of an owner's signals (created on first use)"""
+        log = self._logs.get(owner)
+        if log is None:
+            log = self._logs[owner] = EventLog(self.max_events, ttl=settings.SIGNAL_HISTORY_TTL_MINUTES * 60)
+        return log
+
+    def _sync(self, client: ClientConnection, since: Optional[int] = None, epoch: Optional[str] = None):
+        """Bring a client up to date: missed events after ``since``, else a snapshot"""
+        log = self.log(client.user)
+        events = log.since(since, epoch) if since is not None else None
+        if events is None:
+            client.send({
+                "type": "snapshot",
+                "seq": log.seq,
+                "epoch": log.epoch,
+                "data": log.snapshot(client.subscription.accepts)
+            })
+            return
+
+        client.send({
+            "type": "resume",
+            "seq": log.seq,
+            "epoch": log.epoch,
+            "data": [
+                event for event in events
+                if event["type"] != SIGNAL or client.subscription.accepts(event["data"])
+            ]
+        })
+
+    def _topics_of(self, client: ClientConnection) -> List[Tuple[Optional[str], str]]:
+        return [(client.user, symbol) for symbol in client.subscription.topic_symbols()]
+
+    def _index(self, client: ClientConnection):
+        for topic in self._topics_of(client):
+            self._topics.setdefault(topic, set()).add(client)
 
-    async def broadcast_signal(self, signal_data: dict):
+    def _unindex(self, client: ClientConnection):
+        for topic in self._topics_of(client):
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def _remove(self, client: ClientConnection):
+        if self.clients.get(client.websocket) is not client:
+            return
+        del self.clients[client.websocket]
+        self._unindex(client)
+        users = self._users.get(client.user)
+        if users is not None:
+            users.discard(client)
+            if not users:
+                del self._users[client.user]
+        WS_CLIENTS.set(len(self.clients))
+
+    def _on_client_closed(self, client: ClientConnection):
+        self._remove(client)
+
+    def subscribers(self, signal_data: dict, owner: Optional[str] = None) -> Set[ClientConnection]:
+        """Clients a signal is routed to"""
+        if owner is None:
+            candidates = [
+                client for client in self.clients.values()
+                if client.subscription.symbols is None
+                or str(signal_data.get("symbol", "")).upper() in client.subscription.symbols
+            ]
+        else:
+            symbol = str(signal_data.get("symbol", "")).upper()
+            candidates = self._topics.get((owner, symbol), set()) | self._topics.get((owner, ALL_SYMBOLS), set())
+        return {client for client in candidates if client.subscription.matches(signal_data)}
+
+    def _fan_out(
+        self,
+        clients: Iterable[ClientConnection],
+        message: dict,
+        coalesce: Optional[str] = None
+    ) -> int:
+        """Encode a message once per encoding and queue it; returns clients reached"""
+        frames: Dict[str, Frame] = {}
+        reached = 0
+        for client in list(clients):
+            frame = frames.get(client.encoding)
+            if frame is None:
+                frame = frames[client.encoding] = encode(message, client.encoding)
+            reached += client.enqueue(frame, coalesce)
+        return reached
+
+    async def broadcast_signal(
+        self,
+        signal_data: dict,
+        owner: Optional[str] = None,
+        source: Optional[str] = None
+    ):
         """
-        Broadcast signal to all connected clients
+        Send a signal to the clients subscribed to it
+
+        The frame is encoded once per encoding and queued on every
+        subscriber; this returns without waiting for any send.
 
         Args:
             signal_data: Signal data to broadcast
+            owner: Username of the scanner that generated it (None: public)
+            source: Scanner that generated it (its reset clears only these)
         """
-        if not self.active_connections:
-            return
+        await self.broadcast_signals([signal_data], owner, source)
+
+    async def broadcast_signals(
+        self,
+        signals: Sequence[dict],
+        owner: Optional[str] = None,
+        source: Optional[str] = None
+    ):
+        """
+        Send the signals of one scan cycle, batched per client
 
-        message = json.dumps({
-            "type": "new_signal",
-            "data": signal_data
-        }, cls=DateTimeEncoder)
-
-        # Send to all connections
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                print(f"[WebSocket] Erro ao enviar: {e}")
-                disconnected.add(connection)
-
-        # Remove disconnected clients
-        self.active_connections -= disconnected
-
-    async def broadcast_scanner_status(self, status: dict):
-        """Broadcast scanner status update"""
-        if not self.active_connections:
+        A client matching one signal gets a "new_signal" frame; a client
+        matching several gets them in one "signals" frame. Clients matching
+        the same signals in the same encoding share the encoded frame. The
+        owner's clients also get the seq of the (last) signal in the frame.
+
+        Args:
+            signals: Signal data of the cycle
+            owner: Username of the scanner that generated them (None: public)
+            source: Scanner that generated them (its reset clears only these)
+        """
+        log = self.log(owner)
+        events = [log.append(SIGNAL, signal_data, source) for signal_data in signals]
+        log.expire()
+
+        routes: Dict[ClientConnection, List[int]] = {}
+        for index, signal_data in enumerate(signals):
+            for client in self.subscribers(signal_data, owner):
+                routes.setdefault(client, []).append(index)
+
+        frames: Dict[Tuple[str, Tuple[int, ...], bool], Frame] = {}
+        for client, indices in routes.items():
+            # seq numbers are only meaningful to clients of the owner's log
+            sequenced = client.user == owner
+            key = (client.encoding, tuple(indices), sequenced)
+            frame = frames.get(key)
+            if frame is None:
+                if len(indices) == 1:
+                    message = {"type": "new_signal", "data": signals[indices[0]]}
+                else:
+                    message = {"type": "signals", "data": [signals[index] for index in indices]}
+                if source is not None:
+                    message["source"] = source
+                if sequenced:
+                    message["seq"] = events[indices[-1]]["seq"]
+                frame = frames[key] = encode(message, client.encoding)
+            coalesce = None
+            if len(indices) == 1:
+                signal_data = signals[indices[0]]
+                coalesce = f"signal:{source}:{signal_data.get('symbol')}:{signal_data.get('timeframe')}"
+            client.enqueue(frame, coalesce)
+
+    async def broadcast_scanner_status(
+        self,
+        status: dict,
+        owner: Optional[str] = None,
+        source: Optional[str] = None
+    ):
+        """Send a scanner status update to the owner's clients (everyone if None)"""
+        event = self.log(owner).append(STATUS, status, source)
+        clients = self.clients.values() if owner is None else self._users.get(owner, set())
+        if not clients:
             return
 
-        message = json.dumps({
-            "type": "scanner_status",
-            "data": status
-        }, cls=DateTimeEncoder)
+        message = {"type": "scanner_status", "source": source, "data": status}
+        sequenced = [client for client in clients if client.user == owner]
+        others = [client for client in clients if client.user != owner]
+        coalesce = f"scanner_status:{source}"
+        self._fan_out(sequenced, {**message, "seq": event["seq"]}, coalesce=coalesce)
+        self._fan_out(others, message, coalesce=coalesce)
+
+    async def reset_signals(self, owner: Optional[str] = None, source: Optional[str] = None):
+        """Tell the owner's clients that one of its scanners dropped its signals"""
+        event = self.log(owner).append(RESET, source=source)
+        self._fan_out(
+            self._users.get(owner, set()),
+            {"type": "reset", "seq": event["seq"], "source": source, "data": None}
+        )
 
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception:
-                disconnected.add(connection)
+    async def broadcast(self, message: dict):
+        """Send a message to every connected client"""
+        self._fan_out(self.clients.values(), message)
 
-        self.active_connections -= disconnected
+    async def send_signal(self, signal_data: dict):
+        """Send a public signal (ConnectionManager compat)"""
+        await self.broadcast_signal(signal_data)
 
     async def send_personal_message(self, websocket: WebSocket, message: dict):
         """Send message to specific client"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
         try:
-            await websocket.send_json(message)
+            client.send(message)
         except Exception as e:
-            print(f"[WebSocket] Erro ao enviar mensagem pessoal: {e}")
+            logger.warning("[WebSocket] Erro ao enviar mensagem pessoal: %s", e)
+
+    def stats(self) -> dict:
+        """Clients, topics and send queues"""
+        clients = [client.stats() for client in self.clients.values()]
+        return {
+            "clients": len(clients),
+            "users": len(self._users),
+            "topics": len(self._topics),
+            "event_logs": len(self._logs),
+            "policy": self.policy,
+            "max_queue": self.max_queue,
+            "queued": sum(client["queued"] for client in clients),
+            "dropped": sum(client["dropped"] for client in clients),
+            "coalesced": sum(client["coalesced"] for client in clients),
+            "resynced": sum(client["resynced"] for client in clients),
+            "max_client_queue": max((client["queued"] for client in clients), default=0),
+            "encodings": {
+                encoding: sum(client["encoding"] == encoding for client in clients)
+                for encoding in available_encodings()
+            },
+        }
 
 
 # Global WebSocket manager
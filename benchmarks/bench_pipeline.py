@@ -0,0 +1,358 @@
+"""
+Benchmark suite for the signal pipeline, with baseline regression checks.
+
+Times every stage of the pipeline on seeded synthetic OHLCV fixtures
+(100 / 1k / 10k candles, 1 / 30 / 300 symbols) and on the get-candles
+responses of fixtures/get_candles.jsonl, fully offline:
+
+    indicators        TechnicalIndicators, per symbol
+    patterns          PriceActionDetector.detect_patterns, per symbol
+    levels            SupportResistanceDetector.detect_levels, per symbol
+    signal            SignalGenerator.generate_signal, per symbol
+    batch_indicators  batch_indicators.signal_features, all symbols at once
+    batch_signal      SignalGenerator.generate_signals, all symbols at once
+
+For each (stage, candles, symbols) it reports the median and best latency
+of a run over all symbols, the throughput, the peak memory allocated during a run
+(tracemalloc) and, for the signal stages, the number of signals.
+
+--save-baseline stores the results as the baseline; --check compares
+against it and exits with status 1 on a regression. The best latencies are
+compared (least sensitive to a busy host). Latencies are host-specific, so
+the baseline is not committed: save it on the host that runs --check,
+before the change under test. With --scale, the baseline is
+scaled by the ratio of the calibration workloads (every stage over a small
+fixed fixture, timed with each run), so a baseline from another host or
+from a quieter moment of the same host does not read as a regression.
+
+Recorded fixtures (--recorded, default fixtures/get_candles.jsonl) are
+JSON lines of get-candles responses, one symbol per line: {"symbol":
+"EURUSD-OTC", "candles": [{"id", "from", "at", "to", "open", "close",
+"min", "max", "volume"}, ...]}; --no-recorded skips it and --candles ""
+runs it alone.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--candles 100,1000] [--symbols 1,30]
+        [--stages signal,batch_signal] [--repeats N] [--recorded PATH | --no-recorded]
+        [--json] [--out PATH] [--save-baseline | --check] [--tolerance T]
+        [--min-delta MS] [--scale]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.models.schemas import ScanConfig  # noqa: E402
+from app.services.indicators import batch_indicators  # noqa: E402
+from app.services.indicators.technical_indicators import TechnicalIndicators  # noqa: E402
+from app.services.price_action.pattern_detector import PriceActionDetector  # noqa: E402
+from app.services.price_action.support_resistance import SupportResistanceDetector  # noqa: E402
+from app.services.scanner.signal_generator import OHLCV, SignalGenerator, stack_candles  # noqa: E402
+from benchmarks.bench_signal_generator import make_candles  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines", "pipeline.json")
+CANDLE_SIZES = (100, 1000, 10000)
+SYMBOL_SIZES = (1, 30, 300)
+STAGES = ("indicators", "patterns", "levels", "signal", "batch_indicators", "batch_signal")
+SIGNAL_STAGES = ("signal", "batch_signal")
+# runs over this many candles (candles x symbols) are timed once
+HEAVY_RUN = 300_000
+# (candles, symbols) of the calibration workload
+CALIBRATION_FIXTURE = (100, 10)
+# recorded get-candles responses run with the synthetic matrix by default
+RECORDED_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "get_candles.jsonl")
+
+
+def synthetic_fixture(candles, symbols):
+    """Seeded random walks, one per symbol (the same on every run)"""
+    return {f"SYM{i:03d}": make_candles(candles, seed=1000 + i) for i in range(symbols)}
+
+
+def recorded_fixture(path):
+    """Recorded get-candles responses, trimmed to the shortest symbol"""
+    frames = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            frames[record["symbol"]] = pd.DataFrame({
+                "timestamp": pd.to_datetime([c["from"] for c in record["candles"]], unit="s"),
+                "open": [float(c["open"]) for c in record["candles"]],
+                "high": [float(c["max"]) for c in record["candles"]],
+                "low": [float(c["min"]) for c in record["candles"]],
+                "close": [float(c["close"]) for c in record["candles"]],
+                "volume": [float(c.get("volume", 0)) for c in record["candles"]],
+            })
+    count = min(len(df) for df in frames.values())
+    return {symbol: df.iloc[-count:].reset_index(drop=True) for symbol, df in frames.items()}
+
+
+def calibrate(rounds=10):
+    """
+    Milliseconds of every pipeline stage over a small fixed fixture (host
+    speed, best run per stage)
+
+    The workload is the stages themselves, so the ratio between two hosts
+    (or two runs of a busy host) tracks what the matrix measures.
+    """
+    frames = synthetic_fixture(*CALIBRATION_FIXTURE)
+    total = 0.0
+    for stage in STAGES:
+        run_stage = make_stage(stage, frames)
+        run_stage()
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            run_stage()
+            samples.append(time.perf_counter() - start)
+        total += min(samples)
+    return total * 1000
+
+
+def make_stage(stage, frames):
+    """Return a function running one stage over every symbol of frames"""
+    config = ScanConfig(sensitivity="aggressive", timeframe=1)
+    items = list(frames.items())
+
+    if stage == "indicators":
+        ti = TechnicalIndicators()
+
+        def run():
+            for _, df in items:
+                ti.calculate_ema(df, 20)
+                ti.calculate_rsi(df)
+                ti.calculate_macd(df)
+                ti.calculate_atr(df)
+                ti.calculate_stochastic(df)
+                ti.detect_trend(df)
+                ti.check_ma_crossover(df)
+        return run
+
+    if stage == "patterns":
+        detector = PriceActionDetector(config.sensitivity)
+        return lambda: [detector.detect_patterns(df) for _, df in items]
+
+    if stage == "levels":
+        detector = SupportResistanceDetector()
+        return lambda: [detector.detect_levels(df) for _, df in items]
+
+    generator = SignalGenerator(config)
+
+    if stage == "signal":
+        return lambda: [generator.generate_signal(symbol, df) for symbol, df in items]
+
+    symbols = [symbol for symbol, _ in items]
+    stacked = stack_candles([df for _, df in items])
+    if stage == "batch_indicators":
+        o, h, l, c, v = (np.ascontiguousarray(stacked[:, :, i]) for i in range(len(OHLCV)))
+        return lambda: batch_indicators.signal_features(h, l, c, v, SignalGenerator.VOLATILITY_THRESHOLDS)
+    if stage == "batch_signal":
+        return lambda: list(generator.generate_signals(symbols, stacked).values())
+    raise ValueError(f"unknown stage {stage!r}")
+
+
+def measure(stage, frames, repeats):
+    """Latency, throughput, peak allocation (and signals) of one stage"""
+    run = make_stage(stage, frames)
+    symbols = len(frames)
+    candles = len(next(iter(frames.values())))
+
+    result = run()  # warm up (imports, caches)
+    if candles * symbols >= HEAVY_RUN:
+        repeats = 1
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = run()
+        samples.append(time.perf_counter() - start)
+    latency = statistics.median(samples)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    entry = {
+        "stage": stage,
+        "candles": candles,
+        "symbols": symbols,
+        "repeats": repeats,
+        "latency_ms": round(latency * 1000, 3),
+        "best_ms": round(min(samples) * 1000, 3),
+        "per_symbol_us": round(latency / symbols * 1e6, 1),
+        "symbols_per_s": round(symbols / latency, 1) if latency else None,
+        "candles_per_s": round(symbols * candles / latency) if latency else None,
+        "peak_kib": round(peak / 1024, 1),
+    }
+    if stage in SIGNAL_STAGES:
+        entry["signals"] = sum(signal is not None for signal in result)
+    return entry
+
+
+def run(candle_sizes, symbol_sizes, stages, repeats, recorded=None, progress=None):
+    """Run the benchmark matrix and return the results document"""
+    logging.disable(logging.CRITICAL)
+    try:
+        calibration = calibrate()
+        fixtures = [
+            ("synthetic", synthetic_fixture(candles, symbols))
+            for candles in candle_sizes for symbols in symbol_sizes
+        ]
+        if recorded:
+            fixtures.append(("recorded", recorded_fixture(recorded)))
+
+        results = []
+        for source, frames in fixtures:
+            for stage in stages:
+                entry = measure(stage, frames, repeats)
+                entry["fixture"] = source
+                results.append(entry)
+                if progress:
+                    progress(entry)
+        return {
+            # best of before and after the matrix, less exposed to host noise
+            "calibration_ms": round(min(calibration, calibrate()), 3),
+            "host": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+            },
+            "results": results,
+        }
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def result_key(entry):
+    return f"{entry['fixture']}/{entry['stage']}/{entry['candles']}x{entry['symbols']}"
+
+
+def compare(current, baseline, tolerance, min_delta_ms=0.5, scale=False):
+    """
+    Compare results with the baseline
+
+    Returns a list of findings: latency regressions (above the calibrated
+    baseline by more than tolerance and by more than min_delta_ms, so
+    sub-millisecond noise is not flagged) and signal count changes.
+    """
+    factor = 1.0
+    if scale and baseline.get("calibration_ms"):
+        factor = current["calibration_ms"] / baseline["calibration_ms"]
+    previous = {result_key(entry): entry for entry in baseline["results"]}
+    findings = []
+    for entry in current["results"]:
+        base = previous.get(result_key(entry))
+        if base is None:
+            continue
+        expected = base["best_ms"] * factor
+        if entry["best_ms"] > expected * (1 + tolerance) and entry["best_ms"] - expected > min_delta_ms:
+            findings.append({
+                "key": result_key(entry),
+                "kind": "latency",
+                "baseline_ms": round(expected, 3),
+                "current_ms": entry["best_ms"],
+                "ratio": round(entry["best_ms"] / expected, 2),
+            })
+        if "signals" in base and entry.get("signals") != base["signals"]:
+            findings.append({
+                "key": result_key(entry),
+                "kind": "signals",
+                "baseline": base["signals"],
+                "current": entry.get("signals"),
+            })
+    return findings
+
+
+def parse_sizes(value):
+    return tuple(int(item) for item in value.split(",") if item.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candles", type=parse_sizes, default=CANDLE_SIZES, help="comma separated candle counts")
+    parser.add_argument("--symbols", type=parse_sizes, default=SYMBOL_SIZES, help="comma separated symbol counts")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma separated stages")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs per entry")
+    parser.add_argument("--recorded", default=RECORDED_PATH, help="JSON lines of recorded get-candles responses")
+    parser.add_argument("--no-recorded", action="store_true", help="skip the recorded fixture")
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    parser.add_argument("--out", help="write the results document to this path")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline path")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+    group.add_argument("--check", action="store_true", help="exit 1 on a regression against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="ignore slowdowns below this many ms")
+    parser.add_argument("--scale", action="store_true", help="scale the baseline by the calibration ratio")
+    args = parser.parse_args()
+
+    stages = tuple(stage for stage in args.stages.split(",") if stage)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    def progress(entry):
+        if not args.json:
+            print(f"{result_key(entry):<38} {entry['latency_ms']:>11.3f} ms "
+                  f"{entry['per_symbol_us']:>11.1f} us/sym {entry['peak_kib']:>10.1f} KiB"
+                  + (f"  signals={entry['signals']}" if "signals" in entry else ""))
+
+    if not args.json:
+        print(f"{'stage':<38} {'latency':>14} {'per symbol':>18} {'peak alloc':>14}")
+    recorded = None if args.no_recorded else args.recorded
+    document = run(args.candles, args.symbols, stages, args.repeats, recorded, progress)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(document, handle, indent=2)
+
+    findings = []
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(document, handle, indent=2)
+            handle.write("\n")
+    elif args.check:
+        if not os.path.exists(args.baseline):
+            parser.error(f"no baseline at {args.baseline}: run --save-baseline on this host first")
+        with open(args.baseline, encoding="utf-8") as handle:
+            findings = compare(document, json.load(handle), args.tolerance, args.min_delta, args.scale)
+        document["regressions"] = findings
+
+    if args.json:
+        print(json.dumps(document))
+    else:
+        print(f"calibration        : {document['calibration_ms']:.3f} ms")
+        if args.save_baseline:
+            print(f"baseline saved     : {args.baseline}")
+        elif args.check:
+            for finding in findings:
+                if finding["kind"] == "latency":
+                    print(f"REGRESSION {finding['key']}: {finding['current_ms']:.3f} ms "
+                          f"vs {finding['baseline_ms']:.3f} ms ({finding['ratio']:.2f}x)")
+                else:
+                    print(f"CHANGED    {finding['key']}: signals {finding['current']} "
+                          f"vs {finding['baseline']}")
+            print(f"regressions        : {len(findings)}")
+
+    if findings:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
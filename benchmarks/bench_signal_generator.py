@@ -0,0 +1,153 @@
+"""
+Micro-benchmark for SignalGenerator.generate_signal latency.
+
+Slides a 100-candle window over a seeded random walk (as the scanners do
+every cycle) and times, per window, the indicator stages (direction,
+filters, confluences) and the whole generate_signal call, in two modes:
+
+    per-stage  every stage recomputes its indicators on the frame
+               (generate_signal before the per-call feature context)
+    context    indicators computed once per call on the frame
+
+Usage:
+    python -m benchmarks.bench_signal_generator [--windows N] [--sensitivity S] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.models.schemas import PriceActionPattern, ScanConfig  # noqa: E402
+from app.services.scanner import signal_generator  # noqa: E402
+from app.services.scanner.signal_generator import SignalFeatures, SignalGenerator  # noqa: E402
+
+WINDOW = 100
+MODES = ("per-stage", "context")
+
+
+class PerStageFeatures(SignalFeatures):
+    """Recomputes every value on access, as each stage used to."""
+
+    trend = property(SignalFeatures.trend.func)
+    rsi = property(SignalFeatures.rsi.func)
+    macd = property(SignalFeatures.macd.func)
+    ma_crossover = property(SignalFeatures.ma_crossover.func)
+    stochastic = property(SignalFeatures.stochastic.func)
+    volume_increasing = property(SignalFeatures.volume_increasing.func)
+    volume_decreasing = property(SignalFeatures.volume_decreasing.func)
+
+    def is_high_volatility(self, threshold):
+        self._high_volatility.clear()
+        return super().is_high_volatility(threshold)
+
+
+def make_candles(count, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 4e-4, count))
+    open_ = np.concatenate(([close[0]], close[:-1])) + rng.normal(0, 1e-4, count)
+    high = np.maximum(open_, close) + rng.random(count) * 6e-4
+    low = np.minimum(open_, close) - rng.random(count) * 6e-4
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=count, freq="min"),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": rng.integers(50, 500, count).astype(float),
+    })
+
+
+def make_generator(sensitivity):
+    return SignalGenerator(ScanConfig(sensitivity=sensitivity, timeframe=1))
+
+
+def windows(candles):
+    return [candles.iloc[end - WINDOW:end] for end in range(WINDOW, len(candles) + 1)]
+
+
+def time_stages(mode, candles, sensitivity):
+    """Time the indicator stages alone, for an inside bar read as a CALL."""
+    generator = make_generator(sensitivity)
+    features_class = PerStageFeatures if mode == "per-stage" else SignalFeatures
+    pattern = PriceActionPattern(pattern_type="inside_bar", description="", candle_index=0)
+
+    frames = windows(candles)
+    elapsed = 0.0
+    for df in frames:
+        start = time.perf_counter()
+        features = features_class(df, generator.indicators)
+        generator._determine_direction(pattern, None, features)
+        generator._apply_filters(features, "CALL")
+        generator._calculate_confluences(pattern, None, features, "CALL")
+        elapsed += time.perf_counter() - start
+    return elapsed / len(frames) * 1e6
+
+
+def time_signal(mode, candles, sensitivity):
+    """Time whole generate_signal calls (patterns and S/R included)."""
+    generator = make_generator(sensitivity)
+    signal_generator.SignalFeatures = PerStageFeatures if mode == "per-stage" else SignalFeatures
+
+    frames = windows(candles)
+    signals = 0
+    elapsed = 0.0
+    try:
+        for df in frames:
+            start = time.perf_counter()
+            signal = generator.generate_signal("EURUSD", df)
+            elapsed += time.perf_counter() - start
+            signals += signal is not None
+    finally:
+        signal_generator.SignalFeatures = SignalFeatures
+    return elapsed / len(frames) * 1e6, signals
+
+
+def run(count, sensitivity):
+    candles = make_candles(count + WINDOW - 1)
+    results = {"windows": count, "sensitivity": sensitivity}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode in MODES:
+            stages = time_stages(mode, candles, sensitivity)
+            micros, signals = time_signal(mode, candles, sensitivity)
+            results[mode] = {
+                "stages_us": round(stages, 1),
+                "signal_us": round(micros, 1),
+                "signals": signals,
+            }
+    results["stages_speedup"] = round(
+        results["per-stage"]["stages_us"] / results["context"]["stages_us"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--windows", type=int, default=300, help="candle windows per mode")
+    parser.add_argument("--sensitivity", default="aggressive",
+                        choices=("conservative", "moderate", "aggressive"))
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    args = parser.parse_args()
+
+    results = run(args.windows, args.sensitivity)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"windows            : {results['windows']} per mode ({results['sensitivity']})")
+    print(f"{'mode':<18} : {'stages':>10} {'generate_signal':>16}  signals")
+    for mode in MODES:
+        print(f"{mode:<18} : {results[mode]['stages_us']:>7.1f} us "
+              f"{results[mode]['signal_us']:>13.1f} us  {results[mode]['signals']}")
+    print(f"stages speedup     : {results['stages_speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark for WebsocketClient message dispatch.
+
+Replays the recorded frames of fixtures/ws_frames.jsonl through the
+received handlers twice: once calling every handler for every frame
+(the former on_message chain) and once through the name -> handler table.
+
+Usage:
+    python -m benchmarks.bench_ws_dispatch [--rounds N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app", "services"))
+
+from iqoptionapi.api import IQOptionAPI  # noqa: E402
+from iqoptionapi.ws.client import WebsocketClient  # noqa: E402
+
+FRAMES_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "ws_frames.jsonl")
+
+
+def load_frames(path=FRAMES_PATH):
+    with open(path, encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def build_client():
+    api = IQOptionAPI("iqoption.com", "benchmark", "benchmark")
+    client = WebsocketClient(api)
+    # same sizes the stream handlers get from start_candles_stream
+    for active in ("EURUSD", "EURUSD-OTC"):
+        for size in (60, 300):
+            api.real_time_candles_maxdict_table[active][size] = 100
+    return api, client
+
+
+def dispatch_linear(api, client, message):
+    """Every handler sees every frame, as the former on_message did."""
+    for handlers in client.handlers.values():
+        for handler, extra_args in handlers:
+            handler(api, message, *extra_args)
+
+
+def dispatch_table(api, client, message):
+    for handler, extra_args in client.handlers.get(message.get("name"), ()):
+        handler(api, message, *extra_args)
+
+
+def run(rounds):
+    raw_frames = load_frames()
+    api, client = build_client()
+    # decode once: the benchmark measures dispatch, not json parsing
+    frames = [json.loads(raw) for raw in raw_frames]
+
+    results = {"frames": len(frames), "rounds": rounds}
+    for label, dispatch in (("linear", dispatch_linear), ("table", dispatch_table)):
+        for message in frames:  # warm-up
+            dispatch(api, client, message)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for message in frames:
+                dispatch(api, client, message)
+        elapsed = time.perf_counter() - start
+        results[label + "_ns_per_frame"] = round(elapsed / (rounds * len(frames)) * 1e9, 1)
+
+    results["speedup"] = round(
+        results["linear_ns_per_frame"] / results["table_ns_per_frame"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="print machine readable results")
+    args = parser.parse_args()
+
+    results = run(args.rounds)
+    if args.json:
+        print(json.dumps(results))
+        return
+
+    print(f"frames replayed : {results['frames']} x {results['rounds']} rounds")
+    print(f"linear dispatch : {results['linear_ns_per_frame']:.1f} ns/frame")
+    print(f"table dispatch  : {results['table_ns_per_frame']:.1f} ns/frame")
+    print(f"speedup         : {results['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
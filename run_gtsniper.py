@@ -81,6 +81,7 @@ def main():
     # Iniciar servidor FastAPI
     import uvicorn
     from app.main import app
+    from app.core.config import settings
 
     logger.info("")
     logger.info("✅ GT Sniper iniciado com sucesso!")
@@ -108,7 +109,8 @@ def main():
             host=host,
             port=port,
             log_level="info",
-            access_log=False
+            access_log=False,
+            ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE
         )
     except KeyboardInterrupt:
         logger.info("\n👋 GT Sniper encerrado. Até logo!")